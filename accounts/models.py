@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from jobs.loader import BatchedOneToOneField, record
+
 
 class UserProfile(models.Model):
     USER_TYPE_CHOICES = [
@@ -10,7 +12,7 @@ class UserProfile(models.Model):
         ('applicant', 'Applicant'),
     ]
     
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
+    user = BatchedOneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES)
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
@@ -19,6 +21,14 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        record(instance)
+        if 'bio' in instance.__dict__:
+            instance._matched_bio = instance.bio
+        return instance
+    
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.get_user_type_display()}"
     
@@ -38,4 +48,10 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, 'profile'):
-        instance.profile.save() 
\ No newline at end of file
+        instance.profile.save() 
+
+
+@receiver(post_save, sender=UserProfile)
+def queue_applications_for_matching(sender, instance, created, **kwargs):
+    from jobs import matching
+    matching.profile_saved(instance, created)
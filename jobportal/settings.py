@@ -46,6 +46,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'jobs.loader.RequestLoaderMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -155,4 +156,80 @@ MESSAGE_TAGS = {
     messages.SUCCESS: 'alert-success',
     messages.WARNING: 'alert-warning',
     messages.ERROR: 'alert-danger',
-} 
\ No newline at end of file
+}
+
+# Search box typeahead (seconds between catch-up syncs / full reloads per process)
+TYPEAHEAD_SYNC_INTERVAL = 60
+TYPEAHEAD_RELOAD_INTERVAL = 3600
+
+# Listing pagination: result count shown in cursor mode ('exact', 'estimated' or 'none')
+LISTING_COUNT_MODE = 'estimated'
+ESTIMATED_COUNT_LIMIT = 1000
+
+# Job search result cache: ids kept per filter combination, entry lifetime, live entries
+SEARCH_CACHE_DEPTH = 1200
+SEARCH_CACHE_TIMEOUT = 300
+SEARCH_CACHE_MAX_KEYS = 1000
+
+# Relevance ranking: BM25F field weights and how many ranked results a listing keeps
+SEARCH_FIELD_WEIGHTS = {
+    'title': 4.0,
+    'company': 2.0,
+    'location': 1.0,
+    'description': 1.0,
+    'requirements': 0.5,
+}
+SEARCH_RANK_DEPTH = 120
+
+# Typo tolerant search: trigram similarity a word needs to replace a misspelt query word
+FUZZY_MIN_SIMILARITY = 0.25
+
+# Saved search alerts: site URL used in digest links and jobs listed per saved search
+SITE_URL = config('SITE_URL', default='http://localhost:8000')
+JOB_ALERT_MAX_JOBS = 10
+
+# Query budgets: raise when a view runs more queries than its budget (in development and tests), else log a warning
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=DEBUG, cast=bool)
+
+# Home page totals: seconds between full recounts of the cached snapshot
+SITE_STATS_RECOUNT_INTERVAL = 600
+
+# Anonymous page cache: seconds a cached public page lives when nothing invalidates it
+PAGE_CACHE_TIMEOUT = 60
+
+# Read API: results per page when no limit is given, and the largest limit accepted
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# Job feeds: active jobs read per query while streaming a feed
+JOB_FEED_BATCH_SIZE = 500
+
+# Sitemaps: directory the generate_sitemaps command writes to, and URLs per shard (50,000 at most)
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+SITEMAP_SHARD_SIZE = 50000
+
+# Sitemaps: seconds crawlers and proxies may reuse a sitemap before revalidating it
+SITEMAP_MAX_AGE = 60 * 60
+
+# Serve the home, job list, job detail and search views with their async versions (experimental opt in, for ASGI)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+if ASYNC_VIEWS:
+    # allauth's middleware is sync only, which would send every request
+    # through a worker thread.  allauth.account insists on it from ready(),
+    # an ImproperlyConfigured rather than a system check, so there is no
+    # check id for SILENCED_SYSTEM_CHECKS and its app config is swapped too
+    INSTALLED_APPS[INSTALLED_APPS.index('allauth.account')] = 'jobs.allauth_async.AccountConfig'
+    MIDDLEWARE[MIDDLEWARE.index('allauth.account.middleware.AccountMiddleware')] = 'jobs.allauth_async.AccountMiddleware'
+
+# Uploads: hashed and size checked as they stream in; largest file per form field, and for any other field
+FILE_UPLOAD_HANDLERS = ['jobs.uploads.HashingUploadHandler']
+UPLOAD_SIZE_LIMITS = {
+    'resume': 5 * 1024 * 1024,
+    'image': 10 * 1024 * 1024,
+}
+UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+# Applicant search: worker processes extracting resume text, applications indexed per batch, and characters kept per resume
+APPLICANT_INDEX_WORKERS = 2
+APPLICANT_INDEX_BATCH_SIZE = 100
+RESUME_TEXT_MAX_LENGTH = 100000
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Job, Application, Company, CompanyGallery
+from .models import Job, Application, Company, CompanyGallery, SavedSearch, JobAlert, ResumeBlob
 
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
-    list_display = ('title', 'company', 'location', 'job_type', 'experience_level', 'posted_by', 'created_at', 'is_active')
+    list_display = ('title', 'company', 'location', 'job_type', 'experience_level', 'posted_by', 'applications_count', 'created_at', 'is_active')
     list_filter = ('job_type', 'experience_level', 'is_active', 'created_at', 'company')
     search_fields = ('title', 'company__name', 'location', 'description')
     list_editable = ('is_active',)
@@ -30,8 +30,8 @@ class JobAdmin(admin.ModelAdmin):
 
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
-    list_display = ('applicant', 'job', 'status', 'applied_at')
-    list_filter = ('status', 'applied_at', 'job__company')
+    list_display = ('applicant', 'job', 'status', 'match_score', 'applied_at')
+    list_filter = ('status', 'text_indexed', 'applied_at', 'job__company')
     search_fields = ('applicant__username', 'applicant__email', 'job__title', 'job__company__name')
     readonly_fields = ('applied_at',)
     date_hierarchy = 'applied_at'
@@ -52,7 +52,7 @@ class ApplicationAdmin(admin.ModelAdmin):
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
-    list_display = ('name', 'industry', 'headquarters', 'employee_count', 'is_verified', 'created_at')
+    list_display = ('name', 'industry', 'headquarters', 'employee_count', 'active_jobs_count', 'is_verified', 'created_at')
     list_filter = ('industry', 'is_verified', 'created_at')
     search_fields = ('name', 'description', 'headquarters')
     list_editable = ('is_verified',)
@@ -95,4 +95,29 @@ class CompanyGalleryAdmin(admin.ModelAdmin):
             'fields': ('created_at',),
             'classes': ('collapse',)
         }),
-    ) 
\ No newline at end of file
+    )
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'query', 'location', 'anchor', 'is_active', 'created_at')
+    list_filter = ('is_active', 'job_type', 'experience_level', 'created_at')
+    search_fields = ('name', 'user__username', 'user__email', 'query', 'location')
+    list_editable = ('is_active',)
+    readonly_fields = ('anchor', 'created_at')
+
+
+@admin.register(JobAlert)
+class JobAlertAdmin(admin.ModelAdmin):
+    list_display = ('saved_search', 'job', 'created_at', 'sent_at')
+    list_filter = ('sent_at', 'created_at')
+    search_fields = ('saved_search__name', 'saved_search__user__username', 'job__title')
+    raw_id_fields = ('saved_search', 'job')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(ResumeBlob)
+class ResumeBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'references', 'created_at')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'size', 'references', 'created_at')
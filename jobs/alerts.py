@@ -0,0 +1,178 @@
+"""
+Saved search alerts.
+
+Saved searches are indexed like a percolator: every ``SavedSearch`` is
+stored under one *anchor* key for its most selective criterion, a
+keyword prefix (``kw:pyth``), its company (``co:12``), a location
+substring (``loc:austin``), its experience level, its job type, or
+``*`` when it has no criteria at all.  A saved job derives every key it
+could be found under, so indexed ``anchor IN (...)`` lookups return the
+candidate searches, which are then checked with the same Python mirror
+of the JobListView filters the search cache uses.  A long description
+derives tens of thousands of keyword keys, so the keys are looked up
+``ANCHOR_BATCH_SIZE`` at a time, under the database's parameter limit.
+
+Matches are stored as ``JobAlert`` rows and go out as one digest email
+per user from the ``send_job_alerts`` command, in batches sent over one
+mail connection and marked sent with one UPDATE each.
+"""
+from collections import defaultdict
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JobAlert, SavedSearch
+from .search import fold, tokenize
+from .search_cache import job_matches, job_tokens, normalize_criteria
+
+
+ANY_KEY = '*'
+
+# Keyword and location anchors are cut to this many characters, which
+# bounds the keys a job has to derive per word
+ANCHOR_LENGTH = 6
+
+# Keys looked up per query, well under SQLite's parameter limit
+ANCHOR_BATCH_SIZE = 5000
+
+DIGEST_BATCH_SIZE = 500
+
+MAX_ALERT_IDS = 5000
+
+
+def anchor_key(search):
+    """The percolator key a saved search is found under"""
+    keywords = [fold(token) for token in tokenize(search.query)]
+    if keywords:
+        return 'kw:' + max(keywords, key=len)[:ANCHOR_LENGTH]
+    if search.company_id:
+        return f'co:{search.company_id}'
+    location = search.location.strip().lower()
+    if location:
+        return 'loc:' + location[:ANCHOR_LENGTH]
+    if search.experience_level:
+        return 'el:' + search.experience_level
+    if search.job_type:
+        return 'jt:' + search.job_type
+    return ANY_KEY
+
+
+def job_keys(job):
+    """Every anchor key a saved search matching ``job`` could have"""
+    keys = {ANY_KEY, 'el:' + job.experience_level, 'jt:' + job.job_type}
+    if job.company_id:
+        keys.add(f'co:{job.company_id}')
+    for token in job_tokens(job):
+        keys.update('kw:' + token[:length] for length in range(1, min(len(token), ANCHOR_LENGTH) + 1))
+    # Location filters match any substring
+    location = job.location.lower()
+    for start in range(len(location)):
+        for end in range(start + 1, min(start + ANCHOR_LENGTH, len(location)) + 1):
+            keys.add('loc:' + location[start:end])
+    return keys
+
+
+def search_criteria(search):
+    """A saved search as search_cache criteria"""
+    criteria = normalize_criteria({
+        'query': search.query,
+        'job_type': search.job_type,
+        'experience_level': search.experience_level,
+        'location': search.location,
+    })
+    criteria['company'] = search.company_id
+    return criteria
+
+
+def matching_searches(job):
+    """The active saved searches ``job`` matches"""
+    if not job.is_active:
+        return []
+    keys = sorted(job_keys(job))
+    # Each search has a single anchor, so no search comes up in two batches
+    return [
+        search
+        for start in range(0, len(keys), ANCHOR_BATCH_SIZE)
+        for search in SavedSearch.objects.filter(anchor__in=keys[start:start + ANCHOR_BATCH_SIZE], is_active=True)
+        if job_matches(job, search_criteria(search))
+    ]
+
+
+def job_saved(job):
+    """Queue alerts for the saved searches a new or edited job now matches"""
+    searches = matching_searches(job)
+    if searches:
+        # An edited job that already matched keeps its single alert
+        JobAlert.objects.bulk_create(
+            [JobAlert(saved_search=search, job=job) for search in searches],
+            ignore_conflicts=True
+        )
+
+
+def _pending_alerts():
+    return (
+        JobAlert.objects.filter(sent_at__isnull=True)
+        .select_related('saved_search__user', 'job__company')
+        .order_by('saved_search__user_id', 'saved_search_id', '-job__created_at')
+    )
+
+
+def _digest(user, alerts):
+    """One email listing the new jobs of every saved search of a user"""
+    limit = getattr(settings, 'JOB_ALERT_MAX_JOBS', 10)
+    site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+    by_search = defaultdict(list)
+    for alert in alerts:
+        by_search[alert.saved_search].append(alert.job)
+
+    lines = [f"Hi {user.get_full_name() or user.username},", '']
+    for search, jobs in by_search.items():
+        lines.append(f"{search.name} - {len(jobs)} new job{'s' if len(jobs) != 1 else ''}")
+        for job in jobs[:limit]:
+            company = job.company.name if job.company_id else job.company_name
+            lines.append(f"  {job.title} at {company}, {job.location}")
+            lines.append(f"  {site_url}{job.get_absolute_url()}")
+        if len(jobs) > limit:
+            lines.append(f"  See all: {site_url}{search.get_absolute_url()}")
+        lines.append('')
+
+    count = len({alert.job_id for alert in alerts})
+    return EmailMessage(
+        subject=f"{count} new job{'s' if count != 1 else ''} for your saved searches",
+        body='\n'.join(lines),
+        to=[user.email],
+    )
+
+
+def _deliver(connection, messages, alert_ids):
+    if messages:
+        connection.send_messages(messages)
+    JobAlert.objects.filter(pk__in=alert_ids).update(sent_at=timezone.now())
+    return len(messages)
+
+
+def send_digests():
+    """Email every pending alert as one digest per user; returns the number of digests sent"""
+    # Alerts of jobs or searches deactivated since are dropped, so a
+    # reactivated job alerts again
+    JobAlert.objects.filter(sent_at__isnull=True).filter(
+        Q(saved_search__is_active=False) | Q(job__is_active=False)
+    ).delete()
+
+    connection = get_connection()
+    sent = 0
+    messages, alert_ids = [], []
+    alerts = _pending_alerts().iterator(chunk_size=2000)
+    for user_id, user_alerts in groupby(alerts, key=lambda alert: alert.saved_search.user_id):
+        user_alerts = list(user_alerts)
+        user = user_alerts[0].saved_search.user
+        if user.email:
+            messages.append(_digest(user, user_alerts))
+        alert_ids.extend(alert.pk for alert in user_alerts)
+        if len(messages) >= DIGEST_BATCH_SIZE or len(alert_ids) >= MAX_ALERT_IDS:
+            sent += _deliver(connection, messages, alert_ids)
+            messages, alert_ids = [], []
+    return sent + _deliver(connection, messages, alert_ids)
@@ -0,0 +1,45 @@
+"""
+allauth's account middleware, able to run in an async middleware chain.
+
+allauth's own ``AccountMiddleware`` is sync only, and one sync middleware
+makes Django run every request under ASGI through a worker thread, async
+view or not.  This subclass is both sync and async capable.  allauth
+refuses to start without its middleware listed, so ``AccountConfig``
+checks for this one instead.  Settings swap both in for allauth's own
+only when ``ASYNC_VIEWS`` is on; otherwise allauth runs unchanged.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from allauth.account.apps import AccountConfig as BaseAccountConfig
+from allauth.account.middleware import AccountMiddleware as BaseAccountMiddleware
+from allauth.core import context
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class AccountMiddleware(BaseAccountMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        with context.request_context(request):
+            response = await self.get_response(request)
+            # Reads the session, which may query the database
+            await sync_to_async(self._remove_dangling_login)(request, response)
+            return response
+
+
+class AccountConfig(BaseAccountConfig):
+    def ready(self):
+        required_mw = 'jobs.allauth_async.AccountMiddleware'
+        if required_mw not in settings.MIDDLEWARE:
+            raise ImproperlyConfigured(f"{required_mw} must be added to settings.MIDDLEWARE")
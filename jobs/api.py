@@ -0,0 +1,243 @@
+"""
+Read only JSON API for jobs and companies, version 1.
+
+::
+
+    GET /api/v1/jobs/?fields=id,title,location&limit=50&cursor=...
+    GET /api/v1/jobs/<id>/
+    GET /api/v1/companies/
+    GET /api/v1/companies/<slug>/
+
+``?fields=`` picks the attributes of each result from the resource's
+whitelist; without it a default set is returned that leaves out the
+long text columns.  Only the columns behind the requested fields are
+selected, and rows come from ``values_list()`` straight into dicts, so no
+model instances are built.  Listings are keyset paginated with the
+cursors of jobs.pagination: each response carries the ``next`` URL, or
+null on the last page.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+
+from .models import Company, Job
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, rows_after
+from .query_budget import query_budget
+
+
+class APIError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+@lru_cache(maxsize=None)
+def _url_format(name, kwarg, placeholder):
+    # Reverse once with a placeholder, then format per row
+    return reverse(name, kwargs={kwarg: placeholder}).replace(str(placeholder), '{}')
+
+
+def _file_url(name):
+    return default_storage.url(name) if name else None
+
+
+class Resource:
+    """
+    One API resource: ``fields`` maps each public field name to its column
+    (a lookup path, joined only when asked for) and an optional converter
+    applied to the value.
+    """
+
+    def __init__(self, queryset, fields, default_fields, ordering, filters=()):
+        self.queryset = queryset
+        self.fields = fields
+        self.default_fields = default_fields
+        self.ordering = list(ordering)
+        self.filters = filters
+
+    def selected_fields(self, request):
+        requested = request.GET.get('fields')
+        if not requested:
+            return list(self.default_fields)
+        names = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise APIError(f"Unknown fields: {', '.join(unknown) or requested}. Available: {', '.join(self.fields)}")
+        return names
+
+    def filtered(self, request):
+        queryset = self.queryset
+        for param, lookup in self.filters:
+            value = request.GET.get(param)
+            if value:
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+    def serialize(self, rows, names):
+        converters = [(index, self.fields[name][1]) for index, name in enumerate(names) if self.fields[name][1]]
+        results = []
+        for row in rows:
+            if converters:
+                row = list(row)
+                for index, convert in converters:
+                    row[index] = convert(row[index])
+            results.append(dict(zip(names, row)))
+        return results
+
+    def list(self, request):
+        names = self.selected_fields(request)
+        limit = _page_size(request)
+        queryset = self.filtered(request).order_by(*self.ordering)
+
+        token = request.GET.get('cursor')
+        if token:
+            try:
+                direction, values = decode_cursor(token, queryset.model, self.ordering)
+            except InvalidCursor:
+                raise APIError('Invalid cursor')
+            if direction != 'next':
+                raise APIError('Invalid cursor')
+            queryset = queryset.filter(rows_after(self.ordering, values))
+
+        # The sort key rides along at the end of each row for the next cursor
+        keys = [field.lstrip('-') for field in self.ordering]
+        columns = [self.fields[name][0] for name in names] + keys
+        rows = list(queryset.values_list(*columns)[:limit + 1])
+
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            query = request.GET.copy()
+            query['cursor'] = encode_cursor('next', list(rows[-1][-len(keys):]))
+            next_url = f"{request.path}?{query.urlencode()}"
+        return {
+            'results': self.serialize(rows, names),
+            'next': next_url,
+        }
+
+    def detail(self, request, **lookup):
+        names = self.selected_fields(request)
+        columns = [self.fields[name][0] for name in names]
+        rows = list(self.queryset.filter(**lookup).values_list(*columns)[:1])
+        if not rows:
+            raise APIError('Not found', status=404)
+        return self.serialize(rows, names)[0]
+
+
+def _page_size(request):
+    default = getattr(settings, 'API_PAGE_SIZE', 50)
+    maximum = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+    try:
+        limit = int(request.GET.get('limit', default))
+    except ValueError:
+        raise APIError('limit must be an integer')
+    if limit < 1:
+        raise APIError('limit must be positive')
+    return min(limit, maximum)
+
+
+def _job_url(pk):
+    return _url_format('job_detail', 'pk', 987654321).format(pk)
+
+
+def _company_url(slug):
+    return _url_format('company_detail', 'slug', 'company-slug-placeholder').format(slug)
+
+
+jobs = Resource(
+    Job.objects.filter(is_active=True),
+    fields={
+        'id': ('id', None),
+        'url': ('id', _job_url),
+        'title': ('title', None),
+        'company': ('company_id', None),
+        'company_name': ('company_name', None),
+        'company_slug': ('company__slug', None),
+        'location': ('location', None),
+        'latitude': ('latitude', None),
+        'longitude': ('longitude', None),
+        'description': ('description', None),
+        'requirements': ('requirements', None),
+        'salary_min': ('salary_min', None),
+        'salary_max': ('salary_max', None),
+        'job_type': ('job_type', None),
+        'experience_level': ('experience_level', None),
+        'applications_count': ('applications_count', None),
+        'created_at': ('created_at', None),
+        'updated_at': ('updated_at', None),
+    },
+    default_fields=(
+        'id', 'url', 'title', 'company', 'company_name', 'location', 'salary_min', 'salary_max',
+        'job_type', 'experience_level', 'created_at', 'updated_at',
+    ),
+    ordering=('-created_at', '-id'),
+    filters=(
+        ('company', 'company__slug'),
+        ('job_type', 'job_type'),
+        ('experience_level', 'experience_level'),
+    ),
+)
+
+companies = Resource(
+    Company.objects.all(),
+    fields={
+        'id': ('id', None),
+        'url': ('slug', _company_url),
+        'name': ('name', None),
+        'slug': ('slug', None),
+        'description': ('description', None),
+        'industry': ('industry', None),
+        'website': ('website', None),
+        'logo': ('logo', _file_url),
+        'founded_year': ('founded_year', None),
+        'employee_count': ('employee_count', None),
+        'headquarters': ('headquarters', None),
+        'is_verified': ('is_verified', None),
+        'active_jobs_count': ('active_jobs_count', None),
+        'created_at': ('created_at', None),
+        'updated_at': ('updated_at', None),
+    },
+    default_fields=(
+        'id', 'url', 'name', 'slug', 'industry', 'website', 'logo', 'headquarters',
+        'is_verified', 'active_jobs_count',
+    ),
+    ordering=('name', 'id'),
+    filters=(
+        ('industry', 'industry'),
+    ),
+)
+
+
+def _respond(build, *args, **kwargs):
+    try:
+        return JsonResponse(build(*args, **kwargs))
+    except APIError as exc:
+        return JsonResponse({'error': str(exc)}, status=exc.status)
+
+
+@require_safe
+@query_budget(1)
+def job_list(request):
+    return _respond(jobs.list, request)
+
+
+@require_safe
+@query_budget(1)
+def job_detail(request, pk):
+    return _respond(jobs.detail, request, pk=pk)
+
+
+@require_safe
+@query_budget(1)
+def company_list(request):
+    return _respond(companies.list, request)
+
+
+@require_safe
+@query_budget(1)
+def company_detail(request, slug):
+    return _respond(companies.detail, request, slug=slug)
@@ -0,0 +1,167 @@
+"""
+Keyword search over applications, for employers.
+
+On SQLite the resume text and cover letter of every indexed application
+live in an FTS5 table (``jobs_application_fts``) whose rowid is the
+application id, created by migration 0011.  Searches join it to the
+applications of the employer's jobs, best matches first; other database
+backends fall back to ``icontains`` filters.
+
+Extracting text is too slow for the request path, so ``apply_to_job``
+only saves the application, with ``text_indexed`` off.  The
+``index_applications`` command picks unindexed applications up in id
+order, batch by batch, and extracts their resumes in a process pool
+(jobs.extract).  A resume is stored once for every application naming it
+(jobs.resumes), and so its text is extracted once and kept on its
+``ResumeBlob``.  The batch's match scores are computed from the same
+text (jobs.matching).  Each batch commits its rows, scores and flags
+together, so the command can stop at any point and pick up where it
+left off, and the same loop backfills the applications that were there
+before the index.  A new resume clears the flag again, as do the edits
+that change match scores.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .extract import extract_text
+from .models import Application, ResumeBlob
+from .resumes import storage
+from .search import build_match_query
+from . import matching
+
+
+FTS_TABLE = 'jobs_application_fts'
+
+# Control characters around the matched terms of a snippet, which no
+# extracted or typed text contains
+MARK_START = '\x02'
+
+MARK_END = '\x03'
+
+UNKNOWN = object()
+
+
+def is_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def _max_length():
+    return getattr(settings, 'RESUME_TEXT_MAX_LENGTH', 100000)
+
+
+def application_saved(application, created):
+    """Queue an application for indexing again when its resume changes"""
+    name = application.resume.name or None
+    previous = getattr(application, '_indexed_resume', UNKNOWN)
+    if not created and previous is not UNKNOWN and previous != name:
+        Application.objects.filter(pk=application.pk).update(text_indexed=False)
+        application.text_indexed = False
+    application._indexed_resume = name
+
+
+def remove_application(application_id):
+    """Drop an application from the index"""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [application_id])
+
+
+def pending(batch_size, after=0):
+    """The next unindexed applications after id ``after``"""
+    return list(
+        Application.objects.filter(text_indexed=False, pk__gt=after)
+        .order_by('pk')
+        .values_list('pk', 'resume', 'cover_letter', 'job_id', 'applicant__profile__bio')[:batch_size]
+    )
+
+
+def resume_texts(names, pool):
+    """{resume name: text} for ``names``, extracting in ``pool`` the ones never extracted; also returns the failures"""
+    texts = dict(ResumeBlob.objects.filter(name__in=names, text_extracted=True).values_list('name', 'text'))
+    missing = sorted(set(names) - set(texts))
+    paths = [storage.path(name) for name in missing]
+    failed = 0
+    for name, text in zip(missing, pool.map(extract_text, paths, [_max_length()] * len(paths))):
+        if text is None:
+            failed += 1
+            text = ''
+        texts[name] = text
+        ResumeBlob.objects.filter(name=name).update(text=text, text_extracted=True)
+    return texts, failed
+
+
+def index_batch(rows, pool):
+    """Index the ``pending()`` rows, extracting their resumes in ``pool``; returns the unreadable resumes"""
+    if not rows:
+        return 0
+    texts, failed = resume_texts({resume for _, resume, *_ in rows if resume}, pool)
+    with transaction.atomic():
+        if is_enabled():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(rows))})',
+                    [pk for pk, *_ in rows],
+                )
+                cursor.executemany(
+                    f'INSERT INTO {FTS_TABLE} (rowid, resume, cover_letter) VALUES (%s, %s, %s)',
+                    [(pk, texts.get(resume, ''), cover_letter) for pk, resume, cover_letter, *_ in rows],
+                )
+        matching.score_batch(rows, texts)
+        by_resume = {}
+        for pk, resume, *_ in rows:
+            by_resume.setdefault(resume, []).append(pk)
+        for resume, ids in by_resume.items():
+            # An application that got another resume meanwhile stays queued
+            Application.objects.filter(pk__in=ids, resume=resume).update(text_indexed=True)
+    return failed
+
+
+def highlight(snippet):
+    """A search snippet as HTML, its matched terms in ``<mark>``"""
+    return mark_safe(escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def plain(snippet):
+    return snippet.replace(MARK_START, '').replace(MARK_END, '')
+
+
+def rebuild_index():
+    """Queue every application for indexing again"""
+    if is_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    Application.objects.update(text_indexed=False)
+
+
+def search(employer, query, job=None, limit=50):
+    """
+    Applications to ``employer``'s jobs (or to ``job``) matching
+    ``query``, best first, each with a snippet whose matched terms are
+    wrapped in ``MARK_START``/``MARK_END`` (see ``highlight()``).
+    """
+    applications = Application.objects.filter(job__posted_by=employer)
+    if job is not None:
+        applications = applications.filter(job=job)
+
+    if not is_enabled():
+        resume_matches = ResumeBlob.objects.filter(name=OuterRef('resume'), text__icontains=query)
+        applications = applications.filter(Q(cover_letter__icontains=query) | Exists(resume_matches))
+        return [(application, '') for application in applications.select_related('job', 'applicant')[:limit]]
+
+    match = build_match_query(query)
+    if not match:
+        return []
+    scope, params = applications.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, snippet({FTS_TABLE}, -1, %s, %s, '...', 16) FROM {FTS_TABLE} "
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid IN ({scope}) ORDER BY rank LIMIT %s',
+            [MARK_START, MARK_END, match, *params, limit],
+        )
+        ranked = cursor.fetchall()
+    matches = Application.objects.select_related('job', 'applicant').in_bulk([pk for pk, _ in ranked])
+    return [(matches[pk], snippet) for pk, snippet in ranked if pk in matches]
@@ -0,0 +1,147 @@
+"""
+Validators for conditional GET.
+
+The detail pages and the search endpoint are wrapped in Django's
+``condition`` decorator with the functions below, so a client holding a
+current copy gets ``304 Not Modified`` before the view or any template
+runs.  Each page's validators come from one small query, made once per
+request even though ``condition`` asks for the ETag and Last-Modified
+separately.
+
+Timestamps miss changes that do not touch them (a new application bumps
+a job's counter, not its ``updated_at``), so those counters go into the
+ETag, which clients send and Django checks before ``If-Modified-Since``.
+The page ETags also cover who is asking, as the navbar and apply buttons
+differ per user, and requests with flash messages to show are never
+answered 304.
+
+Django's ``condition`` decorator only wraps sync views; async views use
+``async_condition``, which runs the same validator functions in the
+request's worker thread.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.db.models import Count, DateTimeField, F, Func, IntegerField, OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Company, CompanyGallery, Job
+
+
+def _viewer(request):
+    if len(messages.get_messages(request)):
+        return None
+    return request.user.pk if request.user.is_authenticated else 0
+
+
+def _validators(request, compute, *args, personal=True):
+    """(etag, last_modified) for this request, computed on first use"""
+    if not hasattr(request, '_validators'):
+        request._validators = (None, None)
+        viewer = _viewer(request) if personal else 0
+        row = compute(*args) if viewer is not None else None
+        if row is not None:
+            last_modified = max(
+                (value for key, value in row.items() if key.startswith('latest') and value), default=None
+            )
+            payload = repr((viewer, sorted(row.items())))
+            request._validators = (hashlib.md5(payload.encode()).hexdigest(), last_modified)
+    return request._validators
+
+
+def _job_row(pk):
+    return Job.objects.filter(pk=pk).values(
+        'applications_count', latest=F('updated_at')
+    ).first()
+
+
+def _company_row(slug):
+    jobs = Job.objects.filter(company=OuterRef('pk'))
+    images = CompanyGallery.objects.filter(company=OuterRef('pk'))
+    return Company.objects.filter(slug=slug).values(
+        'active_jobs_count',
+        latest=F('updated_at'),
+        latest_job=Subquery(jobs.order_by('-updated_at').values('updated_at')[:1]),
+        latest_image=Subquery(images.order_by('-created_at').values('created_at')[:1]),
+        images=Subquery(images.values('company').annotate(count=Count('pk')).values('count')),
+    ).first()
+
+
+def _search_row():
+    # Every edit or (de)activation moves the newest updated_at; deletes
+    # move the stored active job counts, renames the company timestamps
+    companies = Company.objects.order_by()
+    return Job.objects.order_by('-updated_at').values(
+        latest=F('updated_at'),
+        latest_company=Subquery(companies.values(
+            latest=Func('updated_at', function='MAX', output_field=DateTimeField())
+        )),
+        active_jobs=Subquery(companies.values(
+            total=Func('active_jobs_count', function='SUM', output_field=IntegerField())
+        )),
+    ).first()
+
+
+def job_etag(request, pk):
+    return _validators(request, _job_row, pk)[0]
+
+
+def job_last_modified(request, pk):
+    return _validators(request, _job_row, pk)[1]
+
+
+def company_etag(request, slug):
+    return _validators(request, _company_row, slug)[0]
+
+
+def company_last_modified(request, slug):
+    return _validators(request, _company_row, slug)[1]
+
+
+def search_etag(request):
+    # Typeahead suggestions come from memory; validating them would cost more
+    if request.GET.get('suggest'):
+        return None
+    etag = _validators(request, _search_row, personal=False)[0]
+    if etag is None:
+        return None
+    return hashlib.md5(f"{etag}:{request.GET.urlencode()}".encode()).hexdigest()
+
+
+def search_last_modified(request):
+    if request.GET.get('suggest'):
+        return None
+    return _validators(request, _search_row, personal=False)[1]
+
+
+def _evaluate(request, etag_func, last_modified_func, args, kwargs):
+    etag = etag_func(request, *args, **kwargs)
+    last_modified = last_modified_func(request, *args, **kwargs)
+    return (
+        quote_etag(etag) if etag is not None else None,
+        int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def async_condition(etag_func, last_modified_func):
+    """Django's ``condition`` decorator for async views"""
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag, last_modified = await sync_to_async(_evaluate)(
+                request, etag_func, last_modified_func, args, kwargs
+            )
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return inner
+    return decorator
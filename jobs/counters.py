@@ -0,0 +1,163 @@
+"""
+Stored application and job counters.
+
+``Job`` keeps its number of applications, in total and per status, and
+``Company`` its number of active jobs, so listings render counts without
+a ``COUNT(*)`` per row.  The signal handlers in models.py adjust them
+with single ``UPDATE ... SET n = n + 1`` statements, which stay correct
+under concurrent requests, and bump the site totals in jobs.stats.
+
+Ordinary saves of an existing row leave these columns out
+(``save_kwargs()``), so an instance loaded before an application came
+in cannot write its stale counts back over the ``F()`` updates.
+
+To know what an edit changed, instances remember the state they were
+counted in (``_counted_status`` and ``_counted_state``), taken when
+loaded from the database and after every save.  Bulk status changes
+(jobs.triage) count their moves with ``applications_moved()``; other
+writes that bypass signals, like ``QuerySet.update()``, leave the
+counters to drift until ``reconcile()`` (the ``reconcile_counters``
+command) recomputes them.
+"""
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from . import stats
+
+
+BATCH_SIZE = 2000
+
+UNKNOWN = object()
+
+
+def status_field(status):
+    return f'applications_{status}'
+
+
+def save_kwargs(instance, kwargs):
+    """``Model.save()`` keyword arguments that keep a save of an existing row off its counter columns"""
+    if instance._state.adding or kwargs.get('force_insert') or kwargs.get('update_fields') is not None:
+        return kwargs
+    deferred = instance.get_deferred_fields()
+    return dict(kwargs, update_fields=[
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.attname not in deferred and field.name not in instance.COUNTER_FIELDS
+    ])
+
+
+def _adjust(queryset, **deltas):
+    # Decrements stop at zero so drifted counters never break a delete
+    queryset.update(**{
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+
+
+def application_saved(application, created):
+    from .models import Job
+    previous = None if created else getattr(application, '_counted_status', UNKNOWN)
+    if created:
+        _adjust(Job.objects.filter(pk=application.job_id), applications_count=1, **{status_field(application.status): 1})
+        stats.adjust('applications', 1)
+    elif previous is not UNKNOWN and previous != application.status:
+        _adjust(Job.objects.filter(pk=application.job_id), **{
+            status_field(previous): -1,
+            status_field(application.status): 1,
+        })
+    application._counted_status = application.status
+
+
+def applications_moved(job_id, previous, status):
+    """Count applications of a job moved to ``status`` from ``previous``, {status: how many}, in one UPDATE"""
+    from .models import Job
+    deltas = {status_field(old): -count for old, count in previous.items() if old != status}
+    if deltas:
+        deltas[status_field(status)] = -sum(deltas.values())
+        _adjust(Job.objects.filter(pk=job_id), **deltas)
+
+
+def application_deleted(application):
+    from .models import Job
+    status = getattr(application, '_counted_status', application.status)
+    _adjust(Job.objects.filter(pk=application.job_id), applications_count=-1, **{status_field(status): -1})
+    stats.adjust('applications', -1)
+
+
+def counted_state(job):
+    """Whether ``job`` counts as active, and for which company"""
+    return job.is_active, job.company_id
+
+
+def job_saved(job, created):
+    from .models import Company
+    previous = (False, None) if created else getattr(job, '_counted_state', UNKNOWN)
+    current = counted_state(job)
+    if previous is not UNKNOWN and previous != current:
+        was_active, previous_company_id = previous
+        if was_active != job.is_active:
+            stats.adjust('jobs', 1 if job.is_active else -1)
+        if was_active and previous_company_id is not None:
+            _adjust(Company.objects.filter(pk=previous_company_id), active_jobs_count=-1)
+        if job.is_active and job.company_id is not None:
+            _adjust(Company.objects.filter(pk=job.company_id), active_jobs_count=1)
+    job._counted_state = current
+
+
+def job_deleted(job):
+    from .models import Company
+    is_active, company_id = getattr(job, '_counted_state', counted_state(job))
+    if is_active:
+        stats.adjust('jobs', -1)
+        if company_id is not None:
+            _adjust(Company.objects.filter(pk=company_id), active_jobs_count=-1)
+
+
+def reconcile(job_model=None, application_model=None, company_model=None):
+    """Recompute every counter, writing only the drifted rows; returns how many were fixed"""
+    from .models import Application, Company, Job
+    job_model = job_model or Job
+    application_model = application_model or Application
+    company_model = company_model or Company
+    statuses = [status for status, _ in Application.STATUS_CHOICES]
+    fields = ['applications_count'] + [status_field(status) for status in statuses]
+    fixed = 0
+
+    # Jobs, one id range at a time
+    last_id = 0
+    while True:
+        jobs = list(job_model.objects.filter(pk__gt=last_id).order_by('pk').only(*fields)[:BATCH_SIZE])
+        if not jobs:
+            break
+        last_id = jobs[-1].pk
+        counts = {
+            row['job_id']: row
+            for row in application_model.objects.filter(job_id__gte=jobs[0].pk, job_id__lte=last_id)
+            .values('job_id')
+            .annotate(
+                applications_count=Count('pk'),
+                **{status_field(status): Count('pk', filter=Q(status=status)) for status in statuses}
+            )
+        }
+        drifted = []
+        for job in jobs:
+            actual = counts.get(job.pk, {})
+            if any(getattr(job, field) != actual.get(field, 0) for field in fields):
+                for field in fields:
+                    setattr(job, field, actual.get(field, 0))
+                drifted.append(job)
+        job_model.objects.bulk_update(drifted, fields)
+        fixed += len(drifted)
+
+    # Companies are few enough for one pass
+    active = dict(
+        job_model.objects.filter(is_active=True, company__isnull=False)
+        .values_list('company_id')
+        .annotate(Count('pk'))
+    )
+    drifted = []
+    for company in company_model.objects.only('active_jobs_count'):
+        if company.active_jobs_count != active.get(company.pk, 0):
+            company.active_jobs_count = active.get(company.pk, 0)
+            drifted.append(company)
+    company_model.objects.bulk_update(drifted, ['active_jobs_count'], batch_size=BATCH_SIZE)
+    return fixed + len(drifted)
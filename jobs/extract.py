@@ -0,0 +1,110 @@
+"""
+Plain text out of resume files, for the applicant search index.
+
+This runs in the worker processes of the ``index_applications`` command
+and imports nothing from Django, so a worker only loads this module.
+
+DOCX is read with the standard library: the text runs of
+``word/document.xml``.  PDF goes through pypdf when it is installed;
+without it, the strings drawn by the text operators of each compressed
+content stream are decoded directly, which covers resumes exported by
+word processors with standard fonts but not those whose fonts are
+subset and re-encoded.  Other formats give no text.
+"""
+import os
+import re
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+
+# Literal strings, array brackets, numbers and operators of a content stream
+TOKEN_RE = re.compile(rb'\((?:\\.|[^\\)])*\)|\[|\]|-?\d*\.?\d+|[A-Za-z\'"*]+')
+
+ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+ESCAPE_RE = re.compile(rb'\\([0-7]{1,3}|\r?\n|.)', re.S)
+
+# A TJ adjustment at least this wide (thousandths of an em) is a word gap
+WORD_GAP = 200
+
+
+def extract_text(path, max_length):
+    """Whitespace normalized text of the file at ``path``, '' if it has none, None if it is unreadable"""
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension == '.pdf':
+            text = _pdf_text(path)
+        elif extension == '.docx':
+            text = _docx_text(path)
+        else:
+            return ''
+    except Exception:
+        return None
+    return ' '.join(text.split())[:max_length]
+
+
+def _docx_text(path):
+    parts = []
+    with zipfile.ZipFile(path) as docx, docx.open('word/document.xml') as document:
+        for event, element in ElementTree.iterparse(document, events=('end',)):
+            if element.tag == WORD_NS + 't':
+                parts.append(element.text or '')
+            elif element.tag in (WORD_NS + 'tab', WORD_NS + 'br'):
+                parts.append(' ')
+            elif element.tag == WORD_NS + 'p':
+                parts.append('\n')
+                element.clear()
+    return ''.join(parts)
+
+
+def _pdf_text(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        with open(path, 'rb') as f:
+            return _pdf_stream_text(f.read())
+    return '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+
+
+def _pdf_stream_text(data):
+    lines = []
+    for match in STREAM_RE.finditer(data):
+        try:
+            stream = zlib.decompress(match.group(1))
+        except zlib.error:
+            stream = match.group(1)
+        if b'BT' in stream and (b'Tj' in stream or b'TJ' in stream):
+            lines.append(_content_text(stream))
+    return '\n'.join(lines)
+
+
+def _content_text(stream):
+    words, pending = [], []
+    for token in TOKEN_RE.findall(stream):
+        if token.startswith(b'('):
+            pending.append(_unescape(token[1:-1]))
+        elif token[:1].isdigit() or token[:1] in b'-.':
+            if pending and float(token) <= -WORD_GAP:
+                pending.append(b' ')
+        elif token in (b'Tj', b'TJ', b"'", b'"'):
+            words.append(b''.join(pending))
+            pending = []
+        elif token in (b'Td', b'TD', b'T*', b'ET'):
+            words.append(b'\n')
+    return ' '.join(word.decode('latin-1') for word in words)
+
+
+def _unescape(literal):
+    def replace(match):
+        escape = match.group(1)
+        if escape[:1].isdigit():
+            return bytes([int(escape, 8) & 0xFF])
+        if escape in (b'\n', b'\r\n'):
+            return b''
+        return ESCAPES.get(escape, escape)
+    return ESCAPE_RE.sub(replace, literal)
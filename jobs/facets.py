@@ -0,0 +1,129 @@
+"""
+Facet counts for the job search filters.
+
+Each facet is counted over the search results with every *other*
+selected filter applied, so the counts next to a filter stay meaningful
+when the user switches or widens that filter.  The choice facets
+(job type and experience level) share one aggregate of conditional
+counts; company and location each get their own GROUP BY, cut to the
+top ``limit`` values in the database, so an unfiltered listing never
+pulls a row per job into Python.
+"""
+from django.db.models import Count, Q
+
+from .models import Job
+
+
+FACET_FIELDS = ['job_type', 'experience_level', 'company', 'location']
+
+FACET_LABELS = {
+    'job_type': 'Job Type',
+    'experience_level': 'Experience',
+    'company': 'Company',
+    'location': 'Location',
+}
+
+# Facets with a fixed set of values, counted with conditional aggregates
+CHOICE_FACETS = {
+    'job_type': Job.JOB_TYPE_CHOICES,
+    'experience_level': Job.EXPERIENCE_LEVEL_CHOICES,
+}
+
+
+def selected_filters(cleaned_data):
+    """Pick the facet filters out of JobSearchForm.cleaned_data"""
+    company = cleaned_data.get('company')
+    return {
+        'job_type': cleaned_data.get('job_type') or '',
+        'experience_level': cleaned_data.get('experience_level') or '',
+        'company': company.pk if company else None,
+        'location': cleaned_data.get('location') or '',
+    }
+
+
+def filter_conditions(selected, skip=None):
+    """The selected facet filters, except ``skip``, as one Q for a Job queryset"""
+    condition = Q()
+    if selected.get('job_type') and skip != 'job_type':
+        condition &= Q(job_type=selected['job_type'])
+
+    if selected.get('experience_level') and skip != 'experience_level':
+        condition &= Q(experience_level=selected['experience_level'])
+
+    if selected.get('location') and skip != 'location':
+        condition &= Q(location__icontains=selected['location'])
+
+    if selected.get('company') and skip != 'company':
+        condition &= Q(company_id=selected['company'])
+
+    return condition
+
+
+def apply_filters(queryset, selected):
+    """Apply the selected facet filters to a Job queryset"""
+    return queryset.filter(filter_conditions(selected))
+
+
+def _choice_counts(queryset, selected):
+    """Counts for every job type and experience level, in one query"""
+    aggregates = {}
+    for field, choices in CHOICE_FACETS.items():
+        others = filter_conditions(selected, skip=field)
+        for value, _label in choices:
+            aggregates[f'{field}__{value}'] = Count('pk', filter=others & Q(**{field: value}))
+    totals = queryset.order_by().aggregate(**aggregates)
+    return {
+        field: [(value, label, totals[f'{field}__{value}']) for value, label in choices]
+        for field, choices in CHOICE_FACETS.items()
+    }
+
+
+def _top_counts(queryset, selected, field, label_field, limit):
+    """The ``limit`` most common values of ``field`` as (value, label, count)"""
+    rows = (
+        queryset.order_by()
+        .filter(filter_conditions(selected, skip=field))
+        .exclude(**{f'{field}__isnull': True})
+        .values_list(field, label_field)
+        .annotate(total=Count('pk'))
+        .order_by('-total', label_field)[:limit]
+    )
+    return [(value, label, total) for value, label, total in rows if value]
+
+
+def compute_facets(queryset, selected, params=None, limit=10):
+    """
+    Return facet groups for ``queryset`` (the results before facet filters).
+
+    ``params`` is the request's QueryDict; when given, every option carries a
+    ``url`` that sets (or clears, if already selected) that filter.
+    """
+    counts = _choice_counts(queryset, selected)
+    counts['company'] = _top_counts(queryset, selected, 'company', 'company__name', limit)
+    counts['location'] = _top_counts(queryset, selected, 'location', 'location', limit)
+
+    groups = []
+    for field in FACET_FIELDS:
+        options = []
+        for value, label, count in counts[field]:
+            is_selected = value == selected.get(field)
+            options.append({
+                'value': value,
+                'label': label,
+                'count': count,
+                'selected': is_selected,
+                'url': _option_url(params, field, value, is_selected) if params is not None else '',
+            })
+        groups.append({'name': field, 'label': FACET_LABELS[field], 'options': options})
+    return groups
+
+
+def _option_url(params, field, value, is_selected):
+    query = params.copy()
+    query.pop('page', None)
+    query.pop('cursor', None)
+    if is_selected:
+        query.pop(field, None)
+    else:
+        query[field] = value
+    return '?' + query.urlencode()
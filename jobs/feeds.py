@@ -0,0 +1,172 @@
+"""
+Bulk feeds of the active jobs for aggregators.
+
+Two formats, both produced as a stream of chunks:
+
+- ``jsonl``: one JSON object per job per line.
+- ``xml``: the ``<source><job>...</job></source>`` layout that Indeed and
+  Google style job board crawlers read.
+
+Jobs are read in primary key batches of ``JOB_FEED_BATCH_SIZE`` rows with
+``values()``, joined to their company, so memory stays the same however
+many jobs there are and no transaction is held open between batches.
+``gzip_stream()`` compresses the chunks as they are produced.  The
+``/feeds/jobs.jsonl`` and ``/feeds/jobs.xml`` views stream them with
+``StreamingHttpResponse``; the ``export_job_feed`` command writes them to
+its stdout or a file.  The XML feed drops characters XML 1.0 forbids,
+which would otherwise make the whole document unreadable to a crawler.
+"""
+import re
+import zlib
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Job
+
+
+FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'xml': 'application/xml; charset=utf-8',
+}
+
+FIELDS = (
+    'id', 'title', 'location', 'description', 'requirements', 'salary_min', 'salary_max',
+    'job_type', 'experience_level', 'created_at', 'updated_at',
+)
+
+# Chunks are gathered up to this size before compressing and sending them
+FLUSH_SIZE = 64 * 1024
+
+# Characters XML 1.0 does not allow anywhere, even escaped or in CDATA,
+# like the control characters pasted job descriptions sometimes carry
+XML_ILLEGAL = re.compile(r'[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]')
+
+
+def iter_jobs(batch_size=None):
+    """Every active job as a dict, with its company, read one batch at a time"""
+    batch_size = batch_size or getattr(settings, 'JOB_FEED_BATCH_SIZE', 500)
+    queryset = Job.objects.filter(is_active=True).order_by('pk').values(
+        *FIELDS,
+        company_display_name=Coalesce(F('company__name'), F('company_name')),
+        company_slug=F('company__slug'),
+        company_website=F('company__website'),
+    )
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last_pk = rows[-1]['id']
+
+
+def _urls(base_url):
+    job_url = base_url + reverse('job_detail', kwargs={'pk': 987654321}).replace('987654321', '{}')
+    company_url = base_url + reverse('company_detail', kwargs={'slug': 'company-slug'}).replace('company-slug', '{}')
+    return job_url, company_url
+
+
+def jsonl(rows, base_url):
+    job_url, company_url = _urls(base_url)
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        slug = row.pop('company_slug')
+        row['url'] = job_url.format(row['id'])
+        row['company'] = {
+            'name': row.pop('company_display_name'),
+            'url': company_url.format(slug) if slug else None,
+            'website': row.pop('company_website') or None,
+        }
+        yield encoder.encode(row) + '\n'
+
+
+def _cdata(value):
+    return '<![CDATA[' + value.replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+
+def _element(tag, value, cdata=True):
+    if value in (None, ''):
+        return ''
+    value = XML_ILLEGAL.sub('', str(value))
+    return f'<{tag}>{_cdata(value) if cdata else escape(value)}</{tag}>'
+
+
+def _city_state(location):
+    city, _, state = location.rpartition(',')
+    if city and 0 < len(state.strip()) <= 3:
+        return city.strip(), state.strip()
+    return location, ''
+
+
+def _salary(row):
+    low, high = row['salary_min'], row['salary_max']
+    if low and high:
+        return f'{low:.0f} - {high:.0f}'
+    return f'{low or high:.0f}' if low or high else ''
+
+
+def xml(rows, base_url):
+    job_url, company_url = _urls(base_url)
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n<source>'
+        f'{_element("publisher", "Job Portal")}'
+        f'{_element("publisherurl", base_url, cdata=False)}'
+        f'{_element("lastBuildDate", timezone.now().strftime("%a, %d %b %Y %H:%M:%S GMT"), cdata=False)}\n'
+    )
+    for row in rows:
+        city, state = _city_state(row['location'])
+        description = row['description']
+        if row['requirements']:
+            description += '\n\nRequirements:\n' + row['requirements']
+        yield (
+            '<job>'
+            + _element('title', row['title'])
+            + _element('date', row['created_at'].strftime('%a, %d %b %Y %H:%M:%S GMT'))
+            + _element('referencenumber', row['id'])
+            + _element('url', job_url.format(row['id']))
+            + _element('company', row['company_display_name'])
+            + _element('companyurl', company_url.format(row['company_slug']) if row['company_slug'] else '')
+            + _element('city', city)
+            + _element('state', state)
+            + _element('description', description)
+            + _element('salary', _salary(row))
+            + _element('jobtype', row['job_type'])
+            + _element('experience', row['experience_level'])
+            + '</job>\n'
+        )
+    yield '</source>\n'
+
+
+def generate(format, base_url, batch_size=None):
+    """The feed in ``format`` as a stream of str chunks"""
+    return (jsonl if format == 'jsonl' else xml)(iter_jobs(batch_size), base_url)
+
+
+def encode(chunks):
+    """Encode ``chunks`` to UTF-8, gathered into pieces of about FLUSH_SIZE bytes"""
+    buffer, size = [], 0
+    for chunk in chunks:
+        data = chunk.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= FLUSH_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
-from .models import Job, Application, Company, CompanyGallery
+from .models import Job, Application, Company, CompanyGallery, SavedSearch
+from .geo import RADIUS_CHOICES, geocode
+from .uploads import LimitedFileField, LimitedImageField, size_limit
 
 
 class JobForm(forms.ModelForm):
@@ -37,6 +39,7 @@ class ApplicationForm(forms.ModelForm):
     class Meta:
         model = Application
         fields = ['resume', 'cover_letter']
+        field_classes = {'resume': LimitedFileField}
         widgets = {
             'cover_letter': forms.Textarea(attrs={
                 'class': 'form-control',
@@ -53,7 +56,7 @@ class ApplicationForm(forms.ModelForm):
         resume = self.cleaned_data.get('resume')
         if resume:
             # Check file size (5MB limit)
-            if resume.size > 5 * 1024 * 1024:
+            if resume.size > size_limit('resume'):
                 raise forms.ValidationError("Resume file size must be less than 5MB.")
             
             # Check file extension
@@ -96,6 +99,83 @@ class JobSearchForm(forms.Form):
         empty_label="All Companies",
         widget=forms.Select(attrs={'class': 'form-select'})
     )
+    near = forms.CharField(
+        required=False,
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Near city (e.g., Austin, TX)'
+        })
+    )
+    salary_from = forms.IntegerField(
+        required=False,
+        min_value=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Salary from'})
+    )
+    salary_to = forms.IntegerField(
+        required=False,
+        min_value=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Salary to'})
+    )
+    sort = forms.ChoiceField(
+        choices=[
+            ('', 'Newest first'),
+            ('relevance', 'Most relevant'),
+            ('salary_desc', 'Highest salary'),
+            ('salary_asc', 'Lowest salary'),
+        ],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    radius = forms.TypedChoiceField(
+        choices=[(km, f'Within {km} km') for km in RADIUS_CHOICES],
+        coerce=int,
+        required=False,
+        empty_value=50,
+        initial=50,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        near = cleaned_data.get('near')
+        cleaned_data['near_point'] = None
+        
+        if near:
+            point = geocode(near)
+            if point is None:
+                self.add_error('near', "Unknown place. Try a city name like 'Austin, TX'.")
+            else:
+                cleaned_data['near_point'] = point
+        
+        salary_from = cleaned_data.get('salary_from')
+        salary_to = cleaned_data.get('salary_to')
+        if salary_from is not None and salary_to is not None and salary_from > salary_to:
+            self.add_error('salary_to', "Maximum salary cannot be less than minimum salary.")
+        
+        # There is nothing to rank by without a query
+        if cleaned_data.get('sort') == 'relevance' and not cleaned_data.get('query'):
+            cleaned_data['sort'] = ''
+        
+        return cleaned_data
+
+
+class SavedSearchForm(forms.ModelForm):
+    """The job list filters an applicant saves for alerts"""
+    class Meta:
+        model = SavedSearch
+        fields = ['name', 'query', 'job_type', 'experience_level', 'company', 'location']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['name'].required = False
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        # Name an unnamed search after its filters
+        if not cleaned_data.get('name'):
+            parts = [cleaned_data.get('query'), cleaned_data.get('location')]
+            cleaned_data['name'] = ' in '.join(part for part in parts if part) or 'All jobs'
+        return cleaned_data
 
 
 class CompanyForm(forms.ModelForm):
@@ -106,6 +186,7 @@ class CompanyForm(forms.ModelForm):
             'founded_year', 'employee_count', 'headquarters', 'contact_email',
             'contact_phone', 'social_media'
         ]
+        field_classes = {'logo': LimitedImageField}
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Company Name'}),
             'slug': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'company-slug'}),
@@ -135,6 +216,7 @@ class CompanyGalleryForm(forms.ModelForm):
     class Meta:
         model = CompanyGallery
         fields = ['image', 'caption', 'is_featured']
+        field_classes = {'image': LimitedImageField}
         widgets = {
             'image': forms.FileInput(attrs={'class': 'form-control'}),
             'caption': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Image caption'}),
@@ -145,7 +227,7 @@ class CompanyGalleryForm(forms.ModelForm):
         image = self.cleaned_data.get('image')
         if image:
             # Check file size (10MB limit)
-            if image.size > 10 * 1024 * 1024:
+            if image.size > size_limit('image'):
                 raise forms.ValidationError("Image file size must be less than 10MB.")
             
             # Check file extension
@@ -0,0 +1,150 @@
+"""
+Typo tolerant search words.
+
+Every word of the titles, company names and locations in the typeahead
+index is also indexed by its character trigrams, padded like pg_trgm
+(``"  p", " py", "pyt", ..., "on "``).  A query word that matches no
+indexed term is replaced by the most similar indexed word, by trigram
+similarity (shared trigrams over all distinct trigrams of both words),
+before the query reaches the full-text filter or the ranking index.
+
+Candidates come from the postings of the query word's rarest trigrams
+only: a word as similar as ``FUZZY_MIN_SIMILARITY`` must share at least
+one of them (prefix filtering), so the common trigrams that most words
+carry are never walked.  The cost depends on the vocabulary, which grows
+far slower than the jobs table, and never on the number of jobs.
+
+Whether query words are known is asked in a single query, one indexed
+range probe per word, and only the first ``MAX_CORRECTED_WORDS`` words
+long enough to correct are looked at, so a long query costs no more
+queries than a short one.
+"""
+import math
+
+from django.conf import settings
+from django.db import connection
+
+from .models import SearchTerm
+from .search import fold, tokenize
+
+
+# Swapping two letters of a six letter word leaves 3 of 11 trigrams shared
+DEFAULT_MIN_SIMILARITY = 0.25
+
+# Shorter words have too few trigrams to tell a typo from another word
+MIN_WORD_LENGTH = 4
+
+# Words of a query checked for typos; later ones are searched as typed
+MAX_CORRECTED_WORDS = 8
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(grams, other):
+    shared = len(grams & other)
+    return shared / (len(grams) + len(other) - shared)
+
+
+class TrigramIndex:
+    """Words by trigram, each with the number of jobs that carry it"""
+
+    def __init__(self):
+        self._words = {}         # word -> [trigrams, job count]
+        self._postings = {}      # trigram -> set of words
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def add(self, word):
+        entry = self._words.get(word)
+        if entry is None:
+            grams = trigrams(word)
+            self._words[word] = [grams, 1]
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(word)
+        else:
+            entry[1] += 1
+
+    def discard(self, word):
+        entry = self._words.get(word)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del self._words[word]
+        for gram in entry[0]:
+            words = self._postings[gram]
+            words.discard(word)
+            if not words:
+                del self._postings[gram]
+
+    def closest(self, word, min_similarity):
+        """The most similar indexed word scoring at least ``min_similarity``, or None"""
+        grams = trigrams(word)
+        # A candidate shares at least `overlap` trigrams, so it has one
+        # among the len(grams) - overlap + 1 rarest
+        overlap = max(math.ceil(min_similarity * len(grams)), 1)
+        rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(grams) - overlap + 1]:
+            candidates.update(self._postings.get(gram, ()))
+
+        best, best_key = None, None
+        for candidate in candidates:
+            other, count = self._words[candidate]
+            score = similarity(grams, other)
+            if score >= min_similarity and (best_key is None or (score, count) > best_key):
+                best, best_key = candidate, (score, count)
+        return best
+
+
+def words(text):
+    """The trigram index words of a title, company name or location"""
+    return {fold(token) for token in tokenize(text)}
+
+
+def known_words(tokens):
+    """The ``tokens`` that some indexed job has a term starting with"""
+    if not tokens:
+        return set()
+    probe = (
+        f'EXISTS(SELECT 1 FROM {SearchTerm._meta.db_table} '
+        f'WHERE term >= %s AND term < %s AND document_count > 0)'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT ' + ', '.join([probe] * len(tokens)),
+            [bound for token in tokens for bound in (token, token + '\U0010ffff')]
+        )
+        row = cursor.fetchone()
+    return {token for token, known in zip(tokens, row) if known}
+
+
+def correct_query(query, closest_word):
+    """
+    Return ``query`` with unknown words replaced by their closest match, or
+    None when nothing needs correcting.
+
+    ``closest_word(word, min_similarity)`` looks a word up in a
+    TrigramIndex, like ``PrefixIndex.closest_word``.
+    """
+    min_similarity = getattr(settings, 'FUZZY_MIN_SIMILARITY', DEFAULT_MIN_SIMILARITY)
+    tokens = [fold(token) for token in tokenize(query)]
+    candidates = [
+        (position, token) for position, token in enumerate(tokens) if len(token) >= MIN_WORD_LENGTH
+    ][:MAX_CORRECTED_WORDS]
+    known = known_words(list({token for position, token in candidates}))
+    corrected = list(tokens)
+    for position, token in candidates:
+        if token in known:
+            continue
+        match = closest_word(token, min_similarity)
+        if match is not None:
+            corrected[position] = match
+    if corrected == tokens:
+        return None
+    return ' '.join(corrected)
@@ -0,0 +1,152 @@
+"""
+Offline geocoding and radius search for job locations.
+
+Job locations are resolved against the bundled gazetteer
+(``jobs/data/gazetteer.csv``) when a job is saved, and stored as
+latitude/longitude plus a geohash.  A radius search picks the geohash
+precision whose cells are at least as large as the radius, turns the
+3x3 block of cells around the centre into index range scans, and then
+refines the candidates with a bounding box and the haversine distance.
+"""
+import csv
+import math
+
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import F, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+EARTH_RADIUS_KM = 6371.0
+
+KM_PER_DEGREE = 111.32
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+GEOHASH_PRECISION = 9
+
+RADIUS_CHOICES = [10, 25, 50, 100, 250, 500]
+
+
+def _normalize(text):
+    return ' '.join(text.lower().replace('.', '').split())
+
+
+@lru_cache(maxsize=1)
+def gazetteer():
+    """Return {(city, region): (lat, lon)} and {city: (lat, lon)} lookups"""
+    by_region, by_city = {}, {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            point = (float(row['latitude']), float(row['longitude']))
+            city = _normalize(row['name'])
+            for region in (row['region'], row['country']):
+                if region:
+                    by_region.setdefault((city, _normalize(region)), point)
+            # The first (largest) city of a name wins unqualified lookups
+            by_city.setdefault(city, point)
+    return by_region, by_city
+
+
+def geocode(location):
+    """Resolve free-text like "Austin, TX" to (lat, lon), or None"""
+    if not location:
+        return None
+    by_region, by_city = gazetteer()
+    parts = [_normalize(part) for part in location.split(',') if part.strip()]
+    if not parts:
+        return None
+    city = parts[0]
+    for region in parts[1:]:
+        point = by_region.get((city, region))
+        if point:
+            return point
+    return by_city.get(city)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            target[0] = middle
+        else:
+            target[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Geohash cell (height, width) in degrees"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Geohash prefixes of the 3x3 block of cells that covers the circle"""
+    lon_scale = max(math.cos(math.radians(latitude)), 0.01)
+    precision = 0
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(candidate)
+        if height * KM_PER_DEGREE < radius_km or width * KM_PER_DEGREE * lon_scale < radius_km:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+
+    height, width = cell_size(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            lat = min(max(latitude + dlat, -90.0), 90.0)
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lon, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def distance_expression(latitude, longitude):
+    """Haversine distance in km from a point to each row's coordinates"""
+    a = (
+        Power(Sin((Radians(F('latitude')) - math.radians(latitude)) / 2), 2) +
+        math.cos(math.radians(latitude)) * Cos(Radians(F('latitude'))) *
+        Power(Sin((Radians(F('longitude')) - math.radians(longitude)) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def filter_within(queryset, latitude, longitude, radius_km):
+    """Restrict a Job queryset to jobs within ``radius_km`` of a point"""
+    cells = covering_cells(latitude, longitude, radius_km)
+    if cells:
+        cell_filter = Q()
+        for cell in cells:
+            cell_filter |= Q(geohash__gte=cell, geohash__lt=cell + '{')
+        queryset = queryset.filter(cell_filter)
+
+    lat_delta = radius_km / KM_PER_DEGREE
+    lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    queryset = queryset.filter(
+        latitude__range=(latitude - lat_delta, latitude + lat_delta),
+        longitude__range=(longitude - lon_delta, longitude + lon_delta),
+    )
+    return queryset.alias(distance=distance_expression(latitude, longitude)).filter(distance__lte=radius_km)
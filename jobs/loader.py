@@ -0,0 +1,191 @@
+"""
+Request scoped identity map and batch loader.
+
+While a request is being handled, every Job, Company, Application,
+CompanyGallery and UserProfile loaded from the database is recorded by
+the ``RequestLoader`` of that request, keyed by model and primary key:
+
+- ``get(model, pk)`` returns the instance already loaded in this request
+  instead of fetching the row again.
+- A lazy foreign key or profile lookup (``job.company``,
+  ``application.job``, ``user.profile``) on one recorded instance loads
+  the related rows of *every* recorded instance of that model still
+  missing them, with one ``IN`` query, like a DataLoader batch.
+
+The lookups go through the ``BatchedForeignKey`` and
+``BatchedOneToOneField`` descriptors; outside a request (management
+commands, signals run from the shell) they behave like Django's own.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import models
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor, ForwardOneToOneDescriptor, ReverseOneToOneDescriptor,
+)
+from django.http import Http404
+
+
+_current = ContextVar('request_loader', default=None)
+
+
+def current():
+    """The loader of the request being handled, or None"""
+    return _current.get()
+
+
+def record(instance):
+    """Record an instance loaded from the database with the current loader"""
+    loader = _current.get()
+    if loader is not None:
+        loader.add(instance)
+
+
+class RequestLoader:
+    def __init__(self):
+        self._objects = {}       # (model, pk) -> first instance loaded
+        self._loaded = {}        # model -> every instance loaded
+
+    def add(self, instance):
+        model = instance._meta.concrete_model
+        self._objects.setdefault((model, instance.pk), instance)
+        self._loaded.setdefault(model, []).append(instance)
+
+    def get(self, model, pk):
+        """The row ``pk`` of ``model``, fetched at most once per request; None if missing"""
+        return self.load_many(model, [pk]).get(pk)
+
+    def get_or_404(self, model, pk):
+        obj = self.get(model, model._meta.pk.to_python(pk))
+        if obj is None:
+            raise Http404(f"No {model._meta.verbose_name} found matching the query")
+        return obj
+
+    def load_many(self, model, pks):
+        """Map ``pks`` to instances of ``model``, fetching the unseen ones in one query"""
+        model = model._meta.concrete_model
+        missing = {pk for pk in pks if (model, pk) not in self._objects}
+        if missing:
+            for instance in model._base_manager.filter(pk__in=missing):
+                # Models without the from_db hook (auth's User) are recorded here
+                if (model, instance.pk) not in self._objects:
+                    self.add(instance)
+        return {pk: self._objects[model, pk] for pk in pks if (model, pk) in self._objects}
+
+    def load_related(self, field, instance):
+        """Load ``field`` for ``instance`` and every recorded sibling missing it"""
+        siblings = [
+            sibling for sibling in self._loaded.get(instance._meta.concrete_model, [])
+            if not field.is_cached(sibling) and getattr(sibling, field.attname) is not None
+        ]
+        related = self.load_many(
+            field.related_model,
+            {getattr(sibling, field.attname) for sibling in siblings} | {getattr(instance, field.attname)},
+        )
+        for sibling in siblings:
+            if sibling is not instance:
+                field.set_cached_value(sibling, related.get(getattr(sibling, field.attname)))
+        return related.get(getattr(instance, field.attname))
+
+    def load_reverse_one_to_one(self, related, instance):
+        """Fill the reverse one-to-one cache of ``instance`` and its recorded siblings"""
+        owners = {
+            owner.pk: owner
+            for owner in self._loaded.get(instance._meta.concrete_model, []) + [instance]
+            if owner.pk is not None and not related.is_cached(owner)
+        }
+        field = related.field
+        found = {
+            getattr(obj, field.attname): obj
+            for obj in related.related_model._base_manager.filter(**{f'{field.attname}__in': list(owners)})
+        }
+        for pk, owner in owners.items():
+            obj = found.get(pk)
+            related.set_cached_value(owner, obj)
+            if obj is not None:
+                field.set_cached_value(obj, owner)
+
+
+class BatchedForwardManyToOneDescriptor(ForwardManyToOneDescriptor):
+    def get_object(self, instance):
+        loader = _current.get()
+        if loader is None or not self.field.target_field.primary_key:
+            return super().get_object(instance)
+        return loader.load_related(self.field, instance)
+
+
+class BatchedForwardOneToOneDescriptor(ForwardOneToOneDescriptor):
+    def get_object(self, instance):
+        loader = _current.get()
+        if loader is None or not self.field.target_field.primary_key:
+            return super().get_object(instance)
+        return loader.load_related(self.field, instance)
+
+
+class BatchedReverseOneToOneDescriptor(ReverseOneToOneDescriptor):
+    def __get__(self, instance, cls=None):
+        loader = _current.get()
+        if instance is not None and loader is not None and not self.related.is_cached(instance):
+            loader.add(instance)
+            loader.load_reverse_one_to_one(self.related, instance)
+        return super().__get__(instance, cls)
+
+
+class BatchedForeignKey(models.ForeignKey):
+    """A ForeignKey whose lazy lookups go through the request loader"""
+    forward_related_accessor_class = BatchedForwardManyToOneDescriptor
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.ForeignKey', args, kwargs
+
+
+class BatchedOneToOneField(models.OneToOneField):
+    """A OneToOneField whose lazy lookups, both ways, go through the request loader"""
+    forward_related_accessor_class = BatchedForwardOneToOneDescriptor
+    related_accessor_class = BatchedReverseOneToOneDescriptor
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.OneToOneField', args, kwargs
+
+
+class RequestLoaderMiddleware:
+    """Give every request its own RequestLoader"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.loader = RequestLoader()
+        token = _current.set(request.loader)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        # Worker threads of the async ORM run in a copy of this context,
+        # so they record into the same loader
+        request.loader = RequestLoader()
+        token = _current.set(request.loader)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+
+
+class LoaderObjectMixin:
+    """Fetch a detail view's object through the request loader, once per request"""
+
+    def get_object(self, queryset=None):
+        loader = getattr(self.request, 'loader', None)
+        if loader is None or queryset is not None or self.pk_url_kwarg not in self.kwargs:
+            return super().get_object(queryset)
+        return loader.get_or_404(self.model, self.kwargs[self.pk_url_kwarg])
@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests per second of the hot read pages under the WSGI handler with the sync '
+        'views and the ASGI handler with the async views, at high concurrency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per handler')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request; repeatable')
+        parser.add_argument('--handler', choices=('wsgi', 'asgi'), help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['handler']:
+            self._run(options)
+            return
+
+        paths = options['paths'] or self._default_paths()
+        results = {}
+        for handler, async_views in (('wsgi', 'False'), ('asgi', 'True')):
+            # Each handler in its own process, as ASYNC_VIEWS is read when the URLconf loads
+            command = [
+                sys.executable, sys.argv[0], 'benchmark_asgi', '--handler', handler,
+                '--concurrency', str(options['concurrency']), '--requests', str(options['requests']),
+            ]
+            for path in paths:
+                command += ['--path', path]
+            output = subprocess.run(
+                command, env={**os.environ, 'ASYNC_VIEWS': async_views},
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[handler] = json.loads(output.strip().splitlines()[-1])
+
+        self.stdout.write(f"{options['requests']} requests over {', '.join(paths)}, {options['concurrency']} in flight")
+        for handler, result in results.items():
+            self.stdout.write(
+                f"{handler:>5}: {result['rps']:8.1f} req/s, p50 {result['p50']:.1f} ms, "
+                f"p95 {result['p95']:.1f} ms, {result['threads']} threads at peak, {result['errors']} errors"
+            )
+
+    def _default_paths(self):
+        latest = Job.objects.filter(is_active=True).order_by('-created_at').values_list('pk', flat=True).first()
+        return ['/', '/jobs/', f'/jobs/{latest}/', '/search/?query=python']
+
+    def _run(self, options):
+        paths = options['paths']
+        requests = [paths[n % len(paths)] for n in range(options['requests'])]
+        run = self._run_wsgi if options['handler'] == 'wsgi' else self._run_asgi
+        run(paths, options['concurrency'])  # warm up the caches and indexes
+
+        peak = [threading.active_count()]
+        started = time.perf_counter()
+        timings, statuses = run(requests, options['concurrency'], peak)
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        self.stdout.write(json.dumps({
+            'rps': len(requests) / elapsed,
+            'p50': statistics.median(timings),
+            'p95': timings[int(len(timings) * 0.95) - 1],
+            'threads': peak[0],
+            'errors': sum(1 for status in statuses if status >= 400),
+        }))
+
+    def _run_wsgi(self, paths, concurrency, peak=None):
+        handler = WSGIHandler()
+        factory = RequestFactory()
+
+        def request(path):
+            url = urlsplit(path)
+            environ = factory._base_environ(PATH_INFO=url.path, QUERY_STRING=url.query, REQUEST_METHOD='GET')
+            status = []
+            started = time.perf_counter()
+            body = handler(environ, lambda code, headers: status.append(int(code.split()[0])))
+            b''.join(body)
+            body.close()
+            if peak is not None:
+                peak[0] = max(peak[0], threading.active_count())
+            return (time.perf_counter() - started) * 1000, status[0]
+
+        # A threaded WSGI server: one thread per request in flight
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(request, paths))
+        return [timing for timing, _ in results], [status for _, status in results]
+
+    def _run_asgi(self, paths, concurrency, peak=None):
+        handler = ASGIHandler()
+        factory = AsyncRequestFactory()
+
+        async def request(path, limit):
+            url = urlsplit(path)
+            scope = factory._base_scope(path=url.path, query_string=url.query.encode(), method='GET')
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                messages.append(message)
+
+            async with limit:
+                started = time.perf_counter()
+                await handler(scope, receive, send)
+                if peak is not None:
+                    peak[0] = max(peak[0], threading.active_count())
+                return (time.perf_counter() - started) * 1000, messages[0]['status']
+
+        async def main():
+            limit = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(request(path, limit) for path in paths))
+
+        results = asyncio.run(main())
+        return [timing for timing, _ in results], [status for _, status in results]
@@ -0,0 +1,89 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from jobs.forms import JobSearchForm
+from jobs.models import Company, Job
+
+
+WORDS = (
+    'build maintain scalable services with python django postgres redis and celery collaborate '
+    'closely with product design and data teams to ship features our customers love mentor '
+    'engineers review code improve reliability observability and developer experience'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Measure job and company list render time with cold and warm card fragment caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=12, help='Cards per page')
+        parser.add_argument('--renders', type=int, default=200, help='Number of page renders to time')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        # Unsaved instances, so the timings are template work only
+        jobs = [
+            Job(
+                pk=10_000_000 + n,
+                title=f"Senior Python Developer {n}",
+                company_name='Benchmark Labs',
+                location='Austin, TX',
+                description=' '.join(rng.choice(WORDS) for _ in range(rng.randint(120, 400))),
+                salary_min=rng.randint(60, 120) * 1000,
+                salary_max=rng.randint(130, 200) * 1000,
+                created_at=now - timedelta(hours=rng.randint(1, 2000)),
+                updated_at=now,
+            )
+            for n in range(options['cards'])
+        ]
+        companies = [
+            Company(
+                pk=10_000_000 + n,
+                name=f"Benchmark Labs {n}",
+                slug=f"benchmark-labs-{n}",
+                description=' '.join(rng.choice(WORDS) for _ in range(rng.randint(80, 200))),
+                headquarters='Austin, TX',
+                active_jobs_count=rng.randint(0, 50),
+                updated_at=now,
+            )
+            for n in range(options['cards'])
+        ]
+        request = RequestFactory().get('/jobs/')
+        request.user = AnonymousUser()
+        pages = {
+            'job list': ('jobs/job_list.html', {'jobs': jobs, 'search_form': JobSearchForm()}),
+            'home': ('jobs/home.html', {'featured_jobs': jobs}),
+            'companies': ('jobs/company_list.html', {'companies': companies}),
+        }
+
+        for label, (template, context) in pages.items():
+            cold = []
+            for _ in range(options['renders']):
+                cache.clear()
+                cold.append(self._time(template, context, request))
+            warm = [self._time(template, context, request) for _ in range(options['renders'])]
+            self._report(f'{label} cold', cold)
+            self._report(f'{label} warm', warm)
+        cache.clear()
+
+    def _time(self, template, context, request):
+        started = time.perf_counter()
+        render_to_string(template, context, request)
+        return (time.perf_counter() - started) * 1000
+
+    def _report(self, label, timings):
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(f"{label:>15}: p50 {p50:.3f} ms, p95 {p95:.3f} ms, max {timings[-1]:.3f} ms")
@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs import ranking
+from jobs.models import Job
+
+from .benchmark_typeahead import CITIES, COMPANY_SUFFIXES, COMPANY_WORDS, ROLES, SENIORITY, STATES, TITLES
+
+
+SKILLS = [
+    'python', 'django', 'java', 'spring', 'javascript', 'react', 'vue', 'angular', 'sql', 'postgresql',
+    'aws', 'azure', 'docker', 'kubernetes', 'terraform', 'linux', 'excel', 'tableau', 'salesforce',
+    'figma', 'pandas', 'spark', 'kafka', 'redis', 'graphql', 'golang', 'rust', 'swift', 'kotlin',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure relevance-ranked search latency on synthetic jobs. '
+        'Everything runs in a transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=500000, help='Number of synthetic jobs')
+        parser.add_argument('--queries', type=int, default=500, help='Number of queries to time')
+        parser.add_argument('--limit', type=int, default=12, help='Results per query')
+        parser.add_argument('--words', type=int, default=40, help='Description length in words')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # A Zipf-like filler vocabulary for the descriptions
+        vocabulary = [f'term{n}' for n in range(20000)]
+        frequencies = [1 / (n + 1) for n in range(len(vocabulary))]
+
+        with transaction.atomic():
+            user = User.objects.create_user(f'benchmark-{rng.getrandbits(32)}')
+            started = time.perf_counter()
+            batch = []
+            for n in range(options['jobs']):
+                title = ' '.join(filter(None, [rng.choice(SENIORITY), rng.choice(ROLES), rng.choice(TITLES)]))
+                words = rng.choices(vocabulary, frequencies, k=options['words']) + rng.sample(SKILLS, 4)
+                rng.shuffle(words)
+                batch.append(Job(
+                    title=title,
+                    company_name=f"{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_WORDS).lower()} "
+                                 f"{rng.choice(COMPANY_SUFFIXES)}",
+                    location=f"{rng.choice(CITIES)}, {rng.choice(STATES)}",
+                    description=' '.join(words),
+                    requirements=' '.join(rng.sample(SKILLS, 3)),
+                    posted_by=user,
+                ))
+                if len(batch) == 5000:
+                    Job.objects.bulk_create(batch)
+                    batch = []
+            Job.objects.bulk_create(batch)
+            ranking.rebuild_index()
+            self.stdout.write(
+                f"Indexed {options['jobs']:,} jobs in {time.perf_counter() - started:.1f}s"
+            )
+
+            words = [word.lower() for word in ROLES + TITLES + SENIORITY + SKILLS + CITIES if word]
+            queries = []
+            for _ in range(options['queries']):
+                terms = rng.sample(words, rng.choice([1, 1, 2, 2, 3]))
+                if rng.random() < 0.2:
+                    terms[-1] = terms[-1][:max(2, len(terms[-1]) - 2)]
+                queries.append(' '.join(terms))
+
+            jobs = Job.objects.filter(is_active=True)
+            timings = {}
+            for query in queries:
+                started = time.perf_counter()
+                ranking.ranked_ids(jobs, query, options['limit'])
+                timings.setdefault(len(query.split()), []).append((time.perf_counter() - started) * 1000)
+
+            for terms, values in sorted(timings.items()):
+                self._report(f'{terms} term(s)', values)
+            self._report('all', [value for values in timings.values() for value in values])
+            transaction.set_rollback(True)
+
+    def _report(self, label, timings):
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f"{label:>9}: p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms, max {timings[-1]:.2f} ms"
+        )
@@ -0,0 +1,87 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.typeahead import PrefixIndex
+
+
+SENIORITY = ['', 'Junior', 'Senior', 'Lead', 'Principal', 'Staff', 'Head of']
+ROLES = [
+    'Python', 'Java', 'JavaScript', 'Frontend', 'Backend', 'Full Stack', 'Data', 'Machine Learning',
+    'DevOps', 'Cloud', 'Security', 'Mobile', 'iOS', 'Android', 'QA', 'Product', 'UX', 'Marketing',
+    'Sales', 'Finance', 'HR', 'Support', 'Operations', 'Network', 'Database', 'Embedded',
+]
+TITLES = [
+    'Developer', 'Engineer', 'Analyst', 'Scientist', 'Manager', 'Designer', 'Architect',
+    'Consultant', 'Specialist', 'Administrator', 'Intern', 'Coordinator',
+]
+COMPANY_WORDS = [
+    'Tech', 'Data', 'Cloud', 'Soft', 'Net', 'Micro', 'Global', 'Bright', 'Blue', 'Green', 'Nova',
+    'Quantum', 'Alpha', 'Apex', 'Vertex', 'Pixel', 'Cyber', 'Hyper', 'Smart', 'Prime',
+]
+COMPANY_SUFFIXES = ['Inc.', 'Ltd.', 'Labs', 'Systems', 'Solutions', 'Group', 'Corp', 'Works']
+CITIES = [
+    'Austin', 'Boston', 'Chicago', 'Denver', 'Seattle', 'Portland', 'Atlanta', 'Miami', 'Dallas',
+    'Houston', 'Phoenix', 'San Diego', 'San Francisco', 'San Jose', 'Los Angeles', 'New York',
+    'Philadelphia', 'Pittsburgh', 'Detroit', 'Minneapolis', 'Nashville', 'Raleigh', 'Salt Lake City',
+]
+STATES = ['TX', 'MA', 'IL', 'CO', 'WA', 'OR', 'GA', 'FL', 'AZ', 'CA', 'NY', 'PA', 'MI', 'MN', 'TN', 'NC', 'UT']
+
+
+class Command(BaseCommand):
+    help = 'Measure typeahead suggestion latency on a synthetic in-memory job set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1000000, help='Number of synthetic jobs')
+        parser.add_argument('--queries', type=int, default=5000, help='Number of prefix queries to time')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        companies = [
+            f"{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_WORDS).lower()} {rng.choice(COMPANY_SUFFIXES)} {n}"
+            for n in range(max(options['jobs'] // 20, 1))
+        ]
+        locations = [f"{city}, {state}" for city in CITIES for state in STATES] + ['Remote']
+
+        def rows():
+            for job_id in range(1, options['jobs'] + 1):
+                title = ' '.join(filter(None, [rng.choice(SENIORITY), rng.choice(ROLES), rng.choice(TITLES)]))
+                yield job_id, title, rng.choice(companies), rng.choice(locations)
+
+        index = PrefixIndex()
+        started = time.perf_counter()
+        index.bulk_load(rows())
+        build_seconds = time.perf_counter() - started
+        self.stdout.write(f"Built index for {len(index):,} jobs in {build_seconds:.1f}s")
+
+        words = [w for w in SENIORITY + ROLES + TITLES + COMPANY_WORDS + CITIES if w]
+        prefixes = []
+        for _ in range(options['queries']):
+            word = rng.choice(words)
+            prefixes.append(word[:rng.randint(1, len(word))])
+
+        self._report('uncached', [self._time(index, p, use_cache=False) for p in prefixes])
+        self._report('cached', [self._time(index, p, use_cache=True) for p in prefixes])
+
+        started = time.perf_counter()
+        for job_id in range(1, 1001):
+            index.add_job(job_id, 'Senior Rust Developer', companies[0], 'Remote')
+        update_ms = (time.perf_counter() - started) * 1000 / 1000
+        self.stdout.write(f"Incremental job update: {update_ms:.3f} ms/job")
+
+    def _time(self, index, prefix, use_cache):
+        started = time.perf_counter()
+        index.suggest(prefix, use_cache=use_cache)
+        return (time.perf_counter() - started) * 1000
+
+    def _report(self, label, timings):
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        self.stdout.write(
+            f"{label:>9}: p50 {p50:.3f} ms, p95 {p95:.3f} ms, p99 {p99:.3f} ms, max {timings[-1]:.3f} ms"
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs import resumes
+
+
+class Command(BaseCommand):
+    help = 'Move resumes stored under their upload names onto content addressed names, merging duplicates'
+
+    def handle(self, *args, **options):
+        files, freed = resumes.deduplicate()
+        self.stdout.write(self.style.SUCCESS(f'Moved {files} resume file(s), freeing {freed} bytes'))
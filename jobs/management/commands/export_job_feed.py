@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import feeds
+
+
+class Command(BaseCommand):
+    help = 'Write the feed of active jobs as JSON Lines or XML, optionally gzipped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(feeds.FORMATS), default='jsonl')
+        parser.add_argument('--output', help='File to write; the feed goes to stdout when omitted')
+        parser.add_argument('--gzip', action='store_true', help='Compress the feed with gzip; needs --output')
+        parser.add_argument('--batch-size', type=int, default=None, help='Jobs read per query')
+
+    def handle(self, *args, **options):
+        chunks = feeds.generate(options['format'], settings.SITE_URL.rstrip('/'), options['batch_size'])
+        if not options['output']:
+            # self.stdout is text, so a gzipped feed needs a file
+            if options['gzip']:
+                raise CommandError('--gzip needs --output')
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            self.stdout.flush()
+            return
+
+        content = feeds.encode(chunks)
+        if options['gzip']:
+            content = feeds.gzip_stream(content)
+
+        # Write next to the target and rename, so readers never see a partial feed
+        output = os.path.abspath(options['output'])
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(output), prefix='.job-feed-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                written = 0
+                for chunk in content:
+                    f.write(chunk)
+                    written += len(chunk)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, output)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} bytes to {output}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jobs import sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the sitemap index and the job and company sitemap shards that changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rewrite every shard')
+
+    def handle(self, *args, **options):
+        written = sitemaps.generate(force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(written)} sitemap file(s)'))
+        for filename in written:
+            self.stdout.write(f'  {filename}')
@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs import applicant_search
+
+
+class Command(BaseCommand):
+    help = (
+        'Extract the text of application resumes in a pool of worker processes and index it with the '
+        'cover letters for applicant search, until stopped or, with --once, until none are left'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'APPLICANT_INDEX_WORKERS', 2),
+            help='Worker processes extracting resumes',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'APPLICANT_INDEX_BATCH_SIZE', 100),
+            help='Applications read and committed at a time, which bounds the extractions in flight',
+        )
+        parser.add_argument('--poll', type=float, default=5.0, help='Seconds to wait when nothing is queued')
+        parser.add_argument('--once', action='store_true', help='Exit once every application is indexed')
+        parser.add_argument('--rebuild', action='store_true', help='Queue every application again first')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            applicant_search.rebuild_index()
+
+        indexed = failed = 0
+        after = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            try:
+                while True:
+                    rows = applicant_search.pending(options['batch_size'], after)
+                    if rows:
+                        failed += applicant_search.index_batch(rows, pool)
+                        indexed += len(rows)
+                        after = rows[-1][0]
+                        continue
+                    if options['once']:
+                        break
+                    # Start over from the lowest id: resumes replaced since were queued again
+                    after = 0
+                    time.sleep(options['poll'])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} application(s); {failed} resume(s) could not be read'
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from jobs import ranking, search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text and relevance ranking indexes from the jobs table'
+
+    def handle(self, *args, **options):
+        search.rebuild_index()
+        ranking.rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Search indexes rebuilt'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from jobs import counters, resumes, stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored application, active job and resume reference counters and the home page totals'
+
+    def handle(self, *args, **options):
+        fixed = counters.reconcile() + resumes.recount()
+        stats.recount()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters, {fixed} row(s) fixed'))
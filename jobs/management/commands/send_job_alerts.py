@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs import alerts
+
+
+class Command(BaseCommand):
+    help = 'Email the pending saved search alerts as one digest per user'
+
+    def handle(self, *args, **options):
+        sent = alerts.send_digests()
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} job alert digest(s)'))
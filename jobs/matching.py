@@ -0,0 +1,114 @@
+"""
+Candidate to job match scores.
+
+An application's ``match_score`` is the cosine similarity of two TF-IDF
+vectors: the job's description and requirements, and the applicant's
+cover letter, resume text and profile bio.  Terms are the ones of the
+relevance ranking index (jobs.ranking), with sublinear term frequencies,
+and document frequencies taken from its ``SearchTerm`` statistics, so a
+skill most jobs ask for weighs less than a rare one.
+
+Scores are computed a batch at a time by the ``index_applications``
+command, right after it extracts the batch's resumes: one query for the
+batch's jobs, a few for the frequencies of every term in the batch, and
+one ``UPDATE`` for the scores.  Vectors are sparse ``{term: weight}``
+dicts, normalized once, so each score is a dot product over the job's
+terms.  An application is queued again (``text_indexed`` off) when its
+job's description or requirements change or its applicant's bio does.
+
+Scores are stored, with an index on ``(job, -match_score, -id)``, so
+listing a job's applications best match first is an index scan.
+"""
+import math
+
+from collections import Counter
+
+from .models import Application, Job, SearchTerm
+from .ranking import idf
+from .search import fold, tokenize
+
+
+# Terms looked up per query, well under SQLite's parameter limit
+TERM_BATCH_SIZE = 5000
+
+UNKNOWN = object()
+
+
+def terms(*texts):
+    """{term: frequency} of ``texts``, as the ranking index folds them"""
+    return Counter(fold(token)[:100] for text in texts for token in tokenize(text))
+
+
+def document_frequencies(all_terms):
+    """({term: jobs containing it}, number of jobs) from the ranking index statistics"""
+    all_terms = sorted(all_terms)
+    frequencies = {}
+    for start in range(0, len(all_terms), TERM_BATCH_SIZE):
+        frequencies.update(
+            SearchTerm.objects.filter(term__in=all_terms[start:start + TERM_BATCH_SIZE])
+            .values_list('term', 'document_count')
+        )
+    total = SearchTerm.objects.filter(term='').values_list('document_count', flat=True).first() or 0
+    return frequencies, total
+
+
+def vector(frequencies, document_frequency, total):
+    """Unit length TF-IDF vector of {term: frequency}"""
+    weights = {
+        term: (1 + math.log(count)) * idf(document_frequency.get(term, 0), total)
+        for term, count in frequencies.items()
+    }
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+
+def cosine(job_vector, applicant_vector):
+    if len(applicant_vector) < len(job_vector):
+        job_vector, applicant_vector = applicant_vector, job_vector
+    return sum(weight * applicant_vector.get(term, 0.0) for term, weight in job_vector.items())
+
+
+def score_batch(rows, resume_texts):
+    """Store the match scores of the jobs.applicant_search ``pending()`` rows, given {resume name: text}"""
+    jobs = {
+        pk: terms(description, requirements)
+        for pk, description, requirements in Job.objects.filter(pk__in={row[3] for row in rows})
+        .values_list('pk', 'description', 'requirements')
+    }
+    applicants = {
+        pk: terms(cover_letter, resume_texts.get(resume, ''), bio or '')
+        for pk, resume, cover_letter, job_id, bio in rows
+    }
+    document_frequency, total = document_frequencies(
+        set().union(*jobs.values(), *applicants.values())
+    )
+
+    job_vectors = {pk: vector(frequencies, document_frequency, total) for pk, frequencies in jobs.items()}
+    scored = [
+        Application(pk=pk, match_score=round(cosine(
+            job_vectors.get(job_id, {}), vector(applicants[pk], document_frequency, total)
+        ), 6))
+        for pk, resume, cover_letter, job_id, bio in rows
+    ]
+    Application.objects.bulk_update(scored, ['match_score'], batch_size=len(scored) or 1)
+
+
+def job_text(job):
+    return job.description, job.requirements
+
+
+def job_saved(job, created):
+    """Queue a job's applications for scoring again when its description or requirements change"""
+    previous = getattr(job, '_matched_text', UNKNOWN)
+    current = job_text(job)
+    if not created and previous is not UNKNOWN and previous != current:
+        Application.objects.filter(job=job).update(text_indexed=False)
+    job._matched_text = current
+
+
+def profile_saved(profile, created):
+    """Queue an applicant's applications for scoring again when their bio changes"""
+    previous = getattr(profile, '_matched_bio', UNKNOWN)
+    if not created and previous is not UNKNOWN and previous != profile.bio:
+        Application.objects.filter(applicant_id=profile.user_id).update(text_indexed=False)
+    profile._matched_bio = profile.bio
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+from jobs.geo import encode_geohash, geocode
+
+
+def geocode_jobs(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    for job in Job.objects.only('pk', 'location').iterator():
+        point = geocode(job.location)
+        if point:
+            Job.objects.filter(pk=job.pk).update(
+                latitude=point[0], longitude=point[1], geohash=encode_geohash(*point)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_fts_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(geocode_jobs, migrations.RunPython.noop),
+    ]
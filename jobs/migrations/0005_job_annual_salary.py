@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:57
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Coalesce
+
+
+def fill_annual_salary(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.exclude(salary_min=None, salary_max=None).update(
+        annual_salary_low=Cast(Coalesce('salary_min', 'salary_max'), models.IntegerField()),
+        annual_salary_high=Cast(Coalesce('salary_max', 'salary_min'), models.IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_geolocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='annual_salary_high',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='annual_salary_low',
+            field=models.PositiveIntegerField(db_index=True, default=2147483647, editable=False),
+        ),
+        migrations.RunPython(fill_annual_salary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_relevance_index(apps, schema_editor):
+    from jobs.ranking import rebuild_index
+    rebuild_index(
+        apps.get_model('jobs', 'Job'),
+        apps.get_model('jobs', 'SearchTerm'),
+        apps.get_model('jobs', 'JobTermScore'),
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_annual_salary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('term', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('document_count', models.PositiveIntegerField(default=0)),
+                ('total_frequency', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobTermScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('frequency', models.FloatField()),
+                ('impact', models.FloatField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_scores', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', '-impact', 'job'], name='jobs_term_impact_idx'), models.Index(fields=['term', 'job', 'impact'], name='jobs_term_job_idx')],
+            },
+        ),
+        migrations.RunPython(build_relevance_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:36
+
+from django.db import migrations, models
+
+
+def fill_counters(apps, schema_editor):
+    from jobs.counters import reconcile
+    reconcile(
+        apps.get_model('jobs', 'Job'),
+        apps.get_model('jobs', 'Application'),
+        apps.get_model('jobs', 'Company'),
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_saved_search_alerts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='active_jobs_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_accepted',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_pending',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_rejected',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_reviewed',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_shortlisted',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:02
+
+from django.db import migrations, models
+import jobs.resumes
+
+
+def fill_resume_blobs(apps, schema_editor):
+    from jobs.resumes import recount
+    recount(apps.get_model('jobs', 'Application'), apps.get_model('jobs', 'ResumeBlob'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('references', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='resume',
+            field=models.FileField(storage=jobs.resumes.get_storage, upload_to=jobs.resumes.resume_upload_to),
+        ),
+        migrations.RunPython(fill_resume_blobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:05
+
+from django.db import migrations, models
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    # Filled by the index_applications command, which backfills every
+    # application as text_indexed starts off
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_application_fts USING fts5("
+        "resume, cover_letter, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS jobs_application_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_content_addressed_resumes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='text_indexed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='resumeblob',
+            name='text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='resumeblob',
+            name='text_extracted',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('text_indexed', False)), fields=['id'], name='jobs_application_unindexed_idx'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
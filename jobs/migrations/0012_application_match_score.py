@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:09
+
+from django.db import migrations, models
+
+
+def queue_for_scoring(apps, schema_editor):
+    # The index_applications command scores them as it indexes them again
+    apps.get_model('jobs', 'Application').objects.update(text_indexed=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_applicant_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='match_score',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-match_score', '-id'], name='jobs_application_match_idx'),
+        ),
+        migrations.RunPython(queue_for_scoring, migrations.RunPython.noop),
+    ]
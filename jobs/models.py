@@ -1,7 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import urlencode
+
+from .geo import encode_geohash, geocode
+from .loader import BatchedForeignKey, record
+from .resumes import get_storage as get_resume_storage, resume_upload_to
 
 
 class Company(models.Model):
@@ -31,21 +38,38 @@ class Company(models.Model):
     contact_phone = models.CharField(max_length=20, blank=True)
     social_media = models.JSONField(default=dict, blank=True)  # Store social media links
     is_verified = models.BooleanField(default=False)
+    # Maintained by jobs.counters
+    active_jobs_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    COUNTER_FIELDS = ('active_jobs_count',)
+    
     class Meta:
         verbose_name_plural = 'Companies'
         ordering = ['name']
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        record(instance)
+        if 'name' in instance.__dict__:
+            # Jobs are indexed with their company's name
+            instance._indexed_name = instance.name
+        return instance
+    
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        from .counters import save_kwargs
+        super().save(*args, **save_kwargs(self, kwargs))
+    
     def get_absolute_url(self):
         return reverse('company_detail', kwargs={'slug': self.slug})
     
     def get_jobs_count(self):
-        return self.jobs.count()
+        return self.active_jobs_count
     
     def get_employees_display(self):
         if self.employee_count:
@@ -54,7 +78,7 @@ class Company(models.Model):
 
 
 class CompanyGallery(models.Model):
-    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='gallery')
+    company = BatchedForeignKey(Company, on_delete=models.CASCADE, related_name='gallery')
     image = models.ImageField(upload_to='company_gallery/')
     caption = models.CharField(max_length=200, blank=True)
     is_featured = models.BooleanField(default=False)
@@ -63,6 +87,12 @@ class CompanyGallery(models.Model):
     class Meta:
         ordering = ['-is_featured', '-created_at']
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        record(instance)
+        return instance
+    
     def __str__(self):
         return f"{self.company.name} - {self.caption or 'Gallery Image'}"
 
@@ -83,23 +113,62 @@ class Job(models.Model):
         ('executive', 'Executive'),
     ]
     
+    NO_SALARY_LOW = 2147483647
+    
     title = models.CharField(max_length=200)
-    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
+    company = BatchedForeignKey(Company, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
     company_name = models.CharField(max_length=200)  # Keep for backward compatibility
     location = models.CharField(max_length=200)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True)
     description = models.TextField()
     requirements = models.TextField(blank=True)
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Whole-dollar annual range derived from salary_min/salary_max for indexed
+    # filtering and sorting; jobs without a salary get (NO_SALARY_LOW, 0) so
+    # they never overlap a range and sort last either way
+    annual_salary_low = models.PositiveIntegerField(default=NO_SALARY_LOW, db_index=True, editable=False)
+    annual_salary_high = models.PositiveIntegerField(default=0, db_index=True, editable=False)
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES, default='full-time')
     experience_level = models.CharField(max_length=20, choices=EXPERIENCE_LEVEL_CHOICES, default='entry')
-    posted_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posted_jobs')
+    posted_by = BatchedForeignKey(User, on_delete=models.CASCADE, related_name='posted_jobs')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Application counters, in total and per status, maintained by jobs.counters
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
+    applications_pending = models.PositiveIntegerField(default=0, editable=False)
+    applications_reviewed = models.PositiveIntegerField(default=0, editable=False)
+    applications_shortlisted = models.PositiveIntegerField(default=0, editable=False)
+    applications_rejected = models.PositiveIntegerField(default=0, editable=False)
+    applications_accepted = models.PositiveIntegerField(default=0, editable=False)
+    
+    COUNTER_FIELDS = (
+        'applications_count', 'applications_pending', 'applications_reviewed',
+        'applications_shortlisted', 'applications_rejected', 'applications_accepted',
+    )
     
     class Meta:
         ordering = ['-created_at']
+        # Newest edit overall and per company, for conditional GET validators
+        indexes = [
+            models.Index(fields=['updated_at'], name='jobs_job_updated_idx'),
+            models.Index(fields=['company', 'updated_at'], name='jobs_job_company_updated_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        record(instance)
+        if 'is_active' in instance.__dict__ and 'company_id' in instance.__dict__:
+            from .counters import counted_state
+            instance._counted_state = counted_state(instance)
+        if 'description' in instance.__dict__ and 'requirements' in instance.__dict__:
+            from .matching import job_text
+            instance._matched_text = job_text(instance)
+        return instance
     
     def __str__(self):
         return f"{self.title} at {self.company.name}"
@@ -117,13 +186,45 @@ class Job(models.Model):
         return "Salary not specified"
     
     def get_applications_count(self):
-        return self.applications.count()
+        return self.applications_count
+    
+    def get_annual_salary_range(self):
+        """Return the (low, high) whole-dollar salary range used for filtering"""
+        low = self.salary_min if self.salary_min is not None else self.salary_max
+        high = self.salary_max if self.salary_max is not None else self.salary_min
+        if low is None:
+            return self.NO_SALARY_LOW, 0
+        return int(low), int(high)
     
     def save(self, *args, **kwargs):
         # Update company_name from company if not set
         if not self.company_name and self.company:
             self.company_name = self.company.name
-        super().save(*args, **kwargs)
+        self.annual_salary_low, self.annual_salary_high = self.get_annual_salary_range()
+        # Geocode the location against the bundled gazetteer
+        point = geocode(self.location)
+        if point:
+            self.latitude, self.longitude = point
+            self.geohash = encode_geohash(*point)
+        else:
+            self.latitude = self.longitude = None
+            self.geohash = ''
+        from .counters import save_kwargs
+        super().save(*args, **save_kwargs(self, kwargs))
+
+
+class ResumeBlob(models.Model):
+    """A stored resume file and how many applications name it (see jobs.resumes)"""
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Filled in by the index_applications command (see jobs.applicant_search)
+    text = models.TextField(blank=True, editable=False)
+    text_extracted = models.BooleanField(default=False, editable=False)
+    
+    def __str__(self):
+        return self.name
 
 
 class Application(models.Model):
@@ -135,20 +236,248 @@ class Application(models.Model):
         ('accepted', 'Accepted'),
     ]
     
-    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
-    applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='applications')
-    resume = models.FileField(upload_to='resumes/')
+    job = BatchedForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
+    applicant = BatchedForeignKey(User, on_delete=models.CASCADE, related_name='applications')
+    resume = models.FileField(upload_to=resume_upload_to, storage=get_resume_storage)
     cover_letter = models.TextField()
     applied_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True)
+    text_indexed = models.BooleanField(default=False, editable=False)
+    match_score = models.FloatField(null=True, editable=False)
     
     class Meta:
         ordering = ['-applied_at']
         unique_together = ['job', 'applicant']
+        indexes = [
+            # The queue of the index_applications command
+            models.Index(fields=['id'], condition=models.Q(text_indexed=False), name='jobs_application_unindexed_idx'),
+            # A job's applications best match first (see jobs.matching)
+            models.Index(fields=['job', '-match_score', '-id'], name='jobs_application_match_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        record(instance)
+        if 'status' in instance.__dict__:
+            instance._counted_status = instance.status
+        if 'resume' in instance.__dict__:
+            instance._counted_resume = instance._indexed_resume = instance.resume.name or None
+        return instance
     
     def __str__(self):
         return f"{self.applicant.get_full_name()} - {self.job.title}"
     
     def get_absolute_url(self):
-        return reverse('application_detail', kwargs={'pk': self.pk}) 
\ No newline at end of file
+        return reverse('application_detail', kwargs={'pk': self.pk}) 
+
+
+class SavedSearch(models.Model):
+    """A job search an applicant gets digests of new matches for"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=200)
+    query = models.CharField(max_length=200, blank=True)
+    job_type = models.CharField(max_length=20, choices=Job.JOB_TYPE_CHOICES, blank=True)
+    experience_level = models.CharField(max_length=20, choices=Job.EXPERIENCE_LEVEL_CHOICES, blank=True)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='saved_searches', null=True, blank=True)
+    location = models.CharField(max_length=200, blank=True)
+    # Percolator key of the most selective criterion (see jobs.alerts)
+    anchor = models.CharField(max_length=200, db_index=True, editable=False)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'Saved searches'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.name}"
+    
+    def get_absolute_url(self):
+        params = {
+            'query': self.query,
+            'job_type': self.job_type,
+            'experience_level': self.experience_level,
+            'company': self.company_id or '',
+            'location': self.location,
+        }
+        return f"{reverse('job_list')}?{urlencode({key: value for key, value in params.items() if value})}"
+    
+    def save(self, *args, **kwargs):
+        from .alerts import anchor_key
+        self.anchor = anchor_key(self)
+        super().save(*args, **kwargs)
+
+
+class JobAlert(models.Model):
+    """A new job matching a saved search, until it goes out in a digest"""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='alerts')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='alerts')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['saved_search', 'job']
+    
+    def __str__(self):
+        return f"{self.saved_search.name} - {self.job.title}"
+
+
+class SearchTerm(models.Model):
+    """
+    Collection statistics of a term in the relevance ranking index.
+    
+    The row with the empty term describes the whole collection: every
+    indexed job, and its total (field weighted) length.
+    """
+    term = models.CharField(max_length=100, primary_key=True)
+    document_count = models.PositiveIntegerField(default=0)
+    total_frequency = models.FloatField(default=0)
+    
+    def __str__(self):
+        return self.term
+
+
+class JobTermScore(models.Model):
+    """Field weighted frequency and BM25 term weight of a term in a job"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='term_scores')
+    term = models.CharField(max_length=100)
+    frequency = models.FloatField()
+    impact = models.FloatField()
+    
+    class Meta:
+        # Covering indexes for the ranking queries: postings in weight
+        # order, and postings in job order for joins between terms
+        indexes = [
+            models.Index(fields=['term', '-impact', 'job'], name='jobs_term_impact_idx'),
+            models.Index(fields=['term', 'job', 'impact'], name='jobs_term_job_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} - {self.job_id}"
+
+
+@receiver(post_save, sender=Job)
+def index_job_for_search(sender, instance, created, **kwargs):
+    from . import ranking, search, search_cache, typeahead
+    search.index_job(instance)
+    ranking.index_job(instance)
+    typeahead.job_changed(instance)
+    search_cache.job_saved(instance, created)
+
+
+@receiver(post_save, sender=Job)
+def match_job_alerts(sender, instance, **kwargs):
+    from . import alerts
+    alerts.job_saved(instance)
+
+
+@receiver(post_save, sender=Job)
+def queue_job_applications_for_matching(sender, instance, created, **kwargs):
+    from . import matching
+    matching.job_saved(instance, created)
+
+
+@receiver(post_save, sender=Job)
+def count_active_job(sender, instance, created, **kwargs):
+    from . import counters
+    counters.job_saved(instance, created)
+
+
+@receiver(post_delete, sender=Job)
+def uncount_active_job(sender, instance, **kwargs):
+    from . import counters
+    counters.job_deleted(instance)
+
+
+@receiver(post_save, sender=Company)
+def count_company(sender, instance, created, **kwargs):
+    if created:
+        from . import stats
+        stats.adjust('companies', 1)
+
+
+@receiver(post_delete, sender=Company)
+def uncount_company(sender, instance, **kwargs):
+    from . import stats
+    stats.adjust('companies', -1)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=CompanyGallery)
+@receiver(post_delete, sender=CompanyGallery)
+def expire_cached_pages(sender, **kwargs):
+    from . import page_cache
+    page_cache.invalidate()
+
+
+@receiver(post_save, sender=Application)
+def count_application(sender, instance, created, **kwargs):
+    from . import counters
+    counters.application_saved(instance, created)
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    from . import counters
+    counters.application_deleted(instance)
+
+
+@receiver(post_save, sender=Application)
+def reference_resume(sender, instance, created, **kwargs):
+    from . import resumes
+    resumes.application_saved(instance, created)
+
+
+@receiver(post_delete, sender=Application)
+def dereference_resume(sender, instance, **kwargs):
+    from . import resumes
+    resumes.application_deleted(instance)
+
+
+@receiver(post_save, sender=Application)
+def queue_application_for_search(sender, instance, created, **kwargs):
+    from . import applicant_search
+    applicant_search.application_saved(instance, created)
+
+
+@receiver(post_delete, sender=Application)
+def remove_application_from_search(sender, instance, **kwargs):
+    from . import applicant_search
+    applicant_search.remove_application(instance.pk)
+
+
+@receiver(pre_delete, sender=Job)
+def remove_job_from_ranking(sender, instance, **kwargs):
+    # Runs before the cascade removes the postings the statistics need
+    from . import ranking
+    ranking.remove_job(instance.pk)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_search(sender, instance, **kwargs):
+    from . import search, search_cache, typeahead
+    search.remove_job(instance.pk)
+    typeahead.job_removed(instance.pk)
+    search_cache.job_deleted(instance.pk)
+
+
+@receiver(post_save, sender=Company)
+def reindex_company_jobs_for_search(sender, instance, created, **kwargs):
+    # Of a company, only its name is indexed with its jobs; without the
+    # loaded name to compare, any save may be a rename
+    previous = getattr(instance, '_indexed_name', None)
+    instance._indexed_name = instance.name
+    if not created and previous != instance.name:
+        from . import ranking, search, search_cache, typeahead
+        search.reindex_company(instance)
+        ranking.reindex_company(instance)
+        typeahead.company_changed(instance)
+        search_cache.company_changed(instance)
@@ -0,0 +1,131 @@
+"""
+Whole page cache for anonymous visitors.
+
+The public pages are cached as full HTML per URL and shared by every
+anonymous request.  What differs between visitors in base.html (the
+navbar user menu, flash messages, the footer account link) is written as
+a ``{% hole %}`` in the template: while a page is rendered for the cache
+each hole becomes a ``<!--hole:template-->`` marker, and every response
+served from the cache has its markers filled by rendering those small
+templates for the current request.
+
+Page bodies still carry per user state (Applied badges, apply status,
+CSRF tokens), so authenticated requests are rendered as before.
+
+Entries are keyed on a generation number that every Job, Company,
+CompanyGallery and Application save or delete bumps, so edits show on
+the next request; ``PAGE_CACHE_TIMEOUT`` bounds the life of an entry
+otherwise.
+
+The decorator wraps async views too, running the cache and template work
+in the request's worker thread.
+"""
+import hashlib
+import re
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+
+GENERATION_KEY = 'pagecache:generation'
+
+HOLE_PATTERN = re.compile(r'<!--hole:([\w/.-]+)-->')
+
+
+def hole_marker(template_name):
+    return f'<!--hole:{template_name}-->'
+
+
+def fill_holes(content, request):
+    """Render the holes of a cached page for ``request``"""
+    rendered = {}
+
+    def fill(match):
+        name = match.group(1)
+        if name not in rendered:
+            rendered[name] = render_to_string(name, request=request)
+        return rendered[name]
+    return HOLE_PATTERN.sub(fill, content)
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Restart past any generation lost to eviction, whose pages may
+        # still be cached
+        cache.add(GENERATION_KEY, int(time.time() * 1000), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate():
+    """Expire every cached page"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        pass
+
+
+def _cache_key(request):
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'pagecache:{_generation()}:{digest}'
+
+
+def _lookup(request):
+    """
+    None when the page cache does not serve ``request``, else its key and
+    the cached page filled in for the request, or None on a miss.
+    """
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return None
+    key = _cache_key(request)
+    content = cache.get(key)
+    return key, HttpResponse(fill_holes(content, request)) if content is not None else None
+
+
+def _store(key, request, response):
+    """Cache the page rendered in ``response`` and return the response to send"""
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.render()
+    request.page_cache_holes = False
+    if response.streaming:
+        return response
+    content = response.content.decode()
+    if response.status_code != 200 or response.cookies:
+        response.content = fill_holes(content, request)
+        return response
+    cache.set(key, content, getattr(settings, 'PAGE_CACHE_TIMEOUT', 60))
+    return HttpResponse(fill_holes(content, request))
+
+
+def anonymous_page_cache(view):
+    """Serve ``view`` to anonymous GET requests from the shared page cache"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            found = await sync_to_async(_lookup)(request)
+            if found is None:
+                return await view(request, *args, **kwargs)
+            key, response = found
+            if response is None:
+                request.page_cache_holes = True
+                response = await sync_to_async(_store)(key, request, await view(request, *args, **kwargs))
+            return response
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        found = _lookup(request)
+        if found is None:
+            return view(request, *args, **kwargs)
+        key, response = found
+        if response is None:
+            request.page_cache_holes = True
+            response = _store(key, request, view(request, *args, **kwargs))
+        return response
+    return wrapper
@@ -0,0 +1,269 @@
+"""
+Keyset (cursor) pagination for the public listings.
+
+Instead of ``COUNT(*)`` plus ``OFFSET``, a page is fetched with a range
+condition on the listing's sort key, e.g. ``(created_at, id) < (c, i)``
+for jobs, so page 5000 costs the same as page 1.  Next/previous links
+carry opaque cursor tokens.  Requests that still send ``?page=N`` are
+served by Django's regular paginator so existing links keep working.
+"""
+import base64
+import json
+
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps([direction, values], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, model, ordering):
+    """
+    Return the (direction, sort key values) of a cursor token, raising
+    InvalidCursor for anything ``encode_cursor`` could not have produced
+    for ``ordering``: tokens come from the query string.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != len(ordering):
+            raise InvalidCursor(token)
+        values = [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise InvalidCursor(token) from exc
+    # Sort keys are never null, and a null cannot be compared against
+    if any(value is None for value in values):
+        raise InvalidCursor(token)
+    return direction, values
+
+
+def _reverse_ordering(ordering):
+    return [field[1:] if field.startswith('-') else '-' + field for field in ordering]
+
+
+def rows_after(ordering, values):
+    """Q matching rows that sort strictly after ``values`` in ``ordering``"""
+    clauses = []
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition = Q(**{f'{name}__{lookup}': values[i]})
+        for previous_field, previous_value in zip(ordering[:i], values[:i]):
+            condition &= Q(**{previous_field.lstrip('-'): previous_value})
+        clauses.append(condition)
+    return reduce(or_, clauses)
+
+
+def _key(obj, ordering):
+    return [getattr(obj, field.lstrip('-')) for field in ordering]
+
+
+class CursorPage:
+    """A page of results plus the cursors to its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_cursor(queryset, ordering, page_size, token=None):
+    """Return the CursorPage of ``queryset`` addressed by ``token``"""
+    ordering = list(ordering)
+    direction, values = 'next', None
+    if token:
+        try:
+            direction, values = decode_cursor(token, queryset.model, ordering)
+        except InvalidCursor:
+            direction, values = 'next', None
+
+    if direction == 'next':
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(rows_after(ordering, values))
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        has_next, has_previous = has_more, values is not None
+    else:
+        backwards = _reverse_ordering(ordering)
+        queryset = queryset.order_by(*backwards).filter(rows_after(backwards, values))
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_next, has_previous = True, has_more
+
+    if not rows:
+        return CursorPage(rows)
+    return CursorPage(
+        rows,
+        next_cursor=encode_cursor('next', _key(rows[-1], ordering)) if has_next else None,
+        previous_cursor=encode_cursor('prev', _key(rows[0], ordering)) if has_previous else None,
+    )
+
+
+def paginate_ids_by_cursor(ids, complete, fetch, ordering, page_size, token=None, model=None):
+    """
+    Cursor-paginate a precomputed, already ordered list of ids.
+
+    ``fetch`` turns a list of ids into objects in the same order.  Returns
+    None when the page cannot be served from ``ids`` (the cursor points
+    outside the list, or past the end of an incomplete list).
+    """
+    position = 0
+    direction = 'next'
+    if token:
+        try:
+            direction, values = decode_cursor(token, model, ordering)
+        except InvalidCursor:
+            direction, values = 'next', None
+        if values is not None:
+            try:
+                position = ids.index(values[-1])
+            except ValueError:
+                return None
+            if direction == 'next':
+                position += 1
+
+    if direction == 'next':
+        start, end = position, position + page_size
+        if end >= len(ids) and not complete:
+            return None
+        has_next, has_previous = end < len(ids), start > 0
+    else:
+        start, end = max(position - page_size, 0), position
+        has_next, has_previous = True, start > 0
+
+    rows = fetch(ids[start:end])
+    if not rows:
+        return CursorPage(rows)
+    return CursorPage(
+        rows,
+        next_cursor=encode_cursor('next', _key(rows[-1], ordering)) if has_next else None,
+        previous_cursor=encode_cursor('prev', _key(rows[0], ordering)) if has_previous else None,
+    )
+
+
+def estimated_count(queryset, limit=None):
+    """
+    Count matching rows, but stop at ``limit``.
+
+    Returns ``(count, is_estimate)``; ``is_estimate`` is True when the
+    listing has at least ``limit`` rows and the count is a lower bound.
+    """
+    if limit is None:
+        limit = getattr(settings, 'ESTIMATED_COUNT_LIMIT', 1000)
+    count = queryset.order_by()[:limit].count()
+    return count, count >= limit
+
+
+class CursorPaginationMixin:
+    """
+    ListView mixin that paginates by ``cursor_ordering`` keyset cursors.
+
+    ``LISTING_COUNT_MODE`` picks the result count shown in cursor mode:
+    ``'exact'`` runs a full COUNT, ``'estimated'`` counts up to
+    ``ESTIMATED_COUNT_LIMIT`` rows and ``'none'`` skips counting.
+    """
+    cursor_ordering = None
+    cached_entry = None
+
+    def use_cursor_pagination(self):
+        return self.cursor_ordering is not None and 'page' not in self.request.GET
+
+    def get_cached_ids(self, queryset):
+        """
+        Hook for views backed by a result cache: return a dict with the
+        ordered ``ids`` of the listing and whether they are ``complete``,
+        or None to paginate the queryset directly.
+        """
+        return None
+
+    def fetch_ids(self, queryset, ids):
+        objects = queryset.model._default_manager.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+    def paginate_queryset(self, queryset, page_size):
+        self.cached_entry = self.get_cached_ids(queryset)
+        if self.cached_entry is not None:
+            result = self.paginate_cached_ids(queryset, page_size)
+            if result is not None:
+                return result
+            self.cached_entry = None
+
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        page = paginate_by_cursor(queryset, self.cursor_ordering, page_size, self.request.GET.get('cursor'))
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def paginate_cached_ids(self, queryset, page_size):
+        ids, complete = self.cached_entry['ids'], self.cached_entry['complete']
+        fetch = lambda page_ids: self.fetch_ids(queryset, page_ids)
+
+        if self.use_cursor_pagination():
+            page = paginate_ids_by_cursor(
+                ids, complete, fetch, self.cursor_ordering, page_size,
+                self.request.GET.get('cursor'), queryset.model
+            )
+            if page is None:
+                return None
+            return (None, page, page.object_list, page.has_other_pages())
+
+        if not complete:
+            return None
+        paginator = self.get_paginator(ids, page_size)
+        page = paginator.get_page(self.request.GET.get(self.page_kwarg))
+        page.object_list = fetch(page.object_list)
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_result_count(self, queryset, paginator):
+        if paginator is not None:
+            return paginator.count, False
+        if self.cached_entry is not None and self.cached_entry['complete']:
+            return len(self.cached_entry['ids']), self.cached_entry.get('truncated', False)
+        mode = getattr(settings, 'LISTING_COUNT_MODE', 'estimated')
+        if mode == 'exact':
+            return queryset.count(), False
+        if mode == 'estimated':
+            return estimated_count(queryset)
+        return None, False
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        params.pop('cursor', None)
+        context['pagination_query'] = params.urlencode()
+        context['cursor_pagination'] = context['paginator'] is None and context['page_obj'] is not None
+        context['result_count'], context['result_count_estimated'] = self.get_result_count(
+            self.object_list, context['paginator']
+        )
+        return context
@@ -0,0 +1,104 @@
+"""
+Per-view query budgets.
+
+A listing must cost the same number of queries whether it renders one
+row or a hundred, so each view declares a fixed budget::
+
+    @query_budget(6)
+    def employer_dashboard(request):
+        ...
+
+Class based views take it on ``dispatch`` through ``method_decorator``
+(async ones on an async ``dispatch``, all in one ``method_decorator``).
+Lazy template responses are rendered inside the budget, so queries the
+template triggers (an unjoined relation per row) are counted too.  Going
+over budget raises ``QueryBudgetExceeded``, listing the queries, when
+``QUERY_BUDGET_STRICT`` is on: under DEBUG by default, and always in the
+view tests (jobs.tests.test_query_budgets), so a regression fails there.
+In production it is logged as a warning instead of failing the request.
+"""
+import logging
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    """Context manager recording the SQL run on the default connection"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        # Transaction control differs between requests and tests (BEGIN
+        # against savepoints), and is not a query the view asked for
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    def __len__(self):
+        return len(self.queries)
+
+
+def check_budget(name, counter, budget):
+    if len(counter) <= budget:
+        return
+    message = f"{name} ran {len(counter)} queries, over its budget of {budget}"
+    if getattr(settings, 'QUERY_BUDGET_STRICT', settings.DEBUG):
+        raise QueryBudgetExceeded(message + ':\n' + '\n'.join(counter.queries))
+    logger.warning(message)
+
+
+def query_budget(budget):
+    """Fail a view that runs more than ``budget`` queries, template included"""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # The async ORM runs queries on the request's worker thread,
+                # whose connection is the one to watch
+                counter = QueryCounter()
+                await sync_to_async(counter.__enter__)()
+                try:
+                    response = await view(request, *args, **kwargs)
+                    if hasattr(response, 'render') and not response.is_rendered:
+                        await sync_to_async(response.render)()
+                finally:
+                    await sync_to_async(counter.__exit__)(None, None, None)
+                match = request.resolver_match
+                check_budget(match.view_name if match else view.__qualname__, counter, budget)
+                return response
+            async_wrapper.query_budget = budget
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with QueryCounter() as counter:
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render') and not response.is_rendered:
+                    response.render()
+            match = request.resolver_match
+            check_budget(match.view_name if match else view.__qualname__, counter, budget)
+            return response
+        wrapper.query_budget = budget
+        return wrapper
+    return decorator
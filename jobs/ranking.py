@@ -0,0 +1,428 @@
+"""
+BM25 relevance ranking for job search.
+
+The ranking index is an impact-ordered inverted index in two tables.
+``JobTermScore`` holds, for every term of a job, its field weighted
+frequency (BM25F, with ``SEARCH_FIELD_WEIGHTS``) and the resulting BM25
+term weight, computed when the job is saved.  ``SearchTerm`` holds the
+document frequency of every term, and its empty-term row the size and
+total length of the collection, so a query only has to multiply the
+stored weights by each term's IDF.
+
+A single-token query walks the postings of the token's terms from the
+highest weight down (Fagin's threshold algorithm).  Each newly seen job
+is scored exactly by looking up its other terms, and the walk stops as
+soon as no unseen job can beat the current top results, so a common term
+costs a few index range scans instead of scoring every match.
+
+Like the full-text filter, every query token must match, as a term or as
+the prefix of one; a prefix is scored against its ``PREFIX_EXPANSIONS``
+most common completions, looked up for every token in one query.  Since every match of a multi-token query
+contains its rarest token, those are scored by one SQL join driven by
+that token's postings in job order, which stays bounded by the rarest
+list even when the tokens barely co-occur.
+"""
+import heapq
+import math
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Job, JobTermScore, SearchTerm
+from .search import fold, tokenize
+
+
+TEXT_FIELDS = ('title', 'company', 'location', 'description', 'requirements')
+
+DEFAULT_FIELD_WEIGHTS = {
+    'title': 4.0,
+    'company': 2.0,
+    'location': 1.0,
+    'description': 1.0,
+    'requirements': 0.5,
+}
+
+K1 = 1.2
+
+B = 0.75
+
+PREFIX_EXPANSIONS = 8
+
+# Query tokens expanded per query, two compound SELECT terms each, under
+# SQLite's limit of 500
+EXPAND_BATCH_SIZE = 100
+
+FIRST_CHUNK = 64
+
+# Postings read per round, across all query terms; keeps the IN lists
+# of the scoring queries well under SQLite's parameter limit
+MAX_CANDIDATES = 8192
+
+BATCH_SIZE = 10000
+
+# Terms whose statistics one UPDATE moves, five parameters each
+STATISTICS_BATCH_SIZE = 2000
+
+
+def field_weights():
+    return getattr(settings, 'SEARCH_FIELD_WEIGHTS', DEFAULT_FIELD_WEIGHTS)
+
+
+def analyze(fields):
+    """Return ({term: weighted frequency}, weighted length) for TEXT_FIELDS texts"""
+    weights = field_weights()
+    frequencies = Counter()
+    for name, text in zip(TEXT_FIELDS, fields):
+        weight = weights.get(name, 0)
+        if weight:
+            for token in tokenize(text):
+                frequencies[fold(token)[:100]] += weight
+    return frequencies, sum(frequencies.values())
+
+
+def term_weight(frequency, length, average_length):
+    """BM25 term frequency saturation with document length normalization"""
+    norm = K1 * (1 - B + B * length / average_length) if average_length else K1
+    return frequency * (K1 + 1) / (frequency + norm)
+
+
+def idf(document_count, total_documents):
+    return math.log(1 + (total_documents - document_count + 0.5) / (document_count + 0.5))
+
+
+def _job_fields(job):
+    company_name = job.company.name if job.company_id else job.company_name
+    return [job.title, company_name or '', job.location, job.description, job.requirements]
+
+
+def _collection():
+    """Return (number of jobs, total weighted length) of the index"""
+    row = SearchTerm.objects.filter(term='').values_list('document_count', 'total_frequency').first()
+    return row or (0, 0.0)
+
+
+def _update_statistics(old, new):
+    """Move the term statistics from a job's ``old`` frequencies to ``new``"""
+    added = [term for term in new if term not in old]
+    if added:
+        SearchTerm.objects.bulk_create([SearchTerm(term=term) for term in added], ignore_conflicts=True)
+    deltas = []
+    for term in old.keys() | new.keys():
+        before, after = old.get(term), new.get(term)
+        if before != after:
+            deltas.append((term, (after is not None) - (before is not None), (after or 0) - (before or 0)))
+    # One statement per batch rather than per term: a job has hundreds of
+    # terms, and every save of a job moves the collection row too
+    table = SearchTerm._meta.db_table
+    with connection.cursor() as cursor:
+        for start in range(0, len(deltas), STATISTICS_BATCH_SIZE):
+            batch = deltas[start:start + STATISTICS_BATCH_SIZE]
+            cases = ' '.join('WHEN %s THEN %s' for delta in batch)
+            cursor.execute(
+                f'UPDATE {table} SET document_count = document_count + CASE term {cases} END, '
+                f'total_frequency = total_frequency + CASE term {cases} END '
+                f'WHERE term IN ({", ".join(["%s"] * len(batch))})',
+                [value for term, documents, frequency in batch for value in (term, documents)]
+                + [value for term, documents, frequency in batch for value in (term, frequency)]
+                + [term for term, documents, frequency in batch]
+            )
+
+
+def index_job(job):
+    """Insert or refresh a job's postings"""
+    frequencies, length = analyze(_job_fields(job))
+    with transaction.atomic():
+        old = dict(JobTermScore.objects.filter(job_id=job.pk).values_list('term', 'frequency'))
+        old_statistics = dict(old, **{'': sum(old.values())}) if old else {}
+        _update_statistics(old_statistics, dict(frequencies, **{'': length}))
+
+        documents, total_length = _collection()
+        average_length = total_length / documents if documents else 0
+        JobTermScore.objects.filter(job_id=job.pk).delete()
+        JobTermScore.objects.bulk_create([
+            JobTermScore(
+                job_id=job.pk, term=term, frequency=frequency,
+                impact=term_weight(frequency, length, average_length)
+            )
+            for term, frequency in frequencies.items()
+        ])
+
+
+def remove_job(job_id):
+    """Drop a job's postings; call before the job row is deleted"""
+    with transaction.atomic():
+        old = dict(JobTermScore.objects.filter(job_id=job_id).values_list('term', 'frequency'))
+        if old:
+            _update_statistics(dict(old, **{'': sum(old.values())}), {})
+            JobTermScore.objects.filter(job_id=job_id).delete()
+
+
+def reindex_company(company):
+    """Re-rank every job of a company after a rename"""
+    for job in company.jobs.select_related('company'):
+        index_job(job)
+
+
+def _job_rows(job_model):
+    rows = job_model.objects.order_by('pk').values_list(
+        'pk', 'title', 'company__name', 'company_name', 'location', 'description', 'requirements'
+    )
+    for pk, title, company, company_name, *texts in rows.iterator(chunk_size=BATCH_SIZE):
+        yield pk, [title, company or company_name or ''] + texts
+
+
+@transaction.atomic
+def rebuild_index(job_model=Job, term_model=SearchTerm, score_model=JobTermScore):
+    """
+    Recompute the whole index from the jobs table.
+
+    Rows are written with plain ``executemany`` batches, which is several
+    times faster than building model instances for millions of postings.
+    The model arguments let migrations pass their historical models.
+    """
+    score_model.objects.all().delete()
+    term_model.objects.all().delete()
+
+    # First pass: collection statistics, which every term weight depends on
+    document_counts, total_frequencies = Counter(), Counter()
+    for pk, fields in _job_rows(job_model):
+        frequencies, length = analyze(fields)
+        frequencies[''] = length
+        document_counts.update(frequencies.keys())
+        total_frequencies.update(frequencies)
+    if not document_counts['']:
+        return
+    average_length = total_frequencies[''] / document_counts['']
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {term_model._meta.db_table} (term, document_count, total_frequency) VALUES (%s, %s, %s)',
+            [(term, count, total_frequencies[term]) for term, count in document_counts.items()]
+        )
+
+        # Second pass: the postings
+        sql = f'INSERT INTO {score_model._meta.db_table} (job_id, term, frequency, impact) VALUES (%s, %s, %s, %s)'
+        batch = []
+        for pk, fields in _job_rows(job_model):
+            frequencies, length = analyze(fields)
+            batch.extend(
+                (pk, term, frequency, term_weight(frequency, length, average_length))
+                for term, frequency in frequencies.items()
+            )
+            if len(batch) >= BATCH_SIZE:
+                cursor.executemany(sql, batch)
+                batch = []
+        cursor.executemany(sql, batch)
+
+
+class _Postings:
+    """Cursor over one term's postings, highest weight first"""
+
+    def __init__(self, term, weight):
+        self.term = term
+        self.weight = weight
+        self.last = None
+        self.exhausted = False
+
+    def bound(self):
+        """The highest score an unseen job can get from this term"""
+        return self.weight * self.last[1] if self.last else 0
+
+    def read(self, size):
+        # Raw SQL like _score: this runs several times per query per term
+        sql = f'SELECT job_id, impact FROM {JobTermScore._meta.db_table} WHERE term = %s'
+        params = [self.term]
+        if self.last is not None:
+            job_id, impact = self.last
+            sql += ' AND impact <= %s AND (impact < %s OR job_id > %s)'
+            params += [impact, impact, job_id]
+        with connection.cursor() as cursor:
+            cursor.execute(sql + ' ORDER BY impact DESC, job_id LIMIT %s', params + [size])
+            rows = cursor.fetchall()
+        if rows:
+            self.last = rows[-1]
+        self.exhausted = len(rows) < size
+        return [job_id for job_id, impact in rows]
+
+
+def _expand(tokens):
+    """
+    {token: terms it matches}: each token itself and its most common
+    completions, looked up for all the tokens at once.
+    """
+    table = SearchTerm._meta.db_table
+    rows = []
+    for start in range(0, len(tokens), EXPAND_BATCH_SIZE):
+        parts, params = [], []
+        for n, token in enumerate(tokens[start:start + EXPAND_BATCH_SIZE], start):
+            parts.append(
+                f'SELECT * FROM (SELECT {n} AS token, 0 AS exact, term, document_count FROM {table} '
+                f'WHERE term >= %s AND term < %s AND document_count > 0 '
+                f'ORDER BY document_count DESC LIMIT %s) completions{n}'
+            )
+            parts.append(f'SELECT {n}, 1, term, document_count FROM {table} WHERE term = %s AND document_count > 0')
+            params += [token, token + '\U0010ffff', PREFIX_EXPANSIONS, token]
+        with connection.cursor() as cursor:
+            cursor.execute(' UNION ALL '.join(parts), params)
+            rows.extend(cursor.fetchall())
+
+    expansions = {token: {} for token in tokens}
+    for n, exact, term, document_count in sorted(rows, key=lambda row: (row[0], row[1], -row[3])):
+        expansions[tokens[n]].setdefault(term, document_count)
+    return {token: list(terms.items()) for token, terms in expansions.items()}
+
+
+def ranked_ids(queryset, query, limit):
+    """Return the pks of the ``limit`` jobs in ``queryset`` that best match ``query``"""
+    tokens = list(dict.fromkeys(fold(token)[:100] for token in tokenize(query)))
+    if not tokens:
+        return list(queryset.values_list('pk', flat=True)[:limit])
+
+    documents = _collection()[0]
+    expansions = _expand(tokens)
+    groups, postings, sizes = [], {}, {}
+    for token in tokens:
+        terms = expansions[token]
+        if not terms:
+            return []
+        for term, document_count in terms:
+            postings.setdefault(term, _Postings(term, idf(document_count, documents)))
+            sizes[term] = document_count
+        groups.append([term for term, document_count in terms])
+
+    top = []
+    if len(groups) > 1:
+        # Every match contains a term of the rarest token, so its postings
+        # drive a single scoring join; walking lists that barely intersect
+        # would read most of them anyway
+        rarest = min(groups, key=lambda group: sum(sizes[term] for term in group))
+        others = [group for group in groups if group is not rarest]
+        offset, size = 0, limit * 4
+        while True:
+            rows = _join_scores(rarest, others, postings, size, offset)
+            _collect(top, dict(rows), queryset, limit)
+            if len(top) >= limit or len(rows) < size:
+                return [pk for score, pk in sorted(top, reverse=True)]
+            offset += size
+            size *= 2
+
+    seen, size = set(), max(FIRST_CHUNK, limit)
+    size_limit = max(MAX_CANDIDATES // len(postings), 1)
+    while True:
+        size = min(size, size_limit)
+        candidates = set()
+        for cursor in postings.values():
+            if not cursor.exhausted:
+                candidates.update(cursor.read(size))
+        candidates -= seen
+        seen |= candidates
+
+        _collect(top, _score(candidates, groups, postings), queryset, limit)
+
+        # Every token must match, so once all postings of one token have
+        # been read no unseen job can qualify
+        threshold = 0
+        for group in groups:
+            live = [postings[term].bound() for term in group if not postings[term].exhausted]
+            if not live:
+                threshold = None
+                break
+            threshold += max(live)
+        if threshold is None or (len(top) >= limit and top[0][0] >= threshold):
+            break
+        size *= 2
+
+    return [pk for score, pk in sorted(top, reverse=True)]
+
+
+def _collect(top, scores, queryset, limit):
+    """
+    Push the scored jobs that ``queryset`` allows onto the ``top`` heap.
+
+    Candidates are checked against the queryset best first, in chunks, and
+    only while they can still enter the top results.
+    """
+    ranked = sorted(((score, pk) for pk, score in scores.items()), reverse=True)
+    for start in range(0, len(ranked), limit * 4):
+        chunk = ranked[start:start + limit * 4]
+        if len(top) >= limit and chunk[0] <= top[0]:
+            break
+        allowed = set(queryset.order_by().filter(pk__in=[pk for score, pk in chunk]).values_list('pk', flat=True))
+        for entry in chunk:
+            if entry[1] not in allowed:
+                continue
+            if len(top) < limit:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
+
+
+def _weighted(alias, group, postings):
+    """SQL for the best weighted impact among ``group``'s terms, and its params"""
+    cases = ' '.join('WHEN %s THEN %s' for term in group)
+    params = [value for term in group for value in (term, postings[term].weight)]
+    return f'MAX({alias}.impact * CASE {alias}.term {cases} END)', params
+
+
+def _join_scores(rarest, others, postings, limit, offset):
+    """
+    (pk, score) of the best jobs matching every token group, best first.
+
+    One statement walks the postings of the ``rarest`` group and looks up
+    each job's best term of every other group through the (term, job)
+    index, so the intersection and the scores are computed by the
+    database rather than row by row in Python.  The other groups are
+    subqueries per job, not joins: a job carrying several terms of each
+    of many groups costs their sum rather than their product.
+    """
+    table = JobTermScore._meta.db_table
+    score, params = _weighted('d', rarest, postings)
+    for n, group in enumerate(others):
+        best, best_params = _weighted(f'g{n}', group, postings)
+        score += (
+            f' + (SELECT {best} FROM {table} g{n} '
+            f'WHERE g{n}.term IN ({", ".join(["%s"] * len(group))}) AND g{n}.job_id = d.job_id)'
+        )
+        params += best_params + group
+    # A job missing any group scores NULL
+    sql = (
+        f'SELECT job_id, score FROM (SELECT d.job_id AS job_id, {score} AS score FROM {table} d '
+        f'WHERE d.term IN ({", ".join(["%s"] * len(rarest))}) GROUP BY d.job_id) scores '
+        f'WHERE score IS NOT NULL ORDER BY score DESC, job_id DESC LIMIT %s OFFSET %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + rarest + [limit, offset])
+        return cursor.fetchall()
+
+
+def _score(candidates, groups, postings):
+    """BM25 scores of the candidates that match every token group"""
+    if not candidates:
+        return {}
+    # Raw SQL: preparing thousands of ORM lookup parameters per round
+    # costs more than the query itself
+    impacts = defaultdict(dict)
+    terms = list(postings)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT job_id, term, impact FROM {JobTermScore._meta.db_table} '
+            f'WHERE job_id IN ({", ".join(["%s"] * len(candidates))}) '
+            f'AND term IN ({", ".join(["%s"] * len(terms))})',
+            list(candidates) + terms
+        )
+        for job_id, term, impact in cursor.fetchall():
+            impacts[job_id][term] = postings[term].weight * impact
+
+    scores = {}
+    for job_id, weights in impacts.items():
+        score = 0
+        for group in groups:
+            matched = [weights[term] for term in group if term in weights]
+            if not matched:
+                break
+            score += max(matched)
+        else:
+            scores[job_id] = score
+    return scores
@@ -0,0 +1,176 @@
+"""
+Content addressed resume storage.
+
+An uploaded resume is stored under the SHA-256 of its bytes,
+``resumes/<2 hex>/<digest><ext>``, and a file already there is not
+written again, so an applicant sending the same resume to forty jobs
+stores it once and every ``Application.resume`` names the same file.
+
+``ResumeBlob`` counts the applications naming each stored file.  The
+Application signal handlers in models.py adjust the count when an
+application is created, deleted or gets a new resume, with single
+``UPDATE`` statements like jobs.counters; the file is deleted once the
+last application naming it goes; ``recount()`` repairs counts that
+drifted through bulk updates.  ``deduplicate()`` (the
+``dedupe_resumes`` command) moves resumes stored under their upload
+names before this onto their digests.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+
+UNKNOWN = object()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage saving every file under the digest of its content, and only once"""
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        return super().save(digest_name(file_digest(content), name), content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        # Write aside and move into place, so nobody reads a half written
+        # file; concurrent writers of one name write the same bytes
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            os.chmod(temp_path, self.file_permissions_mode or 0o644)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return name
+
+
+storage = ContentAddressedStorage()
+
+
+def get_storage():
+    return storage
+
+
+def file_digest(file):
+    """SHA-256 of ``file``, as hashed by the upload handler or read in chunks"""
+    digest = getattr(file, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
+
+
+def digest_name(digest, filename):
+    return f'resumes/{digest[:2]}/{digest}{os.path.splitext(filename)[1].lower()}'
+
+
+def resume_upload_to(instance, filename):
+    # Renamed after its digest by the storage, which gets the content
+    return filename
+
+
+def retain(name, count=1):
+    from .models import ResumeBlob
+    if ResumeBlob.objects.filter(name=name).update(references=F('references') + count):
+        return
+    try:
+        with transaction.atomic():
+            ResumeBlob.objects.create(name=name, size=_size(name), references=count)
+    except IntegrityError:
+        ResumeBlob.objects.filter(name=name).update(references=F('references') + count)
+
+
+def release(name, count=1):
+    """Drop ``count`` references to ``name``, deleting the file after the last one"""
+    from .models import ResumeBlob
+    with transaction.atomic():
+        ResumeBlob.objects.filter(name=name).update(references=Greatest(F('references') - count, 0))
+        deleted, _ = ResumeBlob.objects.filter(name=name, references=0).delete()
+        if deleted:
+            transaction.on_commit(lambda: storage.delete(name))
+
+
+def _size(name):
+    try:
+        return storage.size(name)
+    except OSError:
+        return 0
+
+
+def application_saved(application, created):
+    previous = None if created else getattr(application, '_counted_resume', UNKNOWN)
+    name = application.resume.name or None
+    if previous is not UNKNOWN and previous != name:
+        if name:
+            retain(name)
+        if previous:
+            release(previous)
+    application._counted_resume = name
+
+
+def application_deleted(application):
+    name = getattr(application, '_counted_resume', application.resume.name)
+    if name:
+        release(name)
+
+
+def recount(application_model=None, blob_model=None):
+    """Rebuild the reference counts from the applications; returns how many rows changed"""
+    if application_model is None:
+        from .models import Application as application_model, ResumeBlob as blob_model
+    actual = dict(
+        application_model.objects.exclude(resume='').values_list('resume').annotate(Count('pk'))
+    )
+    changed = 0
+    for blob in blob_model.objects.all():
+        references = actual.pop(blob.name, 0)
+        if blob.references != references:
+            blob_model.objects.filter(pk=blob.pk).update(references=references)
+            changed += 1
+    blob_model.objects.bulk_create(
+        [blob_model(name=name, size=_size(name), references=count) for name, count in actual.items()],
+        batch_size=500,
+    )
+    return changed + len(actual)
+
+
+def deduplicate():
+    """Move resumes stored under their upload names onto their digests; returns (files moved, bytes freed)"""
+    from .models import Application, ResumeBlob
+    files = freed = 0
+    for blob in ResumeBlob.objects.exclude(name__regex=r'^resumes/[0-9a-f]{2}/[0-9a-f]{64}'):
+        if not storage.exists(blob.name):
+            continue
+        with storage.open(blob.name) as f:
+            name = digest_name(file_digest(f), blob.name)
+            existed = storage.exists(name)
+            storage.save(name, f)
+        with transaction.atomic():
+            # Bulk update: the signal handlers would count each row again
+            moved = Application.objects.filter(resume=blob.name).update(resume=name)
+            retain(name, moved)
+            blob.delete()
+            transaction.on_commit(lambda old=blob.name: storage.delete(old))
+        files += 1
+        freed += blob.size if existed else 0
+    return files, freed
@@ -0,0 +1,118 @@
+"""
+Full-text search for jobs.
+
+On SQLite the searchable text of every job lives in an FTS5 shadow table
+(``jobs_job_fts``) whose rowid is the job id.  The table is created by
+migration 0003 and kept in sync by the Job/Company signal handlers in
+``jobs.models``.  Other database backends fall back to the old
+``icontains`` filters.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'jobs_job_fts'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def fold(token):
+    """Strip diacritics the way the FTS5 unicode61 tokenizer does"""
+    decomposed = unicodedata.normalize('NFKD', token)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 MATCH expression (all terms, prefix match)"""
+    tokens = tokenize(text)
+    if not tokens:
+        return ''
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _job_row(job):
+    company_name = job.company.name if job.company_id else job.company_name
+    return [
+        job.pk,
+        job.title,
+        company_name or '',
+        job.location,
+        job.description,
+        job.requirements,
+    ]
+
+
+def index_job(job):
+    """Insert or replace a job's row in the index"""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [job.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, company, location, description, requirements) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            _job_row(job)
+        )
+
+
+def remove_job(job_id):
+    """Drop a job from the index"""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [job_id])
+
+
+def reindex_company(company):
+    """Refresh the company name on every indexed job of a company"""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {FTS_TABLE} SET company = %s '
+            'WHERE rowid IN (SELECT id FROM jobs_job WHERE company_id = %s)',
+            [company.name, company.pk]
+        )
+
+
+def rebuild_index():
+    """Repopulate the whole index from the jobs table"""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, company, location, description, requirements) '
+            'SELECT j.id, j.title, COALESCE(c.name, j.company_name), j.location, j.description, j.requirements '
+            'FROM jobs_job j LEFT JOIN jobs_company c ON c.id = j.company_id'
+        )
+
+
+def filter_jobs(queryset, query):
+    """Restrict a Job queryset to jobs matching the search text"""
+    if not is_enabled():
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(company__name__icontains=query) |
+            Q(location__icontains=query)
+        )
+
+    match = build_match_query(query)
+    if not match:
+        return queryset
+    return queryset.filter(
+        pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    )
@@ -0,0 +1,196 @@
+"""
+Cache of job search results.
+
+For each normalized set of JobSearchForm filters the cache keeps the
+ordered ids of the first ``SEARCH_CACHE_DEPTH`` matching active jobs,
+so a listing page becomes one primary-key fetch.  A registry of live
+entries lets the Job signal handlers patch them precisely: a new
+matching job is prepended, a job that stops matching (edited,
+deactivated, deleted) is removed.  Changes that cannot be placed in
+order (a job edited or reactivated into a filter, or edited in a
+listing not in the default order) and company renames drop the
+affected entries instead.  ``SEARCH_CACHE_TIMEOUT`` bounds staleness if
+concurrent writers race on the registry.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import ranking
+from .geo import haversine_km
+from .search import fold, tokenize
+
+
+REGISTRY_KEY = 'jobsearch:registry'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def normalize_criteria(cleaned_data):
+    """Reduce JobSearchForm.cleaned_data to a canonical, hashable form"""
+    company = cleaned_data.get('company')
+    return {
+        'query': ' '.join(tokenize(cleaned_data.get('query'))),
+        'job_type': cleaned_data.get('job_type') or '',
+        'experience_level': cleaned_data.get('experience_level') or '',
+        'company': company.pk if company else None,
+        'location': (cleaned_data.get('location') or '').strip().lower(),
+        'near_point': list(cleaned_data['near_point']) if cleaned_data.get('near_point') else None,
+        'radius': cleaned_data.get('radius') if cleaned_data.get('near_point') else None,
+        'salary_from': cleaned_data.get('salary_from'),
+        'salary_to': cleaned_data.get('salary_to'),
+        'sort': cleaned_data.get('sort') or '',
+    }
+
+
+def cache_key(criteria):
+    digest = hashlib.md5(json.dumps(criteria, sort_keys=True).encode()).hexdigest()
+    return f'jobsearch:{digest}'
+
+
+def get_entry(criteria, queryset, ordering):
+    """
+    Return the cached entry for ``criteria``, filling it from ``queryset``.
+
+    An entry is a dict with the ordered ``ids``, whether they are
+    ``complete`` (every match, not just the first SEARCH_CACHE_DEPTH) and
+    the ``criteria`` they were built from.  Relevance-ranked entries are
+    built from the ranking index, so ``queryset`` must not apply the
+    full-text filter; they are complete and ``truncated`` when there are
+    more matches than SEARCH_RANK_DEPTH.
+    """
+    key = cache_key(criteria)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    if criteria['sort'] == 'relevance':
+        # A ranked listing is its top SEARCH_RANK_DEPTH matches; there is
+        # no order to continue in past them
+        depth = _setting('SEARCH_RANK_DEPTH', 120)
+        ids = ranking.ranked_ids(queryset, criteria['query'], depth + 1)
+        entry = {'criteria': criteria, 'ids': ids[:depth], 'complete': True, 'truncated': len(ids) > depth}
+    else:
+        depth = _setting('SEARCH_CACHE_DEPTH', 1200)
+        ids = list(queryset.order_by(*ordering).values_list('pk', flat=True)[:depth + 1])
+        entry = {'criteria': criteria, 'ids': ids[:depth], 'complete': len(ids) <= depth}
+    cache.set(key, entry, _setting('SEARCH_CACHE_TIMEOUT', 300))
+    _register(key, criteria)
+    return entry
+
+
+def _register(key, criteria):
+    registry = cache.get(REGISTRY_KEY) or {}
+    registry.pop(key, None)
+    registry[key] = criteria
+    max_keys = _setting('SEARCH_CACHE_MAX_KEYS', 1000)
+    while len(registry) > max_keys:
+        oldest = next(iter(registry))
+        registry.pop(oldest)
+        cache.delete(oldest)
+    cache.set(REGISTRY_KEY, registry, None)
+
+
+def job_tokens(job):
+    """The folded word tokens a search query is matched against"""
+    company_name = job.company.name if job.company_id else job.company_name
+    text = ' '.join([job.title, company_name or '', job.location, job.description, job.requirements])
+    return {fold(token) for token in tokenize(text)}
+
+
+def job_matches(job, criteria):
+    """Python mirror of the JobListView filters, used for patching"""
+    if not job.is_active:
+        return False
+    if criteria['job_type'] and job.job_type != criteria['job_type']:
+        return False
+    if criteria['experience_level'] and job.experience_level != criteria['experience_level']:
+        return False
+    if criteria['company'] and job.company_id != criteria['company']:
+        return False
+    if criteria['location'] and criteria['location'] not in job.location.lower():
+        return False
+    if criteria['salary_from'] is not None and job.annual_salary_high < criteria['salary_from']:
+        return False
+    if criteria['salary_to'] is not None and job.annual_salary_low > criteria['salary_to']:
+        return False
+    if criteria['near_point']:
+        if job.latitude is None or job.longitude is None:
+            return False
+        if haversine_km(job.latitude, job.longitude, *criteria['near_point']) > criteria['radius']:
+            return False
+    if criteria['query']:
+        tokens = job_tokens(job)
+        for term in criteria['query'].split(' '):
+            term = fold(term)
+            if not any(token.startswith(term) for token in tokens):
+                return False
+    return True
+
+
+def job_saved(job, created):
+    """Patch or drop the cached entries affected by a saved job"""
+    registry = cache.get(REGISTRY_KEY) or {}
+    depth = _setting('SEARCH_CACHE_DEPTH', 1200)
+    entries = cache.get_many(list(registry))
+    patched, dropped = {}, []
+    for key, criteria in registry.items():
+        entry = entries.get(key)
+        if entry is None:
+            dropped.append(key)
+            continue
+        matches = job_matches(job, criteria)
+        listed = job.pk in entry['ids']
+        # Only the default order, on creation, never moves an edited job;
+        # every other sort key (relevance, salary) can depend on the edit
+        if matches == listed and not (listed and criteria['sort']):
+            continue
+        if listed and not matches:
+            entry['ids'].remove(job.pk)
+        elif created and not criteria['sort']:
+            # New jobs sort first under (-created_at, -id)
+            entry['ids'].insert(0, job.pk)
+            if len(entry['ids']) > depth:
+                entry['ids'].pop()
+                entry['complete'] = False
+        else:
+            # Edited or reactivated into the filter, or edited in a listing
+            # sorted by relevance or salary: the job's position is unknown
+            dropped.append(key)
+            continue
+        patched[key] = entry
+    _apply(registry, patched, dropped)
+
+
+def job_deleted(job_id):
+    registry = cache.get(REGISTRY_KEY) or {}
+    entries = cache.get_many(list(registry))
+    patched, dropped = {}, []
+    for key in registry:
+        entry = entries.get(key)
+        if entry is None:
+            dropped.append(key)
+        elif job_id in entry['ids']:
+            entry['ids'].remove(job_id)
+            patched[key] = entry
+    _apply(registry, patched, dropped)
+
+
+def _apply(registry, patched, dropped):
+    if patched:
+        cache.set_many(patched, _setting('SEARCH_CACHE_TIMEOUT', 300))
+    if dropped:
+        cache.delete_many(dropped)
+        for key in dropped:
+            registry.pop(key, None)
+        cache.set(REGISTRY_KEY, registry, None)
+
+
+def company_changed(company):
+    """A company rename can change which jobs match text queries"""
+    registry = cache.get(REGISTRY_KEY) or {}
+    _apply(registry, {}, [key for key, criteria in registry.items() if criteria['query']])
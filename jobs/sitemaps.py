@@ -0,0 +1,157 @@
+"""
+Pre-generated, sharded sitemaps.
+
+``generate()`` writes into ``SITEMAP_ROOT``:
+
+- ``sitemap.xml``, the index, listing every shard with its lastmod;
+- ``sitemap-jobs-<n>.xml``, the active jobs whose primary key falls in
+  the n-th block of ``SITEMAP_SHARD_SIZE`` ids (at most 50,000 URLs, the
+  limit of the sitemap protocol);
+- ``sitemap-companies-<n>.xml``, the companies, sharded the same way.
+
+Shards are keyed on id ranges so a job always stays in the same file.
+Each shard's signature, the newest ``updated_at`` of its rows plus how
+many there are, comes from one grouped query per model; a run only
+rewrites the shards whose signature moved since the last run (an edit or
+activation moves the newest ``updated_at``, a delete or deactivation the
+count) and records the signatures in ``manifest.json``.  Files are
+replaced atomically, and ``views.sitemap`` serves them as they are from
+disk, with an ETag and Last-Modified taken from the file.
+"""
+import json
+import os
+import tempfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Max
+from django.urls import reverse
+
+from .models import Company, Job
+
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+MANIFEST = 'manifest.json'
+
+
+def _root():
+    return str(getattr(settings, 'SITEMAP_ROOT', settings.BASE_DIR / 'sitemaps'))
+
+
+def _shard_size():
+    return min(getattr(settings, 'SITEMAP_SHARD_SIZE', 50000), 50000)
+
+
+def _write(path, chunks):
+    """Write ``chunks`` to ``path`` through a temporary file, replacing it atomically"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.sitemap-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.writelines(chunks)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class Section:
+    """One kind of page in the sitemap: which rows, and their URLs"""
+
+    def __init__(self, name, queryset, url_field, url_name, url_kwarg, placeholder):
+        self.name = name
+        self.queryset = queryset
+        self.url_field = url_field
+        self.url_name = url_name
+        self.url_kwarg = url_kwarg
+        self.placeholder = placeholder
+
+    def filename(self, shard):
+        return f'sitemap-{self.name}-{shard + 1}.xml'
+
+    def signatures(self, size):
+        """{shard: (newest updated_at, row count)} in one grouped query"""
+        rows = (
+            self.queryset.order_by()
+            .annotate(shard=ExpressionWrapper((F('pk') - 1) / size, output_field=IntegerField()))
+            .values('shard')
+            .annotate(latest=Max('updated_at'), count=Count('pk'))
+        )
+        return {row['shard']: (row['latest'].isoformat(), row['count']) for row in rows}
+
+    def urls(self, shard, size, base_url):
+        url_format = base_url + reverse(
+            self.url_name, kwargs={self.url_kwarg: self.placeholder}
+        ).replace(str(self.placeholder), '{}')
+        rows = (
+            self.queryset.filter(pk__gt=shard * size, pk__lte=(shard + 1) * size)
+            .order_by('pk')
+            .values_list(self.url_field, 'updated_at')
+        )
+        for key, updated_at in rows.iterator(chunk_size=2000):
+            yield url_format.format(key), updated_at
+
+    def render(self, shard, size, base_url):
+        yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+        for url, updated_at in self.urls(shard, size, base_url):
+            yield f'<url><loc>{escape(url)}</loc><lastmod>{updated_at.date().isoformat()}</lastmod></url>\n'
+        yield '</urlset>\n'
+
+
+SECTIONS = (
+    Section('jobs', Job.objects.filter(is_active=True), 'pk', 'job_detail', 'pk', 987654321),
+    Section('companies', Company.objects.all(), 'slug', 'company_detail', 'slug', 'company-slug'),
+)
+
+
+def _render_index(shards, base_url):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for filename, latest in shards:
+        yield (
+            f'<sitemap><loc>{escape(base_url)}/{filename}</loc>'
+            f'<lastmod>{latest}</lastmod></sitemap>\n'
+        )
+    yield '</sitemapindex>\n'
+
+
+def generate(force=False):
+    """Bring the sitemap files up to date; returns the names of the files written"""
+    root = _root()
+    os.makedirs(root, exist_ok=True)
+    base_url = settings.SITE_URL.rstrip('/')
+    size = _shard_size()
+
+    manifest_path = os.path.join(root, MANIFEST)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get('shard_size') != size or manifest.get('base_url') != base_url:
+        force = True
+    known = manifest.get('shards', {})
+    previous = {} if force else known
+
+    current, written, index = {}, [], []
+    for section in SECTIONS:
+        for shard, signature in sorted(section.signatures(size).items()):
+            filename = section.filename(shard)
+            current[filename] = list(signature)
+            index.append((filename, signature[0]))
+            if previous.get(filename) != current[filename] or not os.path.exists(os.path.join(root, filename)):
+                _write(os.path.join(root, filename), section.render(shard, size, base_url))
+                written.append(filename)
+
+    # Shards left without rows
+    for filename in set(known) - set(current):
+        try:
+            os.unlink(os.path.join(root, filename))
+        except FileNotFoundError:
+            pass
+
+    if written or set(known) != set(current) or not os.path.exists(os.path.join(root, 'sitemap.xml')):
+        _write(os.path.join(root, 'sitemap.xml'), _render_index(index, base_url))
+        written.append('sitemap.xml')
+    _write(manifest_path, [json.dumps({'shard_size': size, 'base_url': base_url, 'shards': current})])
+    return written
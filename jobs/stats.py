@@ -0,0 +1,87 @@
+"""
+Site-wide totals shown on the home page.
+
+The active job, application and company totals live in the shared cache
+as one key each, so the signal handlers can bump them with an atomic
+``cache.incr`` instead of the home page counting three tables per hit.
+Every ``SITE_STATS_RECOUNT_INTERVAL`` seconds, or when the keys are gone
+after a cache flush, they are recounted from the database.
+
+Recounts are single flight: the worker that wins ``cache.add`` on the
+lock key recounts while the others keep serving the last snapshot they
+saw, rather than all of them hitting the tables at once.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+TOTALS = ('jobs', 'applications', 'companies')
+
+COMPUTED_AT_KEY = 'sitestats:computed_at'
+LOCK_KEY = 'sitestats:recount'
+
+# A recount that crashed releases the lock after this many seconds
+LOCK_TIMEOUT = 60
+
+# Per process fallback served while another worker recounts
+_last_snapshot = None
+
+
+def _key(total):
+    return f'sitestats:{total}'
+
+
+def count_totals():
+    from .models import Application, Company, Job
+    return {
+        'jobs': Job.objects.filter(is_active=True).count(),
+        'applications': Application.objects.count(),
+        'companies': Company.objects.count(),
+    }
+
+
+def recount():
+    """Count the totals from the database and store them"""
+    global _last_snapshot
+    snapshot = count_totals()
+    values = {_key(total): count for total, count in snapshot.items()}
+    values[COMPUTED_AT_KEY] = time.time()
+    cache.set_many(values, None)
+    _last_snapshot = snapshot
+    return snapshot
+
+
+def get_snapshot():
+    """The site totals, as a dict of ``jobs``, ``applications`` and ``companies``"""
+    global _last_snapshot
+    keys = [_key(total) for total in TOTALS]
+    values = cache.get_many(keys + [COMPUTED_AT_KEY])
+    snapshot = None
+    if all(key in values for key in keys):
+        snapshot = {total: values[_key(total)] for total in TOTALS}
+        _last_snapshot = snapshot
+    interval = getattr(settings, 'SITE_STATS_RECOUNT_INTERVAL', 600)
+    if snapshot is not None and time.time() - values.get(COMPUTED_AT_KEY, 0) < interval:
+        return snapshot
+
+    if cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        try:
+            return recount()
+        finally:
+            cache.delete(LOCK_KEY)
+    # Another worker is recounting
+    if snapshot is not None:
+        return snapshot
+    if _last_snapshot is not None:
+        return _last_snapshot
+    return count_totals()
+
+
+def adjust(total, delta):
+    """Add ``delta`` to a total; a missing total is left for the next recount"""
+    try:
+        cache.incr(_key(total), delta)
+    except ValueError:
+        pass
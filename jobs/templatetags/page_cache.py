@@ -0,0 +1,20 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from jobs.page_cache import hole_marker
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name):
+    """
+    Include ``template_name``, or leave a marker for it when the page is
+    rendered for the anonymous page cache.  Hole templates only see the
+    context processors' variables.
+    """
+    request = context.get('request')
+    if getattr(request, 'page_cache_holes', False):
+        return mark_safe(hole_marker(template_name))
+    return context.template.engine.get_template(template_name).render(context)
@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+
+from jobs.models import Application, Company, Job
+
+
+def make_user(username, user_type='applicant'):
+    user = User.objects.create_user(username=username, password='secret', email=f'{username}@example.com')
+    user.profile.user_type = user_type
+    user.profile.save()
+    return user
+
+
+def make_company(name='Acme', **kwargs):
+    return Company.objects.create(
+        name=name, slug=name.lower().replace(' ', '-'), description=f'{name} makes things', **kwargs
+    )
+
+
+def make_job(posted_by, company=None, title='Python Developer', **kwargs):
+    fields = {
+        'location': 'Austin, TX',
+        'description': 'Build web applications with Django.',
+        'requirements': 'Python, SQL',
+        **kwargs,
+    }
+    return Job.objects.create(
+        title=title, company=company, company_name=company.name if company else 'Acme', posted_by=posted_by, **fields
+    )
+
+
+def make_application(job, applicant, **kwargs):
+    fields = {'resume': 'resumes/cv.pdf', 'cover_letter': 'I would like to apply.', **kwargs}
+    return Application.objects.create(job=job, applicant=applicant, **fields)
@@ -0,0 +1,46 @@
+import math
+from string import ascii_lowercase
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jobs import alerts
+from jobs.models import JobAlert, SavedSearch
+from jobs.tests.factories import make_job, make_user
+
+
+def word(n):
+    """A distinct six letter word for each ``n``"""
+    letters = []
+    for _ in range(6):
+        n, letter = divmod(n, len(ascii_lowercase))
+        letters.append(ascii_lowercase[letter])
+    return ''.join(letters)
+
+
+class LongDescriptionAlertTests(TestCase):
+    def setUp(self):
+        self.employer = make_user('employer', 'employer')
+        self.applicant = make_user('applicant')
+
+    @mock.patch.object(alerts, 'ANCHOR_BATCH_SIZE', 100)
+    def test_a_long_description_is_matched_in_batches_under_the_parameter_limit(self):
+        description = ' '.join(word(n) for n in range(300)) + ' kubernetes'
+        kubernetes = SavedSearch.objects.create(user=self.applicant, name='Kubernetes', query='kubernetes')
+        austin = SavedSearch.objects.create(user=self.applicant, name='Austin', location='Austin')
+
+        job = make_job(self.employer, title='Platform Engineer', description=description)
+
+        keys = len(alerts.job_keys(job))
+        self.assertGreater(keys, 3 * alerts.ANCHOR_BATCH_SIZE)
+        with CaptureQueriesContext(connection) as queries:
+            searches = alerts.matching_searches(job)
+        self.assertCountEqual(searches, [kubernetes, austin])
+        lookups = [query['sql'] for query in queries.captured_queries if 'jobs_savedsearch' in query['sql']]
+        self.assertEqual(len(lookups), math.ceil(keys / alerts.ANCHOR_BATCH_SIZE))
+        self.assertEqual(
+            set(JobAlert.objects.filter(job=job).values_list('saved_search', flat=True)),
+            {kubernetes.pk, austin.pk},
+        )
@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from jobs.pagination import encode_cursor
+from jobs.tests.factories import make_company, make_job, make_user
+
+
+class CursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        employer = make_user('employer', 'employer')
+        for n in range(3):
+            make_job(employer, make_company(f'Company {n}'), title=f'Engineer {n}')
+
+    def test_following_next_pages_through_every_row(self):
+        for url in ('/api/v1/jobs/', '/api/v1/companies/'):
+            seen, next_url = [], f'{url}?limit=2'
+            while next_url:
+                body = self.client.get(next_url).json()
+                seen.extend(result['id'] for result in body['results'])
+                next_url = body['next']
+            self.assertEqual(len(seen), 3)
+            self.assertEqual(len(set(seen)), 3)
+
+    def test_a_tampered_cursor_is_a_bad_request(self):
+        for url, payload in (
+            ('/api/v1/jobs/', ['next', ['garbage', 1]]),
+            ('/api/v1/jobs/', ['next', [None, None]]),
+            ('/api/v1/companies/', ['next', [1, 'x']]),
+            ('/api/v1/companies/', ['next', 'ab']),
+        ):
+            with self.subTest(url=url, payload=payload):
+                response = self.client.get(url, {'cursor': encode_cursor(*payload)})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Invalid cursor'})
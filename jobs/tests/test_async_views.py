@@ -0,0 +1,91 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path, resolve
+
+from jobportal import urls as project_urls
+from jobs import async_views, urls as job_urls
+from jobs.tests.factories import make_application, make_company, make_job, make_user
+
+
+# The project's URLs with the views ASYNC_VIEWS swaps in, which jobs.urls
+# picks once at import
+ASYNC_ROUTES = {
+    'home': async_views.home,
+    'job_list': async_views.JobListView.as_view(),
+    'job_detail': async_views.JobDetailView.as_view(),
+    'search_jobs': async_views.search_jobs,
+}
+urlpatterns = [
+    pattern for pattern in project_urls.urlpatterns if getattr(pattern, 'urlconf_name', None) is not job_urls
+] + [
+    path('', include([
+        path(str(pattern.pattern), ASYNC_ROUTES[pattern.name], name=pattern.name)
+        if pattern.name in ASYNC_ROUTES else pattern
+        for pattern in job_urls.urlpatterns
+    ])),
+]
+
+ASYNC_MIDDLEWARE = [
+    'jobs.allauth_async.AccountMiddleware' if name == 'allauth.account.middleware.AccountMiddleware' else name
+    for name in settings.MIDDLEWARE
+]
+
+
+@override_settings(
+    ROOT_URLCONF='jobs.tests.test_async_views', ASYNC_VIEWS=True, MIDDLEWARE=ASYNC_MIDDLEWARE,
+    QUERY_BUDGET_STRICT=True,
+)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = make_user('employer', 'employer')
+        self.applicant = make_user('applicant')
+        self.company = make_company('Acme')
+        self.job = make_job(self.employer, self.company, title='Python Developer', job_type='full-time')
+        make_job(self.employer, self.company, title='Data Analyst', job_type='contract', requirements='Excel')
+
+    @sync_to_async
+    def login_applicant(self):
+        make_application(self.job, self.applicant)
+        self.async_client.force_login(self.applicant)
+
+    def test_hot_views_are_the_async_ones(self):
+        self.assertIs(resolve('/').func, async_views.home)
+        self.assertIs(resolve('/jobs/').func.view_class, async_views.JobListView)
+
+    async def test_home(self):
+        response = await self.async_client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Python Developer')
+
+    async def test_job_list_with_facets(self):
+        response = await self.async_client.get('/jobs/', {'job_type': 'full-time'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Python Developer')
+        self.assertNotContains(response, 'Data Analyst')
+        job_types = next(group for group in response.context['facets'] if group['name'] == 'job_type')
+        counts = {option['value']: option['count'] for option in job_types['options']}
+        self.assertEqual((counts['full-time'], counts['contract']), (1, 1))
+
+    async def test_job_list_marks_applied_jobs(self):
+        await self.login_applicant()
+        response = await self.async_client.get('/jobs/')
+        self.assertEqual(response.context['applied_job_ids'], {self.job.pk})
+
+    async def test_job_detail(self):
+        await self.login_applicant()
+        response = await self.async_client.get(f'/jobs/{self.job.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['has_applied'])
+
+    async def test_missing_job_is_not_found(self):
+        response = await self.async_client.get('/jobs/999999/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_search(self):
+        response = await self.async_client.get('/search/', {'query': 'python'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job['title'] for job in response.json()['jobs']], ['Python Developer'])
+
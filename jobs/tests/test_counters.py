@@ -0,0 +1,50 @@
+from django.test import TestCase
+
+from jobs.models import Company, Job
+from jobs.tests.factories import make_application, make_company, make_job, make_user
+
+
+class StaleSaveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = make_user('employer', 'employer')
+        cls.applicant = make_user('applicant')
+        cls.company = make_company()
+        cls.job = make_job(cls.employer, cls.company)
+
+    def test_editing_a_job_loaded_before_an_application_keeps_the_counts(self):
+        job = Job.objects.get(pk=self.job.pk)
+        make_application(self.job, self.applicant)
+
+        job.title = 'Senior Python Developer'
+        job.save()
+
+        job = Job.objects.get(pk=self.job.pk)
+        self.assertEqual(job.title, 'Senior Python Developer')
+        self.assertEqual(job.applications_count, 1)
+        self.assertEqual(job.applications_pending, 1)
+
+    def test_editing_a_job_through_the_update_view_keeps_the_counts(self):
+        make_application(self.job, self.applicant)
+        self.client.force_login(self.employer)
+        job = Job.objects.get(pk=self.job.pk)
+
+        response = self.client.post(f'/jobs/{job.pk}/edit/', {
+            'title': 'Lead Python Developer', 'company': self.company.pk, 'location': job.location,
+            'description': job.description, 'requirements': job.requirements,
+            'job_type': job.job_type, 'experience_level': job.experience_level,
+        })
+
+        self.assertEqual(response.status_code, 302)
+        job = Job.objects.get(pk=self.job.pk)
+        self.assertEqual(job.title, 'Lead Python Developer')
+        self.assertEqual(job.applications_count, 1)
+
+    def test_editing_a_stale_company_keeps_its_active_job_count(self):
+        company = Company.objects.get(pk=self.company.pk)
+        make_job(self.employer, self.company, title='Data Engineer')
+
+        company.headquarters = 'Austin'
+        company.save()
+
+        self.assertEqual(Company.objects.get(pk=self.company.pk).active_jobs_count, 2)
@@ -0,0 +1,56 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jobs import facets
+from jobs.models import Job
+from jobs.tests.factories import make_company, make_job, make_user
+
+
+class ComputeFacetsTests(TestCase):
+    def setUp(self):
+        self.employer = make_user('employer', 'employer')
+        self.acme = make_company('Acme')
+        self.globex = make_company('Globex')
+        make_job(self.employer, self.acme, job_type='full-time', experience_level='senior')
+        make_job(self.employer, self.acme, job_type='contract', experience_level='senior', location='Boston, MA')
+        make_job(self.employer, self.globex, job_type='full-time', experience_level='entry')
+
+    def counts(self, selected=None, limit=10):
+        groups = facets.compute_facets(Job.objects.all(), selected or {}, limit=limit)
+        return {group['name']: {option['value']: option['count'] for option in group['options']} for group in groups}
+
+    def test_unfiltered_counts(self):
+        counts = self.counts()
+        self.assertEqual(counts['job_type'], {
+            'full-time': 2, 'part-time': 0, 'contract': 1, 'internship': 0, 'freelance': 0,
+        })
+        self.assertEqual(counts['experience_level'], {'entry': 1, 'mid': 0, 'senior': 2, 'executive': 0})
+        self.assertEqual(counts['company'], {self.acme.pk: 2, self.globex.pk: 1})
+        self.assertEqual(counts['location'], {'Austin, TX': 2, 'Boston, MA': 1})
+
+    def test_each_facet_is_counted_with_the_other_filters(self):
+        counts = self.counts({'job_type': 'full-time', 'company': self.acme.pk})
+        # Switching job type keeps the company filter, and the other way round
+        self.assertEqual(counts['job_type']['full-time'], 1)
+        self.assertEqual(counts['job_type']['contract'], 1)
+        self.assertEqual(counts['company'], {self.acme.pk: 1, self.globex.pk: 1})
+        self.assertEqual(counts['experience_level']['senior'], 1)
+        self.assertEqual(counts['location'], {'Austin, TX': 1})
+
+    def test_companies_and_locations_are_cut_to_the_top_values(self):
+        counts = self.counts(limit=1)
+        self.assertEqual(counts['company'], {self.acme.pk: 2})
+        self.assertEqual(counts['location'], {'Austin, TX': 2})
+
+    def test_query_count_does_not_grow_with_the_results(self):
+        for n in range(20):
+            make_job(self.employer, make_company(f'Company {n}'), location=f'Town {n}')
+        with CaptureQueriesContext(connection) as queries:
+            groups = facets.compute_facets(Job.objects.all(), {})
+        self.assertEqual(len(queries), 3)
+        # No query groups by every facet column at once
+        for query in queries.captured_queries:
+            self.assertNotIn('"jobs_job"."job_type", "jobs_job"."experience_level"', query['sql'])
+        company = next(group for group in groups if group['name'] == 'company')
+        self.assertEqual(len(company['options']), 10)
@@ -0,0 +1,46 @@
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+from xml.etree import ElementTree
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from jobs import feeds
+from jobs.tests.factories import make_company, make_job, make_user
+
+
+class XmlFeedTests(TestCase):
+    def test_control_characters_are_dropped(self):
+        make_job(
+            make_user('employer', 'employer'), make_company('Acme'),
+            title='Python\x0b Developer', description='Build\x00 things\x1f.\tWith tabs\nand lines.',
+        )
+        document = ''.join(feeds.generate('xml', 'https://jobs.example.com'))
+        job = ElementTree.fromstring(document).find('job')
+        self.assertEqual(job.findtext('title'), 'Python Developer')
+        self.assertTrue(job.findtext('description').startswith('Build things.\tWith tabs\nand lines.'))
+
+
+class ExportJobFeedTests(TestCase):
+    def setUp(self):
+        make_job(make_user('employer', 'employer'), make_company('Acme'), title='Python Developer')
+
+    def test_writes_to_the_command_stdout(self):
+        out = StringIO()
+        call_command('export_job_feed', stdout=out)
+        self.assertEqual([json.loads(line)['title'] for line in out.getvalue().splitlines()], ['Python Developer'])
+
+    def test_writes_a_gzipped_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            output = os.path.join(root, 'jobs.xml.gz')
+            call_command('export_job_feed', format='xml', gzip=True, output=output, stdout=StringIO())
+            with gzip.open(output) as f:
+                document = ElementTree.parse(f).getroot()
+        self.assertEqual(document.find('job').findtext('title'), 'Python Developer')
+
+    def test_gzip_needs_an_output_file(self):
+        with self.assertRaises(CommandError):
+            call_command('export_job_feed', gzip=True, stdout=StringIO())
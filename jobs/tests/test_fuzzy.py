@@ -0,0 +1,23 @@
+from django.test import TestCase
+
+from jobs import fuzzy
+from jobs.tests.factories import make_company, make_job, make_user
+
+
+class CorrectQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_job(make_user('employer', 'employer'), make_company('Acme'), title='Python Developer')
+
+    def closest_word(self, word, min_similarity):
+        return {'pyhton': 'python', 'develper': 'developer'}.get(word)
+
+    def test_unknown_words_are_replaced_and_known_prefixes_kept(self):
+        self.assertEqual(fuzzy.correct_query('Pyhton devel', self.closest_word), 'python devel')
+        self.assertIsNone(fuzzy.correct_query('python dev', self.closest_word))
+
+    def test_a_long_query_is_checked_in_one_query(self):
+        query = 'pyhton develper ' + ' '.join(f'word{n}' for n in range(30))
+        with self.assertNumQueries(1):
+            corrected = fuzzy.correct_query(query, self.closest_word)
+        self.assertTrue(corrected.startswith('python developer word0 '))
@@ -0,0 +1,159 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+
+from jobs import query_budget
+from jobs.models import Application, Job
+from jobs.tests.factories import make_application, make_job, make_user
+
+
+class JobApplicationsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = make_user('employer', 'employer')
+        cls.job = make_job(cls.employer)
+        cls.applications = [
+            make_application(cls.job, make_user(f'applicant{n}'), cover_letter=f'Cover letter {n}')
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.employer)
+
+    def url(self, suffix=''):
+        return f'/jobs/{self.job.pk}/applications/{suffix}'
+
+
+class TriageTests(JobApplicationsTestCase):
+    def test_page_lists_applications_with_the_bulk_form(self):
+        response = self.client.get(self.url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertContains(response, f'action="{self.url("status/")}"')
+        for application in self.applications:
+            self.assertContains(response, f'name="applications" value="{application.pk}"')
+
+    def test_selected_applications_are_updated_and_the_list_shown_again(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.employer)
+        client.get(self.url())
+        selected = [self.applications[0].pk, self.applications[1].pk]
+
+        response = client.post(self.url('status/'), {
+            'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+            'status': 'rejected', 'select': 'selected', 'applications': selected,
+        }, follow=True)
+
+        self.assertRedirects(response, self.url())
+        self.assertContains(response, '2 application(s) marked rejected.')
+        self.assertEqual(
+            set(Application.objects.filter(status='rejected').values_list('pk', flat=True)), set(selected)
+        )
+        job = Job.objects.get(pk=self.job.pk)
+        self.assertEqual((job.applications_pending, job.applications_rejected), (1, 2))
+
+    def test_top_n_takes_the_first_listed(self):
+        response = self.client.post(self.url('status/'), {
+            'status': 'shortlisted', 'select': 'top', 'top': '1',
+        }, follow=True)
+
+        self.assertContains(response, '1 application(s) marked shortlisted.')
+        newest = Application.objects.filter(job=self.job).order_by('-applied_at').first()
+        self.assertEqual(newest.status, 'shortlisted')
+
+    def test_another_employer_cannot_triage(self):
+        self.client.force_login(make_user('other', 'employer'))
+
+        response = self.client.post(self.url('status/'), {
+            'status': 'rejected', 'applications': [self.applications[0].pk],
+        })
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Application.objects.filter(status='rejected').exists())
+
+
+class ApplicantSearchPageTests(JobApplicationsTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.match = make_application(
+            cls.job, make_user('wrangler'), cover_letter='Ten years of unicorn wrangling on <large> farms.'
+        )
+        call_command('index_applications', '--once', '--workers', '1', stdout=StringIO())
+
+    def test_search_renders_only_the_matches_with_their_snippets(self):
+        response = self.client.get(self.url(), {'q': 'unicorn'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['applications']), [self.match])
+        self.assertContains(response, 'value="unicorn"')
+        self.assertContains(response, 'Ten years of <mark>unicorn</mark> wrangling on &lt;large&gt; farms')
+        self.assertContains(response, f'name="applications" value="{self.match.pk}"')
+        self.assertNotContains(response, f'name="applications" value="{self.applications[0].pk}"')
+        # Top N from the search applies to the search results
+        self.assertContains(response, '<input type="hidden" name="q" value="unicorn">', html=True)
+
+    def test_top_n_of_a_search_takes_its_best_matches(self):
+        response = self.client.post(self.url('status/'), {
+            'status': 'rejected', 'select': 'top', 'top': '1', 'q': 'unicorn',
+        }, follow=True)
+
+        self.assertRedirects(response, self.url() + '?q=unicorn')
+        self.assertContains(response, '1 application(s) marked rejected.')
+        self.assertEqual(
+            list(Application.objects.filter(status='rejected').values_list('pk', flat=True)), [self.match.pk]
+        )
+
+    def test_a_triage_over_its_query_budget_changes_nothing(self):
+        exceeded = query_budget.QueryBudgetExceeded('over budget')
+        with mock.patch.object(query_budget, 'check_budget', side_effect=exceeded):
+            with self.assertRaises(query_budget.QueryBudgetExceeded):
+                self.client.post(self.url('status/'), {
+                    'status': 'rejected', 'select': 'top', 'top': '2', 'q': 'cover',
+                })
+
+        self.assertFalse(Application.objects.filter(status='rejected').exists())
+        self.assertEqual(Job.objects.get(pk=self.job.pk).applications_rejected, 0)
+
+    def test_search_without_matches_says_so(self):
+        response = self.client.get(self.url(), {'q': 'zeppelin'})
+
+        self.assertContains(response, 'No applications match')
+        self.assertNotContains(response, 'name="applications"')
+
+
+class MatchSortTests(JobApplicationsTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for application, score in zip(cls.applications, (0.25, 0.9)):
+            Application.objects.filter(pk=application.pk).update(match_score=score)
+
+    def test_sort_by_match_lists_the_best_scores_first_with_the_score_column(self):
+        response = self.client.get(self.url(), {'sort': 'match'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [application.pk for application in response.context['applications']],
+            [self.applications[1].pk, self.applications[0].pk, self.applications[2].pk],
+        )
+        self.assertContains(response, '<option value="match" selected>Best match first</option>', html=True)
+        self.assertContains(response, '<th>Match</th>', html=True)
+        self.assertContains(response, '90%')
+        self.assertContains(response, '25%')
+        self.assertContains(response, 'title="Not scored yet"')
+        self.assertContains(response, '<input type="hidden" name="sort" value="match">', html=True)
+
+    def test_top_n_by_match_takes_the_best_scores(self):
+        response = self.client.post(self.url('status/'), {
+            'status': 'shortlisted', 'select': 'top', 'top': '1', 'sort': 'match',
+        }, follow=True)
+
+        self.assertRedirects(response, self.url() + '?sort=match')
+        self.assertEqual(
+            list(Application.objects.filter(status='shortlisted').values_list('pk', flat=True)),
+            [self.applications[1].pk],
+        )
@@ -0,0 +1,23 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from jobs.models import CompanyGallery
+from jobs.tests.factories import make_company
+
+
+class CompanyGalleryPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = make_company('Acme')
+        self.url = f'/companies/{self.company.slug}/'
+
+    def test_gallery_edits_show_on_the_cached_company_page(self):
+        self.assertNotContains(self.client.get(self.url), 'Our new office')
+
+        image = CompanyGallery.objects.create(
+            company=self.company, image='company_gallery/office.png', caption='Our new office'
+        )
+        self.assertContains(self.client.get(self.url), 'Our new office')
+
+        image.delete()
+        self.assertNotContains(self.client.get(self.url), 'Our new office')
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from jobs.models import Job
+from jobs.pagination import InvalidCursor, decode_cursor, encode_cursor
+from jobs.tests.factories import make_company, make_job, make_user
+
+
+TAMPERED = [
+    ['next', ['garbage', 1]],
+    ['next', [1, 'x']],
+    ['next', [None, None]],
+    ['next', [1]],
+    ['next', 'ab'],
+    ['sideways', [1, 2]],
+]
+
+
+class DecodeCursorTests(TestCase):
+    ordering = ('-created_at', '-id')
+
+    def test_a_cursor_round_trips(self):
+        job = make_job(make_user('employer', 'employer'))
+        direction, values = decode_cursor(encode_cursor('next', [job.created_at, job.pk]), Job, self.ordering)
+        self.assertEqual((direction, values), ('next', [job.created_at, job.pk]))
+
+    def test_tampered_cursors_are_invalid(self):
+        for token in [encode_cursor(*payload) for payload in TAMPERED] + ['bm90IGpzb24', '%%%']:
+            with self.subTest(token=token), self.assertRaises(InvalidCursor):
+                decode_cursor(token, Job, self.ordering)
+
+
+class TamperedCursorListingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        employer = make_user('employer', 'employer')
+        for n in range(3):
+            make_job(employer, make_company(f'Company {n}'), title=f'Engineer {n}')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_a_tampered_cursor_shows_the_first_page(self):
+        # Job cursors are (created_at, id), company cursors (name, id)
+        for url, context_name, payloads in (
+            ('/jobs/', 'jobs', TAMPERED),
+            ('/companies/', 'companies', [['next', [1, 'x']], ['next', [None, None]], ['prev', ['Company 1']]]),
+        ):
+            first = list(self.client.get(url).context[context_name])
+            for payload in payloads:
+                with self.subTest(url=url, payload=payload):
+                    cache.clear()
+                    response = self.client.get(url, {'cursor': encode_cursor(*payload)})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(list(response.context[context_name]), first)
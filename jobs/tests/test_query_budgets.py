@@ -0,0 +1,156 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from jobs import query_budget
+from jobs.models import SavedSearch
+from jobs.tests.factories import make_application, make_company, make_job, make_user
+
+
+# Every word is in the jobs the listing tests add, so the search runs
+# its whole course instead of stopping at the first unmatched word
+LONG_QUERY = (
+    'python developer django web applications build sql austin remote senior '
+    'backend services api rest postgres docker cloud team agile testing'
+)
+
+
+class QueryBudgetMixin:
+    """
+    Renders a budgeted view at 1 row and at ``rows`` rows, added by the
+    test case's ``add_row(n)``, with budgets raising.
+    """
+    # Rows of the larger rendering, within one page of every listing
+    rows = 10
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(QUERY_BUDGET_STRICT=True))
+        cache.clear()
+
+    def view_queries(self, url, params=None):
+        """Queries the budgeted view at ``url`` ran, checked against its budget"""
+        # Pages cached for anonymous visitors would answer without the view
+        cache.clear()
+        with mock.patch.object(query_budget, 'check_budget', wraps=query_budget.check_budget) as check:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(check.call_count, 1, f'{url} is not under a query budget')
+        name, counter, budget = check.call_args.args
+        self.assertLessEqual(len(counter), budget, f'{name} ran: ' + '\n'.join(counter.queries))
+        return len(counter)
+
+    def assert_within_budget(self, url, params=None):
+        """``url`` stays within its budget, at the same count, rendering 1 row and ``rows`` rows"""
+        self.add_row(0)
+        one = self.view_queries(url, params)
+        for n in range(1, self.rows):
+            self.add_row(n)
+        self.assertEqual(self.view_queries(url, params), one)
+        return one
+
+
+class CheckBudgetTests(SimpleTestCase):
+    def counter(self, queries):
+        counter = query_budget.QueryCounter()
+        counter.queries = ['SELECT 1'] * queries
+        return counter
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_going_over_budget_raises_when_strict(self):
+        query_budget.check_budget('job_list', self.counter(2), 2)
+        with self.assertRaises(query_budget.QueryBudgetExceeded):
+            query_budget.check_budget('job_list', self.counter(3), 2)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_going_over_budget_is_logged_otherwise(self):
+        with self.assertLogs('jobs.query_budget', 'WARNING') as logs:
+            query_budget.check_budget('job_list', self.counter(3), 2)
+        self.assertIn('job_list ran 3 queries, over its budget of 2', logs.output[0])
+
+
+class EmployerDashboardBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employer = make_user('employer', 'employer')
+        self.applicant = make_user('applicant')
+        self.client.force_login(self.employer)
+
+    def add_row(self, n):
+        job = make_job(self.employer, make_company(f'Company {n}'), title=f'Engineer {n}')
+        make_application(job, self.applicant)
+
+    def test_employer_dashboard(self):
+        self.assert_within_budget('/employer/dashboard/')
+
+
+class ApplicantDashboardBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employer = make_user('employer', 'employer')
+        self.applicant = make_user('applicant')
+        self.client.force_login(self.applicant)
+
+    def add_row(self, n):
+        job = make_job(self.employer, make_company(f'Company {n}'), title=f'Engineer {n}')
+        make_application(job, self.applicant)
+        SavedSearch.objects.create(user=self.applicant, name=f'Search {n}', query=f'engineer {n}')
+
+    def test_applicant_dashboard(self):
+        self.assert_within_budget('/applicant/dashboard/')
+
+
+class ListingBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employer = make_user('employer', 'employer')
+
+    def add_row(self, n):
+        company = make_company(f'Company {n}')
+        make_job(self.employer, company, title=f'Python Developer {n}', description=LONG_QUERY)
+
+    def test_job_list(self):
+        self.assert_within_budget('/jobs/')
+
+    def test_job_list_with_a_long_query(self):
+        short = self.assert_within_budget('/jobs/', {'query': 'python developer'})
+        self.assertEqual(self.view_queries('/jobs/', {'query': LONG_QUERY}), short)
+
+    def test_job_list_by_relevance_with_a_long_query(self):
+        short = self.assert_within_budget('/jobs/', {'query': 'python developer', 'sort': 'relevance'})
+        self.assertEqual(self.view_queries('/jobs/', {'query': LONG_QUERY, 'sort': 'relevance'}), short)
+
+    def test_company_list(self):
+        self.assert_within_budget('/companies/')
+
+    def test_search_jobs(self):
+        self.assert_within_budget('/search/', {'query': 'python developer'})
+
+    def test_search_jobs_with_a_long_query(self):
+        short = self.assert_within_budget('/search/', {'query': 'python developer'})
+        self.assertEqual(self.view_queries('/search/', {'query': LONG_QUERY}), short)
+
+    def test_api_job_list(self):
+        self.assert_within_budget('/api/v1/jobs/')
+
+    def test_api_company_list(self):
+        self.assert_within_budget('/api/v1/companies/')
+
+
+class DetailBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employer = make_user('employer', 'employer')
+        self.company = make_company('Acme')
+
+    def add_row(self, n):
+        make_job(self.employer, self.company, title=f'Python Developer {n}')
+
+    def test_api_job_detail(self):
+        self.add_row(0)
+        job = self.company.jobs.get()
+        self.assertEqual(self.view_queries(f'/api/v1/jobs/{job.pk}/'), 1)
+
+    def test_api_company_detail(self):
+        self.assert_within_budget('/api/v1/companies/acme/')
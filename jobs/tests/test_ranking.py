@@ -0,0 +1,123 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jobs import ranking
+from jobs.models import Company, Job, SearchTerm
+from jobs.tests.factories import make_company, make_job, make_user
+
+
+class TermStatisticsTests(TestCase):
+    def setUp(self):
+        self.employer = make_user('employer', 'employer')
+        self.company = make_company('Acme')
+
+    def statistics(self):
+        return {
+            term: (documents, round(frequency, 6))
+            for term, documents, frequency in SearchTerm.objects.values_list('term', 'document_count', 'total_frequency')
+            if documents
+        }
+
+    def statistics_updates(self, queries):
+        return [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].replace('"', '').startswith(f'UPDATE {SearchTerm._meta.db_table} ')
+        ]
+
+    def test_saving_a_job_moves_every_term_in_one_statement(self):
+        description = ' '.join(f'skill{n}' for n in range(500))
+        with CaptureQueriesContext(connection) as queries:
+            make_job(self.employer, self.company, description=description)
+        self.assertEqual(len(self.statistics_updates(queries)), 1)
+
+    @mock.patch.object(ranking, 'STATISTICS_BATCH_SIZE', 50)
+    def test_incremental_statistics_match_a_rebuild(self):
+        python = make_job(self.employer, self.company, description='Django and Python web services')
+        make_job(self.employer, self.company, title='Go Developer', description='Go services and Python tooling')
+
+        job = Job.objects.get(pk=python.pk)
+        job.description = 'Flask services, ' + ' '.join(f'skill{n}' for n in range(200))
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+        self.assertGreater(len(self.statistics_updates(queries)), 1)
+        incremental = self.statistics()
+
+        ranking.rebuild_index()
+        self.assertEqual(incremental, self.statistics())
+
+
+class RankedSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        employer = make_user('employer', 'employer')
+        company = make_company('Acme')
+        cls.python = make_job(employer, company, title='Python Developer', description='Django web services')
+        cls.golang = make_job(
+            employer, company, title='Go Developer', description='Web services in Go', requirements='Go'
+        )
+        cls.pythonista = make_job(
+            employer, company, title='Pythonista', description='Scripting and automation', requirements='Bash'
+        )
+
+    def test_tokens_match_as_terms_or_prefixes(self):
+        jobs = Job.objects.all()
+        self.assertEqual(ranking.ranked_ids(jobs, 'python developer', 10), [self.python.pk])
+        self.assertEqual(set(ranking.ranked_ids(jobs, 'pyth', 10)), {self.python.pk, self.pythonista.pk})
+        self.assertEqual(ranking.ranked_ids(jobs, 'python cobol', 10), [])
+
+    def test_the_queries_of_a_search_do_not_grow_with_its_tokens(self):
+        jobs = Job.objects.all()
+        with CaptureQueriesContext(connection) as short:
+            ranking.ranked_ids(jobs, 'developer web', 10)
+        with CaptureQueriesContext(connection) as long:
+            ids = ranking.ranked_ids(jobs, 'developer web services go dev serv we d', 10)
+        self.assertEqual(ids, [self.golang.pk])
+        self.assertEqual(len(long), len(short))
+
+
+class CompanyReindexTests(TestCase):
+    def setUp(self):
+        self.company = make_company('Acme')
+        make_job(make_user('employer', 'employer'), self.company, title='Python Developer')
+
+    def test_editing_a_company_without_renaming_it_leaves_its_jobs_indexed(self):
+        company = Company.objects.get(pk=self.company.pk)
+        company.description = 'Acme makes rockets'
+        with mock.patch.object(ranking, 'index_job') as index_job:
+            company.save()
+        index_job.assert_not_called()
+
+    def test_renaming_a_company_reindexes_its_jobs(self):
+        company = Company.objects.get(pk=self.company.pk)
+        company.name = 'Globex'
+        company.save()
+        self.assertEqual(ranking.ranked_ids(Job.objects.all(), 'globex', 10), [company.jobs.get().pk])
+        self.assertEqual(ranking.ranked_ids(Job.objects.all(), 'acme', 10), [])
+
+
+class JoinScoresTests(TestCase):
+    def test_a_job_carrying_many_completions_of_every_token_is_scored_once(self):
+        words = [f'skill{letter}' for letter in 'abcdefghijkl']
+        # Each token matches four terms of the job: itself and three completions
+        description = ' '.join(f'{word} {word}x {word}y {word}z' for word in words)
+        employer = make_user('employer', 'employer')
+        job = make_job(employer, title='Engineer', description=description)
+        other = make_job(employer, title='Engineer', description=' '.join(words[:-1]))
+
+        jobs = Job.objects.all()
+        self.assertEqual(ranking.ranked_ids(jobs, ' '.join(words), 10), [job.pk])
+
+        documents = ranking._collection()[0]
+        expansions = ranking._expand(words)
+        postings = {
+            term: ranking._Postings(term, ranking.idf(count, documents))
+            for terms in expansions.values() for term, count in terms
+        }
+        groups = [[term for term, count in expansions[word]] for word in words]
+        scores = dict(ranking._join_scores(groups[0], groups[1:], postings, 10, 0))
+        expected = ranking._score({job.pk, other.pk}, groups, postings)
+        self.assertEqual(scores.keys(), expected.keys())
+        self.assertAlmostEqual(scores[job.pk], expected[job.pk])
@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from jobs.models import Job
+from jobs.tests.factories import make_job, make_user
+
+
+class SearchCacheEditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        employer = make_user('employer', 'employer')
+        cls.jobs = [
+            make_job(employer, title=f'Engineer {n}', salary_min=salary, salary_max=salary)
+            for n, salary in enumerate((50000, 70000, 90000))
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def listed(self, **params):
+        return [job.pk for job in self.client.get('/jobs/', params).context['jobs']]
+
+    def assert_reordered_by_raise(self, sort, before, after):
+        low = self.jobs[0]
+        self.assertEqual(self.listed(sort=sort), [job.pk for job in before])
+
+        job = Job.objects.get(pk=low.pk)
+        job.salary_min = job.salary_max = 120000
+        job.save()
+
+        self.assertEqual(self.listed(sort=sort), [job.pk for job in after])
+
+    def test_editing_a_salary_reorders_a_cached_highest_salary_listing(self):
+        low, middle, high = self.jobs
+        self.assert_reordered_by_raise('salary_desc', [high, middle, low], [low, high, middle])
+
+    def test_editing_a_salary_reorders_a_cached_lowest_salary_listing(self):
+        low, middle, high = self.jobs
+        self.assert_reordered_by_raise('salary_asc', [low, middle, high], [middle, high, low])
+
+    def test_editing_a_job_keeps_a_cached_newest_first_listing(self):
+        newest_first = self.listed()
+        job = Job.objects.get(pk=self.jobs[0].pk)
+        job.salary_min = job.salary_max = 120000
+        job.save()
+
+        self.assertEqual(self.listed(), newest_first)
@@ -0,0 +1,35 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from jobs import sitemaps
+from jobs.tests.factories import make_company, make_job, make_user
+
+
+class SitemapViewTests(TestCase):
+    def setUp(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(SITEMAP_ROOT=root, DEBUG=False))
+        make_job(make_user('employer', 'employer'), make_company('Acme'))
+        self.shard = next(name for name in sitemaps.generate() if name.startswith('sitemap-jobs-'))
+
+    def test_serves_the_generated_files_with_validators(self):
+        response = self.client.get(f'/{self.shard}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertIn(b'/jobs/', b''.join(response.streaming_content))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        again = self.client.get(f'/{self.shard}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_index_is_served(self):
+        self.assertEqual(self.client.get('/sitemap.xml').status_code, 200)
+
+    def test_missing_shard_is_not_found(self):
+        self.assertEqual(self.client.get('/sitemap-jobs-999.xml').status_code, 404)
+
+    def test_other_files_in_the_root_are_not_served(self):
+        self.assertEqual(self.client.get('/manifest.json').status_code, 404)
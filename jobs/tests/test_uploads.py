@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from jobs.forms import CompanyGalleryForm
+from jobs.models import Application, CompanyGallery, ResumeBlob
+from jobs.tests.factories import make_company, make_job, make_user
+from jobs.uploads import HashingUploadHandler
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+@override_settings(UPLOAD_SIZE_LIMITS={'resume': 1000})
+class HashingUploadHandlerTests(TestCase):
+    def receive(self, chunks):
+        handler = HashingUploadHandler()
+        handler.new_file('resume', 'cv.pdf', 'application/pdf', None)
+        start = 0
+        for chunk in chunks:
+            handler.receive_data_chunk(chunk, start)
+            start += len(chunk)
+        return handler.file_complete(start)
+
+    def test_hashes_a_file_within_the_limit(self):
+        upload = self.receive([b'a' * 600, b'b' * 400])
+        self.assertEqual(upload.size, 1000)
+        self.assertEqual(len(upload.sha256), 64)
+        self.assertEqual(upload.read(), b'a' * 600 + b'b' * 400)
+
+    def test_drops_a_file_past_the_limit_and_marks_it_too_large(self):
+        upload = self.receive([b'a' * 600, b'b' * 600, b'c' * 600])
+        self.assertTrue(upload.too_large)
+        self.assertEqual((upload.size, upload.size_limit), (1800, 1000))
+        self.assertEqual(upload.read(), b'')
+        self.assertIsNone(upload.sha256)
+
+    def test_a_marked_image_is_a_field_error_before_it_is_read(self):
+        upload = self.receive([b'a' * 1200])
+        form = CompanyGalleryForm({'caption': 'Office'}, {'image': upload})
+        self.assertEqual(form.errors['image'], ['File size must be at most 1000\xa0bytes.'])
+
+
+@override_settings(UPLOAD_SIZE_LIMITS={'resume': 1000})
+class ApplyUploadTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.job = make_job(make_user('employer', 'employer'))
+        cls.applicant = make_user('applicant')
+
+    def apply(self, content):
+        self.client.force_login(self.applicant)
+        return self.client.post(f'/jobs/{self.job.pk}/apply/', {
+            'cover_letter': 'Hello',
+            'resume': SimpleUploadedFile('cv.pdf', content, 'application/pdf'),
+        })
+
+    def test_resume_is_stored_under_its_digest(self):
+        response = self.apply(b'%PDF resume')
+
+        self.assertEqual(response.status_code, 302)
+        application = Application.objects.get(applicant=self.applicant)
+        self.assertRegex(application.resume.name, r'^resumes/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(ResumeBlob.objects.get(name=application.resume.name).references, 1)
+
+    def test_oversize_resume_is_rejected_without_an_application(self):
+        response = self.apply(b'x' * 5000)
+
+        self.assertEqual(response.status_code, 200)
+        form = response.context['form']
+        self.assertEqual(form.errors['resume'], ['File size must be at most 1000\xa0bytes.'])
+        # Fields sent after the file still arrive
+        self.assertEqual(form['cover_letter'].value(), 'Hello')
+        self.assertFalse(Application.objects.filter(applicant=self.applicant).exists())
+        self.assertFalse(ResumeBlob.objects.exists())
+
+
+@override_settings(UPLOAD_SIZE_LIMITS={'image': 1000})
+class GalleryUploadTests(TemporaryMediaMixin, TestCase):
+    def test_oversize_image_gets_a_form_error(self):
+        employer = make_user('employer', 'employer')
+        company = make_company('Acme')
+        self.client.force_login(employer)
+
+        response = self.client.post(f'/companies/{company.slug}/gallery/upload/', {
+            'image': SimpleUploadedFile('office.png', b'x' * 5000, 'image/png'),
+            'caption': 'Office',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['form'].errors['image'], ['File size must be at most 1000\xa0bytes.'])
+        self.assertFalse(CompanyGallery.objects.exists())
@@ -0,0 +1,59 @@
+"""
+Bulk status changes for the applications to a job.
+
+Triaging applicants one ``save()`` at a time costs a request, a write
+and a round of signal handlers each.  ``change_status()`` moves any
+number of a job's applications to a status with one grouped ``SELECT``
+of their current statuses and one ``UPDATE ... WHERE id IN (...)``, then
+runs what the signal handlers would have, once for the whole batch: a
+single counter update for the job (jobs.counters) and, after commit, one
+page cache expiry.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Application
+from . import applicant_search, counters, page_cache
+
+
+# Bounds the IN lists, well under SQLite's parameter limit
+MAX_SELECTION = 5000
+
+
+# The orders job_applications lists a job's applications in; 'match'
+# reads the (job, -match_score, -id) index (see jobs.matching)
+ORDERINGS = {
+    'newest': ('-applied_at',),
+    'match': ('-match_score', '-id'),
+}
+
+SORT_CHOICES = [
+    ('newest', 'Newest first'),
+    ('match', 'Best match first'),
+]
+
+
+def listing(job, sort='newest'):
+    """A job's applications in the ``ORDERINGS`` order named ``sort``"""
+    return Application.objects.filter(job=job).order_by(*ORDERINGS.get(sort, ORDERINGS['newest']))
+
+
+def top_ids(employer, job, count, query='', sort='newest'):
+    """The first ``count`` applications as job_applications lists them: best matches of ``query``, or by ``sort``"""
+    count = max(0, min(count, MAX_SELECTION))
+    if query:
+        return [application.pk for application, _ in applicant_search.search(employer, query, job=job, limit=count)]
+    return list(listing(job, sort).values_list('pk', flat=True)[:count])
+
+
+def change_status(job, application_ids, status):
+    """Move the applications ``application_ids`` of ``job`` to ``status``; returns how many changed"""
+    selected = Application.objects.filter(job=job, pk__in=application_ids[:MAX_SELECTION]).exclude(status=status)
+    with transaction.atomic():
+        previous = dict(selected.values_list('status').annotate(Count('pk')))
+        if not previous:
+            return 0
+        changed = selected.update(status=status)
+        counters.applications_moved(job.pk, previous, status)
+        transaction.on_commit(page_cache.invalidate)
+    return changed
@@ -0,0 +1,311 @@
+"""
+In-memory prefix completion for the search box.
+
+Every distinct job title, company name and location of an active job is
+an *entry*.  Entries are reachable through a sorted array of keys, one per
+word boundary, so "dev" completes both "Developer" and "Senior Developer"
+and "senior py" completes "Senior Python Developer".  Suggestions are
+ranked by how many active jobs carry the entry.
+
+Each process loads the index lazily on first use.  The Job/Company signal
+handlers in ``jobs.models`` patch it in place, and every
+``TYPEAHEAD_SYNC_INTERVAL`` seconds it catches up on rows other processes
+changed, using ``updated_at``.  Jobs deleted by other processes drop out
+on the full reload every ``TYPEAHEAD_RELOAD_INTERVAL`` seconds.  Queries
+never touch the database.
+
+The index also keeps the words of its entries in a trigram index, which
+``correct`` uses to fix misspelt search queries (see ``jobs.fuzzy``).
+"""
+import heapq
+import threading
+import time
+
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import fuzzy
+from .search import tokenize
+
+
+KIND_WEIGHT = {'title': 3, 'company': 2, 'location': 1}
+
+# Only the first few word boundaries of a phrase are indexed
+MAX_KEY_WORDS = 6
+
+MAX_CACHED_QUERIES = 10000
+
+# Prefixes matching more keys than this are answered by walking entries in
+# popularity order instead of ranking the whole key range
+LARGE_RANGE = 500
+
+POPULAR_REFRESH_SECONDS = 60
+
+
+def normalize(text):
+    return ' '.join(tokenize(text))
+
+
+def phrase_keys(normalized):
+    words = normalized.split(' ')
+    return [' '.join(words[i:]) for i in range(min(len(words), MAX_KEY_WORDS))]
+
+
+class PrefixIndex:
+    """Ranked prefix completion over title, company and location phrases"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self.synced_at = None
+        self.checked_at = 0.0
+        self.loaded_at = 0.0
+
+    def _reset(self):
+        self._keys = []          # sorted list of (key, entry_id)
+        self._entries = {}       # entry_id -> [kind, text, normalized, job count]
+        self._entry_ids = {}     # (kind, normalized) -> entry_id
+        self._jobs = {}          # job_id -> tuple of entry ids
+        self._cache = {}         # query -> (limit, results)
+        self._popular = {}       # word initial -> entry ids by rank, refreshed lazily
+        self._popular_at = 0.0
+        self._popular_dirty = False
+        self._next_id = 0
+        self._words = fuzzy.TrigramIndex()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    # Building
+
+    def bulk_load(self, rows):
+        """Replace the index contents with (job_id, title, company, location) rows"""
+        with self._lock:
+            self._reset()
+            for job_id, title, company, location in rows:
+                self._jobs[job_id] = self._acquire_entries(title, company, location, defer_keys=True)
+            keys = []
+            for entry_id, (kind, text, normalized, count) in self._entries.items():
+                keys.extend((key, entry_id) for key in phrase_keys(normalized))
+            keys.sort()
+            self._keys = keys
+            self._refresh_popular()
+
+    def add_job(self, job_id, title, company, location):
+        with self._lock:
+            self.remove_job(job_id)
+            self._jobs[job_id] = self._acquire_entries(title, company, location)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            entry_ids = self._jobs.pop(job_id, ())
+            for entry_id in entry_ids:
+                self._release(entry_id)
+
+    def _acquire_entries(self, title, company, location, defer_keys=False):
+        entry_ids = []
+        for kind, text in (('title', title), ('company', company), ('location', location)):
+            normalized = normalize(text)
+            if not normalized:
+                continue
+            entry_id = self._entry_ids.get((kind, normalized))
+            if entry_id is None:
+                entry_id = self._next_id
+                self._next_id += 1
+                self._entry_ids[(kind, normalized)] = entry_id
+                self._entries[entry_id] = [kind, text.strip(), normalized, 0]
+                if not defer_keys:
+                    for key in phrase_keys(normalized):
+                        pos = bisect_left(self._keys, (key, entry_id))
+                        self._keys.insert(pos, (key, entry_id))
+            self._entries[entry_id][3] += 1
+            for word in fuzzy.words(normalized):
+                self._words.add(word)
+            if not defer_keys:
+                self._invalidate(normalized)
+                self._popular_dirty = True
+            entry_ids.append(entry_id)
+        return tuple(entry_ids)
+
+    def _release(self, entry_id):
+        entry = self._entries[entry_id]
+        entry[3] -= 1
+        kind, text, normalized, count = entry
+        for word in fuzzy.words(normalized):
+            self._words.discard(word)
+        self._invalidate(normalized)
+        self._popular_dirty = True
+        if count > 0:
+            return
+        del self._entries[entry_id]
+        del self._entry_ids[(kind, normalized)]
+        for key in phrase_keys(normalized):
+            pos = bisect_left(self._keys, (key, entry_id))
+            if pos < len(self._keys) and self._keys[pos] == (key, entry_id):
+                del self._keys[pos]
+
+    def _invalidate(self, normalized):
+        if not self._cache:
+            return
+        for key in phrase_keys(normalized):
+            for end in range(1, len(key) + 1):
+                self._cache.pop(key[:end], None)
+
+    # Querying
+
+    def _rank(self, entry_id):
+        kind, text, normalized, count = self._entries[entry_id]
+        return (count, KIND_WEIGHT[kind], -len(normalized))
+
+    def _refresh_popular(self):
+        popular = {}
+        for entry_id in sorted(self._entries, key=self._rank, reverse=True):
+            for letter in {key[0] for key in phrase_keys(self._entries[entry_id][2])}:
+                popular.setdefault(letter, []).append(entry_id)
+        self._popular = popular
+        self._popular_at = time.monotonic()
+        self._popular_dirty = False
+
+    def _popular_entries(self, initial):
+        if self._popular_dirty and time.monotonic() - self._popular_at > POPULAR_REFRESH_SECONDS:
+            self._refresh_popular()
+        return self._popular.get(initial, ())
+
+    def suggest(self, prefix, limit=10, use_cache=True):
+        """Return up to ``limit`` ranked suggestions for a typed prefix"""
+        query = normalize(prefix)
+        if not query:
+            return []
+
+        with self._lock:
+            if use_cache:
+                cached = self._cache.get(query)
+                if cached is not None and cached[0] >= limit:
+                    return cached[1][:limit]
+
+            keys = self._keys
+            entries = self._entries
+            start = bisect_left(keys, (query,))
+            end = bisect_left(keys, (query + '\uffff',), start)
+
+            best = []
+            if end - start > LARGE_RANGE:
+                word_start = ' ' + query
+                for entry_id in self._popular_entries(query[0]):
+                    entry = entries.get(entry_id)
+                    if entry and (entry[2].startswith(query) or word_start in entry[2]):
+                        best.append(entry_id)
+                        if len(best) == limit:
+                            break
+            if len(best) < limit:
+                matches = {entry_id for key, entry_id in keys[start:end]}
+                best = heapq.nlargest(limit, matches, key=self._rank)
+            results = [
+                {'text': entries[entry_id][1], 'type': entries[entry_id][0], 'count': entries[entry_id][3]}
+                for entry_id in best
+            ]
+
+            if use_cache:
+                if len(self._cache) >= MAX_CACHED_QUERIES:
+                    self._cache.clear()
+                self._cache[query] = (limit, results)
+            return results
+
+    def closest_word(self, word, min_similarity):
+        """The indexed word most similar to a misspelt one, or None"""
+        with self._lock:
+            return self._words.closest(word, min_similarity)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _company_label(company_name, legacy_name):
+    return company_name or legacy_name or ''
+
+
+def _load_index():
+    from .models import Job
+
+    index = PrefixIndex()
+    synced_at = timezone.now()
+    rows = Job.objects.filter(is_active=True).values_list(
+        'pk', 'title', 'company__name', 'company_name', 'location'
+    ).iterator(chunk_size=5000)
+    index.bulk_load(
+        (pk, title, _company_label(company, legacy), location)
+        for pk, title, company, legacy, location in rows
+    )
+    index.synced_at = synced_at
+    index.checked_at = index.loaded_at = time.monotonic()
+    return index
+
+
+def _catch_up(index):
+    """Apply rows changed since the last sync, including by other processes"""
+    from .models import Job
+
+    synced_at = timezone.now()
+    rows = Job.objects.filter(
+        Q(updated_at__gte=index.synced_at) | Q(company__updated_at__gte=index.synced_at)
+    ).values_list('pk', 'title', 'company__name', 'company_name', 'location', 'is_active')
+    for pk, title, company, legacy, location, is_active in rows:
+        if is_active:
+            index.add_job(pk, title, _company_label(company, legacy), location)
+        else:
+            index.remove_job(pk)
+    index.synced_at = synced_at
+    index.checked_at = time.monotonic()
+
+
+def get_index():
+    """Return this process's index, loading or catching it up as needed"""
+    global _index
+    sync_interval = getattr(settings, 'TYPEAHEAD_SYNC_INTERVAL', 60)
+    reload_interval = getattr(settings, 'TYPEAHEAD_RELOAD_INTERVAL', 3600)
+    with _index_lock:
+        now = time.monotonic()
+        if _index is None or now - _index.loaded_at > reload_interval:
+            _index = _load_index()
+        elif now - _index.checked_at > sync_interval:
+            _catch_up(_index)
+        return _index
+
+
+def suggest(prefix, limit=10):
+    return get_index().suggest(prefix, limit)
+
+
+def correct(query):
+    """Return the query with misspelt words fixed, or None if none are"""
+    # The index is only loaded once a word turns out to be unknown
+    def closest_word(word, min_similarity):
+        return get_index().closest_word(word, min_similarity)
+    return fuzzy.correct_query(query, closest_word)
+
+
+def job_changed(job):
+    """Patch the loaded index after a job save (no-op until first use)"""
+    if _index is None:
+        return
+    if job.is_active:
+        company = job.company.name if job.company_id else job.company_name
+        _index.add_job(job.pk, job.title, company or '', job.location)
+    else:
+        _index.remove_job(job.pk)
+
+
+def job_removed(job_id):
+    if _index is not None:
+        _index.remove_job(job_id)
+
+
+def company_changed(company):
+    if _index is None:
+        return
+    for pk, title, location in company.jobs.filter(is_active=True).values_list('pk', 'title', 'location'):
+        _index.add_job(pk, title, company.name, location)
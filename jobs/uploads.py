@@ -0,0 +1,98 @@
+"""
+Streaming checks on uploaded files.
+
+``HashingUploadHandler`` replaces Django's memory and temporary file
+handlers.  As each chunk of an upload arrives it is counted and fed to a
+SHA-256 hash, so the digest is ready when the upload ends (resumes are
+stored under it, see jobs.resumes) without reading the file again.
+
+A file larger than its field's limit in ``UPLOAD_SIZE_LIMITS`` (or
+``UPLOAD_MAX_SIZE``) is no longer kept from the moment it passes the
+limit.  The rest of it is counted and dropped, and the form gets an
+empty upload marked ``too_large`` with the size that was sent, so the
+field reports the size instead of the file going missing, and the fields
+after it still arrive.  The upload fields of the forms are
+``LimitedFileField``/``LimitedImageField``, which reject a marked upload
+before anything tries to read it.
+"""
+import hashlib
+import io
+import tempfile
+
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+
+def size_limit(field_name):
+    """The largest upload, in bytes, accepted for the form field ``field_name``"""
+    limits = getattr(settings, 'UPLOAD_SIZE_LIMITS', {})
+    return limits.get(field_name, getattr(settings, 'UPLOAD_MAX_SIZE', 10 * 1024 * 1024))
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Keep uploads in memory, or on disk past FILE_UPLOAD_MAX_MEMORY_SIZE, hashing them as they arrive"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.limit = size_limit(self.field_name)
+        self.received = 0
+        self.too_large = False
+        self.hasher = hashlib.sha256()
+        self.file = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE, suffix='.upload', dir=settings.FILE_UPLOAD_TEMP_DIR
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            if not self.too_large:
+                self.too_large = True
+                self.file.close()
+            return None
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.too_large:
+            upload = UploadedFile(
+                file=io.BytesIO(), name=self.file_name, content_type=self.content_type, size=file_size,
+                charset=self.charset, content_type_extra=self.content_type_extra,
+            )
+            upload.too_large = True
+            upload.size_limit = self.limit
+            upload.sha256 = None
+            return upload
+        self.file.seek(0)
+        upload = UploadedFile(
+            file=self.file,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+        )
+        upload.sha256 = self.hasher.hexdigest()
+        return upload
+
+
+class LimitedUploadMixin:
+    """Form field mixin rejecting an upload ``HashingUploadHandler`` cut off at its size limit"""
+
+    def to_python(self, data):
+        if getattr(data, 'too_large', False):
+            raise forms.ValidationError(
+                f"File size must be at most {filesizeformat(data.size_limit)}.", code='file_too_large'
+            )
+        return super().to_python(data)
+
+
+class LimitedFileField(LimitedUploadMixin, forms.FileField):
+    pass
+
+
+class LimitedImageField(LimitedUploadMixin, forms.ImageField):
+    pass
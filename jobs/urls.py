@@ -1,13 +1,17 @@
-from django.urls import path
-from . import views
+from django.conf import settings
+from django.urls import path, re_path
+from . import api, async_views, views
+
+# Under ASGI the hot read views are served by their async versions
+hot_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     # Home
-    path('', views.home, name='home'),
+    path('', hot_views.home, name='home'),
     
     # Jobs
-    path('jobs/', views.JobListView.as_view(), name='job_list'),
-    path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
+    path('jobs/', hot_views.JobListView.as_view(), name='job_list'),
+    path('jobs/<int:pk>/', hot_views.JobDetailView.as_view(), name='job_detail'),
     path('jobs/new/', views.JobCreateView.as_view(), name='job_create'),
     path('jobs/<int:pk>/edit/', views.JobUpdateView.as_view(), name='job_update'),
     path('jobs/<int:pk>/delete/', views.JobDeleteView.as_view(), name='job_delete'),
@@ -17,6 +21,7 @@ urlpatterns = [
     path('applications/<int:pk>/', views.application_detail, name='application_detail'),
     path('applications/<int:pk>/status/', views.update_application_status, name='update_application_status'),
     path('jobs/<int:pk>/applications/', views.job_applications, name='job_applications'),
+    path('jobs/<int:pk>/applications/status/', views.bulk_update_application_status, name='bulk_update_application_status'),
     
     # Companies
     path('companies/', views.CompanyListView.as_view(), name='company_list'),
@@ -28,10 +33,25 @@ urlpatterns = [
     
     # Dashboards
     path('employer/dashboard/', views.employer_dashboard, name='employer_dashboard'),
+    path('employer/applicants/search/', views.search_applicants, name='search_applicants'),
     path('applicant/dashboard/', views.applicant_dashboard, name='applicant_dashboard'),
     
     # Search
-    path('search/', views.search_jobs, name='search_jobs'),
+    path('search/', hot_views.search_jobs, name='search_jobs'),
+    path('saved-searches/new/', views.saved_search_create, name='saved_search_create'),
+    path('saved-searches/<int:pk>/delete/', views.saved_search_delete, name='saved_search_delete'),
+    
+    # Read API
+    path('api/v1/jobs/', api.job_list, name='api_job_list'),
+    path('api/v1/jobs/<int:pk>/', api.job_detail, name='api_job_detail'),
+    path('api/v1/companies/', api.company_list, name='api_company_list'),
+    path('api/v1/companies/<slug:slug>/', api.company_detail, name='api_company_detail'),
+    
+    # Feeds
+    path('feeds/jobs.<str:format>', views.job_feed, name='job_feed'),
+    
+    # Sitemaps, pre-generated by the generate_sitemaps command
+    re_path(r'^(?P<path>sitemap(-[a-z]+-\d+)?\.xml)$', views.sitemap, name='sitemap'),
     
     # Contact
     path('contact/', views.contact_view, name='contact'),
@@ -1,85 +1,152 @@
+import os
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
-from django.http import JsonResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views.decorators.http import condition, require_safe
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from django.core.paginator import Paginator
 from django.contrib.auth.models import User
-from .models import Job, Application, Company, CompanyGallery
-from .forms import JobForm, ApplicationForm, JobSearchForm, CompanyForm, CompanyGalleryForm
+from .models import Job, Application, Company, CompanyGallery, SavedSearch
+from .forms import JobForm, ApplicationForm, JobSearchForm, CompanyForm, CompanyGalleryForm, SavedSearchForm
+from .page_cache import anonymous_page_cache
+from .loader import LoaderObjectMixin
+from .pagination import CursorPaginationMixin
+from .query_budget import query_budget
+from . import applicant_search, conditional, facets, feeds, geo, ranking, search, search_cache, stats, triage, typeahead
 
 
+@anonymous_page_cache
+@query_budget(7)
 def home(request):
     """Home page view"""
     featured_jobs = Job.objects.filter(is_active=True).order_by('-created_at')[:6]
-    total_jobs = Job.objects.filter(is_active=True).count()
-    total_applications = Application.objects.count()
-    total_companies = Company.objects.count()
+    totals = stats.get_snapshot()
     
     context = {
         'featured_jobs': featured_jobs,
-        'total_jobs': total_jobs,
-        'total_applications': total_applications,
-        'total_companies': total_companies,
+        'total_jobs': totals['jobs'],
+        'total_applications': totals['applications'],
+        'total_companies': totals['companies'],
     }
     return render(request, 'jobs/home.html', context)
 
 
-class JobListView(ListView):
+@method_decorator(anonymous_page_cache, name='dispatch')
+@method_decorator(query_budget(16), name='dispatch')
+class JobListView(CursorPaginationMixin, ListView):
     model = Job
     template_name = 'jobs/job_list.html'
     context_object_name = 'jobs'
     paginate_by = 12
+    cursor_ordering = ('-created_at', '-id')
+    
+    # Relevance results are ranked up front; their cursors only need the id
+    SORT_ORDERINGS = {
+        '': ('-created_at', '-id'),
+        'relevance': ('-created_at', '-id'),
+        'salary_desc': ('-annual_salary_high', '-id'),
+        'salary_asc': ('annual_salary_low', 'id'),
+    }
     
     def get_queryset(self):
         queryset = Job.objects.filter(is_active=True)
-        form = JobSearchForm(self.request.GET)
+        self.search_form = JobSearchForm(self.request.GET)
+        self.selected_facets = {}
+        self.search_criteria = None
+        self.rank_queryset = None
+        self.corrected_query = None
         
-        if form.is_valid():
-            query = form.cleaned_data.get('query')
-            job_type = form.cleaned_data.get('job_type')
-            experience_level = form.cleaned_data.get('experience_level')
-            location = form.cleaned_data.get('location')
-            company = form.cleaned_data.get('company')
-            
+        if self.search_form.is_valid():
+            query = self.search_form.cleaned_data.get('query')
             if query:
-                queryset = queryset.filter(
-                    Q(title__icontains=query) |
-                    Q(company__name__icontains=query) |
-                    Q(location__icontains=query)
-                )
+                # Search for the corrected words instead of finding nothing
+                self.corrected_query = typeahead.correct(query)
+                if self.corrected_query:
+                    query = self.search_form.cleaned_data['query'] = self.corrected_query
+            sort = self.search_form.cleaned_data.get('sort') or ''
+            salary_from = self.search_form.cleaned_data.get('salary_from')
+            salary_to = self.search_form.cleaned_data.get('salary_to')
+            
+            near_point = self.search_form.cleaned_data.get('near_point')
+            if near_point:
+                queryset = geo.filter_within(queryset, *near_point, self.search_form.cleaned_data['radius'])
             
-            if job_type:
-                queryset = queryset.filter(job_type=job_type)
+            # Salary ranges overlap when each starts before the other ends
+            if salary_from is not None:
+                queryset = queryset.filter(annual_salary_high__gte=salary_from)
             
-            if experience_level:
-                queryset = queryset.filter(experience_level=experience_level)
+            if salary_to is not None:
+                queryset = queryset.filter(annual_salary_low__lte=salary_to)
             
-            if location:
-                queryset = queryset.filter(location__icontains=location)
+            self.cursor_ordering = self.SORT_ORDERINGS[sort]
+            queryset = queryset.order_by(*self.cursor_ordering)
+            self.selected_facets = facets.selected_filters(self.search_form.cleaned_data)
             
-            if company:
-                queryset = queryset.filter(company=company)
+            if query:
+                # The ranking index matches the query terms itself
+                if sort == 'relevance':
+                    self.rank_queryset = facets.apply_filters(queryset, self.selected_facets)
+                queryset = search.filter_jobs(queryset, query)
+            
+            self.search_criteria = search_cache.normalize_criteria(self.search_form.cleaned_data)
         
-        return queryset
+        # Facet counts are computed over the results before facet filters
+        self.facet_queryset = queryset
+        return facets.apply_filters(queryset, self.selected_facets)
+    
+    def get_cached_ids(self, queryset):
+        if self.search_criteria is None:
+            return None
+        if self.rank_queryset is not None:
+            return search_cache.get_entry(self.search_criteria, self.rank_queryset, self.cursor_ordering)
+        return search_cache.get_entry(self.search_criteria, queryset, self.cursor_ordering)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['search_form'] = JobSearchForm(self.request.GET)
+        context['search_form'] = self.search_form
+        context['corrected_query'] = self.corrected_query
+        context['facets'] = self.get_facets()
+        context['applied_job_ids'] = self.get_applied_job_ids(context['jobs'])
         return context
+    
+    def get_facets(self):
+        return facets.compute_facets(self.facet_queryset, self.selected_facets, self.request.GET)
+    
+    def get_applied_job_ids(self, jobs):
+        # One query for the Applied badges instead of one per card
+        user = self.request.user
+        if user.is_authenticated and hasattr(user, 'profile') and user.profile.user_type == 'applicant':
+            return set(
+                Application.objects.filter(
+                    applicant=user, job__in=[job.pk for job in jobs]
+                ).values_list('job_id', flat=True)
+            )
+        return set()
 
 
+@method_decorator(condition(conditional.job_etag, conditional.job_last_modified), name='dispatch')
+@method_decorator(anonymous_page_cache, name='dispatch')
+@method_decorator(query_budget(8), name='dispatch')
 class JobDetailView(DetailView):
     model = Job
     template_name = 'jobs/job_detail.html'
     context_object_name = 'job'
+    queryset = Job.objects.select_related('posted_by')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        job = self.get_object()
+        job = self.object
         
         # Check if user has applied
         has_applied = False
@@ -109,7 +176,7 @@ class JobCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         return super().form_valid(form)
 
 
-class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, LoaderObjectMixin, UpdateView):
     model = Job
     form_class = JobForm
     template_name = 'jobs/job_form.html'
@@ -119,14 +186,14 @@ class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         job = self.get_object()
         return (hasattr(self.request.user, 'profile') and 
                 self.request.user.profile.user_type == 'employer' and 
-                job.posted_by == self.request.user)
+                job.posted_by_id == self.request.user.pk)
     
     def form_valid(self, form):
         messages.success(self.request, 'Job updated successfully!')
         return super().form_valid(form)
 
 
-class JobDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class JobDeleteView(LoginRequiredMixin, UserPassesTestMixin, LoaderObjectMixin, DeleteView):
     model = Job
     success_url = reverse_lazy('employer_dashboard')
     
@@ -134,7 +201,7 @@ class JobDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         job = self.get_object()
         return (hasattr(self.request.user, 'profile') and 
                 self.request.user.profile.user_type == 'employer' and 
-                job.posted_by == self.request.user)
+                job.posted_by_id == self.request.user.pk)
     
     def delete(self, request, *args, **kwargs):
         messages.success(request, 'Job deleted successfully!')
@@ -170,55 +237,165 @@ def apply_to_job(request, pk):
 
 
 @login_required
+@query_budget(6)
 def employer_dashboard(request):
     """Employer dashboard"""
     if not hasattr(request.user, 'profile') or request.user.profile.user_type != 'employer':
         messages.error(request, 'Access denied. Employer account required.')
         return redirect('home')
     
-    posted_jobs = Job.objects.filter(posted_by=request.user).order_by('-created_at')
-    total_applications = Application.objects.filter(job__posted_by=request.user).count()
+    posted_jobs = list(Job.objects.filter(posted_by=request.user).order_by('-created_at'))
     
     context = {
         'posted_jobs': posted_jobs,
-        'total_jobs': posted_jobs.count(),
-        'total_applications': total_applications,
+        'total_jobs': len(posted_jobs),
+        'active_jobs': sum(1 for job in posted_jobs if job.is_active),
+        'total_applications': sum(job.applications_count for job in posted_jobs),
     }
     return render(request, 'jobs/employer_dashboard.html', context)
 
 
 @login_required
+@query_budget(6)
 def applicant_dashboard(request):
     """Applicant dashboard"""
     if not hasattr(request.user, 'profile') or request.user.profile.user_type != 'applicant':
         messages.error(request, 'Access denied. Applicant account required.')
         return redirect('home')
     
-    applications = Application.objects.filter(applicant=request.user).order_by('-applied_at')
+    applications = list(
+        Application.objects.filter(applicant=request.user)
+        .select_related('job')
+        .order_by('-applied_at')
+    )
+    saved_searches = SavedSearch.objects.filter(user=request.user, is_active=True)
     
     context = {
         'applications': applications,
-        'total_applications': applications.count(),
+        'total_applications': len(applications),
+        'pending_applications': sum(1 for application in applications if application.status == 'pending'),
+        'shortlisted_applications': sum(1 for application in applications if application.status == 'shortlisted'),
+        'saved_searches': saved_searches,
     }
     return render(request, 'jobs/applicant_dashboard.html', context)
 
 
 @login_required
+def saved_search_create(request):
+    """Save the current job list filters for email alerts"""
+    if request.method != 'POST':
+        return redirect('job_list')
+    
+    form = SavedSearchForm(request.POST)
+    if form.is_valid():
+        saved_search = form.save(commit=False)
+        saved_search.user = request.user
+        saved_search.save()
+        messages.success(request, f'Saved "{saved_search.name}". New matching jobs will be emailed to you.')
+        return redirect(saved_search.get_absolute_url())
+    messages.error(request, 'This search could not be saved.')
+    return redirect('job_list')
+
+
+@login_required
+def saved_search_delete(request, pk):
+    """Stop the alerts of a saved search"""
+    saved_search = get_object_or_404(SavedSearch, pk=pk, user=request.user)
+    if request.method == 'POST':
+        saved_search.delete()
+        messages.success(request, 'Saved search deleted successfully!')
+    return redirect('applicant_dashboard')
+
+
+@login_required
+@query_budget(8)
 def job_applications(request, pk):
     """View applications for a specific job"""
     job = get_object_or_404(Job, pk=pk, posted_by=request.user)
-    applications = Application.objects.filter(job=job).order_by('-applied_at')
+    query = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort', 'newest')
+    snippets = {}
+    if query:
+        # Best matches of the resumes and cover letters first
+        results = applicant_search.search(request.user, query, job=job)
+        applications = []
+        for application, snippet in results:
+            application.snippet = snippets[application.pk] = applicant_search.highlight(snippet)
+            applications.append(application)
+    else:
+        applications = triage.listing(job, sort).select_related('applicant')
     
     return render(request, 'jobs/job_applications.html', {
         'job': job,
-        'applications': applications
+        'applications': applications,
+        'query': query,
+        'sort': sort,
+        'sort_choices': triage.SORT_CHOICES,
+        'snippets': snippets,
+        'status_choices': Application.STATUS_CHOICES,
     })
 
 
+@login_required
+@transaction.atomic
+@query_budget(6)
+def bulk_update_application_status(request, pk):
+    """Move the selected, or the top N listed, applications to a job to one status (employer only)"""
+    # In one transaction with the budget check, so a strict budget failure rolls the change back
+    # Only the job's own applications are selected below, so this is the ownership check
+    job = get_object_or_404(Job, pk=pk, posted_by=request.user)
+    query = request.POST.get('q', '').strip()
+    sort = request.POST.get('sort', 'newest')
+    
+    if request.method == 'POST':
+        new_status = request.POST.get('status')
+        if new_status not in dict(Application.STATUS_CHOICES):
+            messages.error(request, 'Invalid status.')
+        else:
+            select = request.POST.get('select') or ('top' if request.POST.get('top') else 'selected')
+            try:
+                if select == 'top':
+                    application_ids = triage.top_ids(request.user, job, int(request.POST.get('top', '')), query, sort)
+                else:
+                    application_ids = [int(pk) for pk in request.POST.getlist('applications')]
+            except ValueError:
+                application_ids = None
+            if not application_ids:
+                messages.error(request, 'Select the applications to update.')
+            else:
+                changed = triage.change_status(job, application_ids, new_status)
+                label = dict(Application.STATUS_CHOICES)[new_status]
+                messages.success(request, f'{changed} application(s) marked {label.lower()}.')
+    
+    url = reverse('job_applications', kwargs={'pk': pk})
+    params = {name: value for name, value in (('q', query), ('sort', sort)) if value and value != 'newest'}
+    return redirect(f'{url}?{urlencode(params)}' if params else url)
+
+
+@login_required
+@require_safe
+@query_budget(4)
+def search_applicants(request):
+    """AJAX endpoint for keyword search over the applications to the employer's jobs"""
+    results = applicant_search.search(request.user, request.GET.get('q', ''))
+    return JsonResponse({'applications': [
+        {
+            'id': application.pk,
+            'applicant': application.applicant.get_full_name() or application.applicant.username,
+            'job': application.job.title,
+            'status': application.get_status_display(),
+            'applied_at': application.applied_at.isoformat(),
+            'snippet': applicant_search.plain(snippet),
+            'url': application.get_absolute_url(),
+        }
+        for application, snippet in results
+    ]})
+
+
 @login_required
 def application_detail(request, pk):
     """View application details"""
-    application = get_object_or_404(Application, pk=pk)
+    application = get_object_or_404(Application.objects.select_related('job', 'applicant'), pk=pk)
     
     # Check permissions
     if (application.applicant != request.user and 
@@ -234,7 +411,7 @@ def application_detail(request, pk):
 @login_required
 def update_application_status(request, pk):
     """Update application status (employer only)"""
-    application = get_object_or_404(Application, pk=pk)
+    application = get_object_or_404(Application.objects.select_related('job'), pk=pk)
     
     if application.job.posted_by != request.user:
         messages.error(request, 'Access denied.')
@@ -252,31 +429,82 @@ def update_application_status(request, pk):
     return redirect('application_detail', pk=pk)
 
 
+@condition(conditional.search_etag, conditional.search_last_modified)
+@query_budget(12)
 def search_jobs(request):
     """AJAX endpoint for job search"""
     query = request.GET.get('query', '')
-    jobs = Job.objects.filter(is_active=True)
     
-    if query:
-        jobs = jobs.filter(
-            Q(title__icontains=query) |
-            Q(company__name__icontains=query) |
-            Q(location__icontains=query)
-        )
+    # Typeahead requests are answered from the in-memory index only
+    if request.GET.get('suggest'):
+        return JsonResponse({'suggestions': typeahead.suggest(query)})
+    
+    jobs = Job.objects.filter(is_active=True).select_related('company')
+    corrected_query = typeahead.correct(query) if query else None
+    if corrected_query:
+        query = corrected_query
     
-    jobs = jobs[:10]  # Limit results
+    if query:
+        # Best matches first
+        ids = ranking.ranked_ids(jobs, query, 10)
+        matches = jobs.in_bulk(ids)
+        jobs = [matches[pk] for pk in ids if pk in matches]
+    else:
+        jobs = jobs[:10]  # Limit results
     
-    data = []
-    for job in jobs:
-        data.append({
+    return JsonResponse({'jobs': search_results(jobs), 'corrected_query': corrected_query})
+
+
+def search_results(jobs):
+    return [
+        {
             'id': job.id,
             'title': job.title,
-            'company': job.company.name,
+            'company': job.company.name if job.company_id else job.company_name,
             'location': job.location,
             'url': job.get_absolute_url(),
-        })
-    
-    return JsonResponse({'jobs': data})
+        }
+        for job in jobs
+    ]
+
+
+@require_safe
+def job_feed(request, format):
+    """Stream every active job as a JSON Lines or XML feed, gzipped when accepted"""
+    if format not in feeds.FORMATS:
+        raise Http404("Unknown feed format")
+    
+    base_url = request.build_absolute_uri('/').rstrip('/')
+    content = feeds.encode(feeds.generate(format, base_url))
+    gzipped = 'gzip' in request.headers.get('Accept-Encoding', '')
+    if gzipped:
+        content = feeds.gzip_stream(content)
+    
+    response = StreamingHttpResponse(content, content_type=feeds.FORMATS[format])
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+@require_safe
+def sitemap(request, path):
+    """Serve a file pre-generated by generate_sitemaps, with validators for crawlers"""
+    try:
+        stat = os.stat(os.path.join(settings.SITEMAP_ROOT, path))
+    except FileNotFoundError:
+        raise Http404("No such sitemap")
+    
+    # Shards are replaced atomically, so a new file means a new mtime
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(open(os.path.join(settings.SITEMAP_ROOT, path), 'rb'), content_type='application/xml')
+        response['Last-Modified'] = http_date(last_modified)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.SITEMAP_MAX_AGE)
+    return response
 
 
 def contact_view(request):
@@ -299,11 +527,14 @@ def contact_view(request):
 
 
 # Company Views
-class CompanyListView(ListView):
+@method_decorator(anonymous_page_cache, name='dispatch')
+@method_decorator(query_budget(6), name='dispatch')
+class CompanyListView(CursorPaginationMixin, ListView):
     model = Company
     template_name = 'jobs/company_list.html'
     context_object_name = 'companies'
     paginate_by = 12
+    cursor_ordering = ('name', 'id')
     
     def get_queryset(self):
         queryset = Company.objects.all()
@@ -319,6 +550,9 @@ class CompanyListView(ListView):
         return queryset
 
 
+@method_decorator(condition(conditional.company_etag, conditional.company_last_modified), name='dispatch')
+@method_decorator(anonymous_page_cache, name='dispatch')
+@method_decorator(query_budget(8), name='dispatch')
 class CompanyDetailView(DetailView):
     model = Company
     template_name = 'jobs/company_detail.html'
@@ -327,7 +561,7 @@ class CompanyDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        company = self.get_object()
+        company = self.object
         context['jobs'] = company.jobs.filter(is_active=True).order_by('-created_at')
         context['gallery'] = company.gallery.all()
         return context
@@ -77,6 +77,37 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    // Search box typeahead
+    document.querySelectorAll('input[name="query"]').forEach(function (input, index) {
+        var datalist = document.createElement('datalist');
+        datalist.id = 'query-suggestions-' + index;
+        input.setAttribute('list', datalist.id);
+        input.setAttribute('autocomplete', 'off');
+        input.parentNode.appendChild(datalist);
+
+        var timer = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            var value = input.value.trim();
+            if (!value) {
+                datalist.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(function () {
+                fetch('/search/?suggest=1&query=' + encodeURIComponent(value))
+                    .then(function (response) { return response.json(); })
+                    .then(function (data) {
+                        datalist.innerHTML = '';
+                        data.suggestions.forEach(function (suggestion) {
+                            var option = document.createElement('option');
+                            option.value = suggestion.text;
+                            datalist.appendChild(option);
+                        });
+                    });
+            }, 100);
+        });
+    });
+
     // Job card hover effects
     var jobCards = document.querySelectorAll('.job-card');
     jobCards.forEach(function (card) {